@@ -12,6 +12,44 @@ function delay(ms) {
   return new Promise((res) => setTimeout(res, ms))
 }
 
+// Reads the /chat/stream server-sent events. Calls onToken with the text
+// received so far for every "token" event and resolves with the body of
+// the final "done" event (same shape as the /chat response). An "error"
+// event means the answer broke off; its body replaces the partial text.
+async function readChatStream(res, onToken) {
+  const reader = res.body.getReader()
+  const decoder = new TextDecoder()
+  let buffer = ""
+  let text = ""
+  let final = null
+
+  while (true) {
+    const { done, value } = await reader.read()
+    if (done) break
+    buffer += decoder.decode(value, { stream: true })
+
+    let end
+    while ((end = buffer.indexOf("\n\n")) !== -1) {
+      const frame = buffer.slice(0, end)
+      buffer = buffer.slice(end + 2)
+
+      const event = frame.match(/^event: (.*)$/m)?.[1]
+      const data = frame.match(/^data: (.*)$/m)?.[1]
+      if (!data) continue
+
+      const payload = JSON.parse(data)
+      if (event === "token") {
+        text += payload.text
+        onToken(text)
+      } else if (event === "done" || event === "error") {
+        final = payload
+      }
+    }
+  }
+
+  return final || {}
+}
+
 function truncateWithDots(text, limit = 28) {
   if (!text || text.length <= limit) return text
   return text.slice(0, limit) + "...."
@@ -536,6 +574,8 @@ export default function NIETChatbotMessages({ embed = false }) {
   const [callbackStep, setCallbackStep] = useState(null)
   const [callbackData, setCallbackData] = useState({ name: "", phone: "" })
   const messagesRef = useRef(null)
+  // One server-side conversation memory per chat; a reset starts a new one.
+  const sessionIdRef = useRef(crypto.randomUUID())
 
   useEffect(() => {
     sessionStorage.removeItem("niet_chat_messages")
@@ -817,14 +857,25 @@ export default function NIETChatbotMessages({ embed = false }) {
     setIsSending(true)
 
     try {
-      const res = await fetch("https://niet-chat-bot-rag.onrender.com/chat", {
+      const res = await fetch("https://niet-chat-bot-rag.onrender.com/chat/stream", {
         method: "POST",
         headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({ question: text }),
+        body: JSON.stringify({ question: text, session_id: sessionIdRef.current }),
       })
-
-      const data = await res.json()
-      await delay(600)
+      if (!res.ok || !res.body) throw new Error("Chat stream failed")
+
+      // Render the answer bubble as soon as the first token arrives.
+      let streamedId = null
+      const data = await readChatStream(res, (partial) => {
+        if (!streamedId) {
+          streamedId = crypto.randomUUID()
+          setTyping(false)
+          setMessages((m) => [...m, { id: streamedId, from: "bot", type: "text", text: partial, time: now() }])
+        } else {
+          setMessages((m) => m.map((msg) => (msg.id === streamedId ? { ...msg, text: partial } : msg)))
+        }
+      })
+      if (!streamedId) await delay(600)
 
       if (data.images?.length) pushImages(data.images)
       if (data.type === "positive_sensitive") {
@@ -893,8 +944,12 @@ export default function NIETChatbotMessages({ embed = false }) {
         return
       }
 
-      if (data.final_answer || data.answer)
-        pushBot(data.final_answer || data.answer)
+      const answer = data.final_answer || data.answer
+      if (answer && streamedId) {
+        setMessages((m) => m.map((msg) => (msg.id === streamedId ? { ...msg, text: answer } : msg)))
+      } else if (answer) {
+        pushBot(answer)
+      }
     } catch {
       pushBot("Server error. Please try again.")
     } finally {
@@ -936,6 +991,7 @@ export default function NIETChatbotMessages({ embed = false }) {
             setSelectedOptions(new Set())
             setCallbackStep(null)
             setCallbackData({ name: "", phone: "" })
+            sessionIdRef.current = crypto.randomUUID()
             sessionStorage.removeItem("niet_chat_messages")
             pushBot("Hello! I'm the NIET Assistant — how can I help you today?")
             pushOptions(INITIAL_OPTIONS, false)
@@ -31,6 +31,7 @@ app.add_middleware(
 
 class ChatRequest(BaseModel):
     question: str
+    session_id: Optional[str] = None
 
 class NormalChatResponse(BaseModel):
     type: str = "normal"
@@ -139,19 +140,19 @@ def chat_endpoint(payload: ChatRequest):
             return SENSITIVE_REDIRECT_RESPONSE
 
         if is_short_llm_question(question):
-            answer = chat(question)
+            answer = chat(question, payload.session_id)
             return {
         "type": "normal",
         "answer": answer
     }
         if is_single_word (question):
-            answer=answer_rag(question)
+            answer=answer_rag(question, payload.session_id)
             return {
                 "type":"normal",
                 "answer":answer
             }
         if not is_comparison_query(question):
-            rag_answer = answer_rag(question)
+            rag_answer = answer_rag(question, payload.session_id)
             if rag_answer:
                 return {
                     "type": "normal",
@@ -159,13 +160,13 @@ def chat_endpoint(payload: ChatRequest):
                 }
 
         if should_go_to_llm(question):
-            answer = chat(question)
+            answer = chat(question, payload.session_id)
             return {
                 "type": "normal",
                 "answer": answer
             }
 
-        answer = chat(question)
+        answer = chat(question, payload.session_id)
         return {
             "type": "normal",
             "answer": answer
@@ -1,7 +1,9 @@
 from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from fastapi.middleware.cors import CORSMiddleware
 from typing import List, Optional, Union
+import json
 import re
 
 from constant.is_sensitive import is_sensitive_query, is_safety_confirmation_query
@@ -10,9 +12,20 @@ from constant.sensitive_redirect import (
     POSITIVE_SENSITIVE_RESPONSE
 )
 from constant.llm_keywords import should_go_to_llm
-
-from llm_model_gemini.chat import chat
-from query_rag import answer_rag
+from constant.intent_classifier import classify, register
+
+from llm_model_gemini.answer_cache import ANSWER_CACHE
+from llm_model_gemini.chat import achat, astream_chat
+from llm_model_gemini.context_builder import build_context, load_context_artifact, save_context_artifact
+from llm_model_gemini.llm.circuit_breaker import breaker_health
+from llm_model_gemini.llm.gemini_client import HIGH_TRAFFIC_MESSAGE, refresh_gemini_cache
+from llm_model_gemini.llm.prompt_metrics import prompt_breakdown_stats, prompt_cache_stats
+from llm_model_gemini.memory.chat_memory import memory_stats
+from llm_model_gemini.llm.provider_orchestrator import provider_stats
+from llm_model_gemini.llm.request_coalescer import llm_queue_stats
+from query_rag import route_rag, router_stats
+from router.course_facts import course_facts
+from router.entity_matcher import correct_entities
 
 from router.placement_router import router as placement_router
 from router.callback_router import router as callback_router
@@ -34,10 +47,24 @@ app.add_middleware(
 )
 
 
+@app.on_event("startup")
+def warm_context():
+    # Use the precomputed context if it still matches the data files.
+    if not load_context_artifact():
+        build_context()
+        save_context_artifact()
+    # Explicit Gemini cache (GEMINI_EXPLICIT_CACHE=1) is created here so
+    # the first requests do not wait for it.
+    refresh_gemini_cache()
+
+
 # ---------------- MODELS ----------------
 
 class ChatRequest(BaseModel):
     question: str
+    # Conversation id generated by the client; requests without one are
+    # answered without any conversation history.
+    session_id: Optional[str] = None
 
 class NormalChatResponse(BaseModel):
     type: str = "normal"
@@ -79,34 +106,127 @@ DECISION_PATTERNS = [
     "does"
 ]
 
+COMPARISON_KEYWORDS = [
+    "which",
+    "why",
+    "better",
+    "better than",
+    "vs",
+    "versus",
+    "compare",
+    "difference between"
+]
+
+ADMISSION_DECISION_PATTERNS = [
+    "should i take admission",
+    "should i join",
+    "should i choose",
+    "is it worth joining",
+    "is it good to join",
+    "join niet"
+]
+
+# Yes/no questions about what NIET has ("does niet have hostel"); the
+# routers answer these from data, so they skip the decision prompt.
+EXISTENCE_PATTERNS = [
+    "does niet have",
+    "does niet offer",
+    "does niet provide",
+    "is there",
+    "are there",
+    "do you have",
+    "do you offer"
+]
+
+register("decision", DECISION_PATTERNS)
+register("comparison", COMPARISON_KEYWORDS)
+register("admission_decision", ADMISSION_DECISION_PATTERNS)
+register("existence", EXISTENCE_PATTERNS)
+
 def is_decision_query(q: str) -> bool:
-    q = q.lower()
-    return any(p in q for p in DECISION_PATTERNS)
+    return "decision" in classify(q)
 
 def is_comparison_query(q: str) -> bool:
-    q = q.lower()
-    return any(kw in q for kw in [
-        "which",
-        "why",
-        "better",
-        "better than",
-        "vs",
-        "versus",
-        "compare",
-        "difference between"
-    ])
+    return "comparison" in classify(q)
 
 
 def is_admission_decision_query(q: str) -> bool:
-    q = q.lower().strip()
-    return any(p in q for p in [
-        "should i take admission",
-        "should i join",
-        "should i choose",
-        "is it worth joining",
-        "is it good to join",
-        "join niet"
-    ]) 
+    return "admission_decision" in classify(q)
+
+
+def is_existence_query(q: str) -> bool:
+    return "existence" in classify(q)
+DECISION_FALLBACK_ANSWER = (
+    "Choosing NIET is a great decision as it offers strong academics, "
+    "experienced faculty, and excellent placement support. "
+    "For detailed guidance, you can contact our admission team."
+)
+
+
+def data_answer(question: str):
+    """
+    A ready response built from the data for a question that would
+    otherwise go to the LLM: course facts and comparisons, or a router
+    answer for "does niet have ..." questions. None if there is none.
+    """
+    answer = course_facts(question)
+    if answer is None and is_existence_query(question):
+        answer = route_rag(question)
+    if isinstance(answer, str) and answer.strip():
+        return {"type": "normal", "answer": answer}
+    return None
+
+
+def plan_chat(raw_question: str):
+    """
+    Decide how a question is answered, without calling the LLM.
+
+    Returns (response, llm_query, empty_fallback): either a ready response,
+    or the query to send to the LLM plus the answer to use if the LLM
+    returns nothing (None keeps the empty answer).
+    """
+    question = raw_question.strip().lower()
+
+    if is_sensitive_query(raw_question) and not is_admission_decision_query(raw_question):
+        if is_safety_confirmation_query(raw_question):
+            return POSITIVE_SENSITIVE_RESPONSE, None, None
+        return SENSITIVE_REDIRECT_RESPONSE, None, None
+
+    if is_admission_decision_query(raw_question):
+        return None, question, None
+
+    # Fact questions phrased as decisions or comparisons ("which btech
+    # branch has highest package") are answered from the data; the LLM
+    # only gets the open-ended ones.
+    if is_decision_query(question) or is_comparison_query(question):
+        response = data_answer(question)
+        if response is not None:
+            return response, None, None
+
+    if is_decision_query(question):
+        modified_prompt = (
+            "Answer the following question in a helpful and encouraging tone "
+            "for a student considering admission at NIET:\n\n"
+            + question
+        )
+        return None, modified_prompt, DECISION_FALLBACK_ANSWER
+
+    if is_comparison_query(question):
+        return None, question, None
+
+    rag_answer = route_rag(question)
+    if isinstance(rag_answer, str) and rag_answer.strip():
+        return {"type": "normal", "answer": rag_answer}, None, None
+
+    response = course_facts(question)
+    if response is not None:
+        return {"type": "normal", "answer": response}, None, None
+
+    # The LLM and its retrieval see the question with entity names fixed
+    # ("placment record" -> "placement record").
+    return None, correct_entities(question), None
+
+
 @app.post(
     "/chat",
     response_model=Union[
@@ -115,62 +235,18 @@ def is_admission_decision_query(q: str) -> bool:
         PositiveSensitiveResponse
     ]
 )
-def chat_endpoint(payload: ChatRequest):
-
-    question = payload.question.strip().lower()
+async def chat_endpoint(payload: ChatRequest):
 
     try:
-        if is_sensitive_query(payload.question) and not is_admission_decision_query(payload.question):
-            if is_safety_confirmation_query(payload.question):
-                return POSITIVE_SENSITIVE_RESPONSE
-            return SENSITIVE_REDIRECT_RESPONSE
-
-        if is_admission_decision_query (payload.question):
-            answer=chat(question)
-            return {
-                "type":"normal",
-                "answer":answer
-            }
-        
-        if is_decision_query(question):
-            modified_prompt = (
-        "Answer the following question in a helpful and encouraging tone "
-        "for a student considering admission at NIET:\n\n"
-        + question
-    )
-
-            answer = chat(modified_prompt)
-
-            if not isinstance(answer, str) or not answer.strip():
-                answer = (
-            "Choosing NIET is a great decision as it offers strong academics, "
-            "experienced faculty, and excellent placement support. "
-            "For detailed guidance, you can contact our admission team."
-        )
-
-            return {
-                "type": "normal",
-                "answer": answer
-    }
-
-
-        if is_comparison_query(question):
-            answer = chat(question)
-            return {
-                "type": "normal",
-                "answer": answer
-            }
+        response, llm_query, empty_fallback = plan_chat(payload.question)
+        if response is not None:
+            return response
 
+        answer = await achat(llm_query, payload.session_id)
 
-        rag_answer = answer_rag(question)
-        if isinstance(rag_answer, str) and rag_answer.strip():
-            return {
-                "type": "normal",
-                "answer": rag_answer
-            }
+        if empty_fallback and (not isinstance(answer, str) or not answer.strip()):
+            answer = empty_fallback
 
-
-        answer = chat(question)
         return {
             "type": "normal",
             "answer": answer
@@ -180,16 +256,81 @@ def chat_endpoint(payload: ChatRequest):
         print("Chat error:", e)
         return {
             "type": "normal",
-            "answer": (
-                "Our system is currently experiencing high traffic. "
-                "Please try again in a few minutes or visit our website: "
-                "https://www.niet.co.in/"
-            )
+            "answer": HIGH_TRAFFIC_MESSAGE
         }
 
 
+def sse_frame(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@app.post("/chat/stream")
+async def chat_stream_endpoint(payload: ChatRequest):
+    """
+    Server-sent events variant of /chat. LLM answers are forwarded as
+    `token` events while they are generated; every response ends with a
+    `done` event carrying the same body /chat would return, or with an
+    `error` event (same body, busy answer) when the answer broke off after
+    some tokens were sent and those must be discarded.
+    """
+
+    async def events():
+        parts = []
+        try:
+            response, llm_query, empty_fallback = plan_chat(payload.question)
+            if response is not None:
+                yield sse_frame("done", response)
+                return
+
+            async for token in astream_chat(llm_query, payload.session_id):
+                parts.append(token)
+                yield sse_frame("token", {"text": token})
+
+            answer = "".join(parts)
+            if empty_fallback and not answer.strip():
+                answer = empty_fallback
+
+            yield sse_frame("done", {"type": "normal", "answer": answer})
+
+        except Exception as e:
+            print("Chat stream error:", e)
+            event = "error" if parts else "done"
+            yield sse_frame(event, {"type": "normal", "answer": HIGH_TRAFFIC_MESSAGE})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.get("/")
 def root():
 
     return {"status": "NIET MAIN CHATBOT RAG is running"}
 
+
+@app.get("/health")
+def health():
+    providers = breaker_health()
+    open_count = sum(1 for b in providers.values() if b["state"] == "open")
+    if not open_count:
+        status = "ok"
+    elif open_count < len(providers):
+        status = "degraded"
+    else:
+        status = "down"
+    return {"status": status, "providers": providers}
+
+
+@app.get("/metrics")
+def metrics():
+    return {
+        "prompt_cache": prompt_cache_stats(),
+        "prompt_tokens": prompt_breakdown_stats(),
+        "providers": provider_stats(),
+        "llm_queue": llm_queue_stats(),
+        "answer_cache": ANSWER_CACHE.stats(),
+        "sessions": memory_stats(),
+        "routers": router_stats(),
+    }
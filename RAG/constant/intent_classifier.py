@@ -0,0 +1,174 @@
+# constant/intent_classifier.py
+#
+# Every keyword family used to pick a /chat path (sensitive words, decision
+# phrases, router triggers...) compiled into one regex. classify() scans the
+# question once and returns the labels of every family with a match; the
+# old any(k in q for k in ...) predicates are now membership tests on it.
+
+import re
+import threading
+from functools import lru_cache
+
+SUBSTRING = "substring"  # keyword anywhere in the text (old `k in q`)
+PREFIX = "prefix"        # text starts with the keyword (old q.startswith)
+WORD = "word"            # keyword equals a whole [a-z]+ token (old set intersection)
+PHRASE = "phrase"        # keyword's tokens appear as whole consecutive tokens
+MODES = (SUBSTRING, PREFIX, WORD, PHRASE)
+
+_WORDS = re.compile(r"[a-z]+")
+_TOKENS = re.compile(r"[a-z0-9]+")
+
+
+def phrase_text(text: str) -> str:
+    """
+    Lowered text as space-separated [a-z0-9]+ tokens, padded with a space
+    on both sides, so a phrase keyword written the same way can only
+    match whole tokens ("ban" never matches inside "bank").
+    """
+    return " " + " ".join(_TOKENS.findall(text.lower())) + " "
+
+_families = {}  # label -> (mode, keywords)
+_compiled = None
+_lock = threading.Lock()
+
+
+def trie_pattern(keywords) -> str:
+    """
+    Regex for the keywords arranged as a character trie: at each position
+    the engine follows one branch per character instead of trying every
+    keyword in turn. Optional tails are greedy, so the longest keyword
+    starting at a position is the one matched.
+    """
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        for ch in keyword:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def build(node):
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return "(?:" + body + ")?" if "" in node else body
+
+    return build(trie)
+
+
+class CompiledIntents:
+    """
+    One lookahead trie regex over all substring/prefix keywords, reporting
+    the longest keyword starting at every position. Every shorter keyword
+    starting at the same position is a prefix of that one, so each keyword
+    maps to the labels of all its prefixes and overlapping matches are not
+    lost.
+    """
+
+    def __init__(self, families: dict):
+        anywhere = {}  # keyword -> labels matched anywhere
+        start = {}     # keyword -> labels matched only at position 0
+        phrases = {}   # padded phrase -> labels, matched against phrase_text()
+        self.word_labels = {}
+
+        for label, (mode, keywords) in families.items():
+            for keyword in keywords:
+                keyword = keyword.lower()
+                if not keyword:
+                    continue
+                if mode == WORD:
+                    self.word_labels.setdefault(keyword, set()).add(label)
+                elif mode == PHRASE:
+                    phrase = phrase_text(keyword)
+                    if phrase.strip():
+                        phrases.setdefault(phrase, set()).add(label)
+                elif mode == PREFIX:
+                    start.setdefault(keyword, set()).add(label)
+                else:
+                    anywhere.setdefault(keyword, set()).add(label)
+
+        keys = sorted(set(anywhere) | set(start))
+
+        self.any_labels = {}
+        self.start_labels = {}
+        for key in keys:
+            self.any_labels[key] = frozenset().union(
+                *(labels for k, labels in anywhere.items() if key.startswith(k)))
+            self.start_labels[key] = frozenset().union(
+                *(labels for k, labels in start.items() if key.startswith(k)))
+
+        self.word_labels = {k: frozenset(v) for k, v in self.word_labels.items()}
+        self.pattern = re.compile("(?=(" + trie_pattern(keys) + "))") if keys else None
+
+        # Phrases share their padding spaces with their neighbours, so the
+        # same lookahead scan over phrase_text() finds overlapping phrases.
+        self.phrase_labels = {
+            key: frozenset().union(*(labels for k, labels in phrases.items() if key.startswith(k)))
+            for key in phrases
+        }
+        self.phrase_pattern = re.compile(
+            "(?=(" + trie_pattern(sorted(phrases)) + "))") if phrases else None
+
+    def match(self, text: str) -> frozenset:
+        labels = set()
+        if self.pattern is not None:
+            found = self.pattern.findall(text)
+            if found:
+                labels.update(*(self.any_labels[key] for key in set(found)))
+                first = self.pattern.match(text)
+                if first:
+                    labels.update(self.start_labels[first.group(1)])
+        if self.word_labels:
+            for word in set(_WORDS.findall(text)):
+                labels.update(self.word_labels.get(word, ()))
+        if self.phrase_pattern is not None:
+            found = self.phrase_pattern.findall(phrase_text(text))
+            if found:
+                labels.update(*(self.phrase_labels[key] for key in set(found)))
+        return frozenset(labels)
+
+
+def register(label: str, keywords, mode: str = SUBSTRING):
+    """
+    Add (or replace) a keyword family. Modules register their lists at
+    import; the regex is rebuilt lazily on the next classify().
+    """
+    global _compiled
+    if mode not in MODES:
+        raise ValueError(f"Unknown keyword mode: {mode}")
+    with _lock:
+        _families[label] = (mode, tuple(keywords))
+        _compiled = None
+    classify.cache_clear()
+
+
+def _get_compiled() -> CompiledIntents:
+    global _compiled
+    compiled = _compiled
+    if compiled is None:
+        with _lock:
+            if _compiled is None:
+                _compiled = CompiledIntents(_families)
+            compiled = _compiled
+    return compiled
+
+
+def vocabulary() -> set:
+    """
+    Every word of every registered keyword.
+    """
+    with _lock:
+        families = list(_families.values())
+    return {word for _, keywords in families for k in keywords for word in _WORDS.findall(k.lower())}
+
+
+@lru_cache(maxsize=4096)
+def classify(text: str) -> frozenset:
+    """
+    Labels of every registered family with a keyword in `text`
+    (matched case-insensitively).
+    """
+    if not text:
+        return frozenset()
+    return _get_compiled().match(text.lower())
+
@@ -1,3 +1,5 @@
+from constant.intent_classifier import PHRASE, classify, phrase_text, register
+
 SENSITIVE_KEYWORDS = [
     "close",
     "closed",
@@ -37,7 +39,9 @@ SENSITIVE_KEYWORDS = [
     "investigation",
 
     "fraud",
+    "frauds",
     "scam",
+    "scams",
     "fake",
     "fake college",
     "fraud college",
@@ -80,7 +84,9 @@ SENSITIVE_KEYWORDS = [
     "reliable or not",
 
     "bad review",
+    "bad reviews",
     "negative review",
+    "negative reviews",
     "bad college",
     "worst college",
     "poor reputation",
@@ -139,6 +145,8 @@ SAFETY_POSITIVE_KEYWORDS = [
     "student safety",
 
     "degree valid",
+    "degree validity",
+    "valid degree",
     "degree value",
     "degree accepted",
     "future safe",
@@ -146,13 +154,118 @@ SAFETY_POSITIVE_KEYWORDS = [
 ]
 
 
+# Everyday phrases in which a sensitive keyword is harmless, by keyword.
+# An exception only clears that keyword where the phrase contains it; any
+# other sensitive word in the question still counts.
+SENSITIVE_EXCEPTIONS = {
+    "court": ["basketball court", "badminton court", "tennis court", "volleyball court", "sports court"],
+    "case": ["case study", "case studies", "use case", "in case", "in any case"],
+    "close": ["close to", "close by", "how close"],
+    "police": ["police verification"],
+    "reality": ["virtual reality", "augmented reality"],
+    "news": ["news letter"],
+}
+
+
+def plural(word: str) -> str:
+    if word.endswith("s"):
+        return word
+    if word.endswith(("ch", "sh", "x", "z")):
+        return word + "es"
+    if word.endswith("y") and word[-2:-1] not in "aeiou":
+        return word[:-1] + "ies"
+    return word + "s"
+
+
+# Single-word nouns among the keywords that are also asked about in the
+# plural ("complaints against niet", "ragging cases"). Only these get a
+# plural form; pluralising verbs and phrases would give "polices" or
+# "is it safes".
+PLURAL_KEYWORDS = [
+    "ban",
+    "blacklist",
+    "closure",
+    "shutdown",
+    "arrest",
+    "case",
+    "court",
+    "raid",
+    "fir",
+    "complaint",
+    "investigation",
+    "fraud",
+    "scam",
+    "rumour",
+    "rumor",
+]
+
+
+def with_plurals(phrases) -> list:
+    """
+    The phrases plus the plural of those in PLURAL_KEYWORDS, so
+    "complaint" also matches "complaints" and "case" matches "cases".
+    """
+    out = []
+    for phrase in phrases:
+        out.append(phrase)
+        if phrase in PLURAL_KEYWORDS:
+            out.append(plural(phrase))
+    return list(dict.fromkeys(out))
+
+
+def _exception_tokens():
+    """
+    (forms of the keyword, phrase tokens) for every exception, with the
+    keyword also in the plural where it has one ("basketball courts").
+    """
+    out = []
+    for keyword, phrases in SENSITIVE_EXCEPTIONS.items():
+        forms = set(with_plurals([keyword]))
+        for phrase in phrases:
+            tokens = phrase.split()
+            for form in sorted(forms):
+                out.append((forms, tuple(form if t == keyword else t for t in tokens)))
+    return list(dict.fromkeys((frozenset(f), t) for f, t in out))
+
+
+# Keywords match whole tokens / token sequences only, so "ban" no longer
+# fires on "bank", "fir" on "first" or "case" on "showcase".
+register("sensitive", with_plurals(SENSITIVE_KEYWORDS), PHRASE)
+register("sensitive_exception", [" ".join(t) for _, t in _exception_tokens()], PHRASE)
+register("safety_positive", SAFETY_POSITIVE_KEYWORDS, PHRASE)
+
+_SENSITIVE_TOKENS = [tuple(phrase_text(k).split()) for k in with_plurals(SENSITIVE_KEYWORDS)]
+_EXCEPTION_TOKENS = _exception_tokens()
+
+
+def _occurrences(tokens, phrase):
+    n = len(phrase)
+    return [i for i in range(len(tokens) - n + 1) if tuple(tokens[i:i + n]) == phrase]
+
+
+def _has_unexcused_keyword(text: str) -> bool:
+    tokens = phrase_text(text).split()
+    excused = set()
+    for forms, phrase in _EXCEPTION_TOKENS:
+        for i in _occurrences(tokens, phrase):
+            excused.update(i + j for j, token in enumerate(phrase) if token in forms)
+    for keyword in _SENSITIVE_TOKENS:
+        for i in _occurrences(tokens, keyword):
+            if not excused.intersection(range(i, i + len(keyword))):
+                return True
+    return False
+
+
 def is_sensitive_query(text: str) -> bool:
     if not text:
         return False
 
-    lower_text = text.lower()
-    return any(keyword in lower_text for keyword in SENSITIVE_KEYWORDS)
+    intents = classify(text)
+    if "sensitive" not in intents:
+        return False
+    if "sensitive_exception" in intents:
+        return _has_unexcused_keyword(text)
+    return True
 
 def is_safety_confirmation_query(text: str) -> bool:
-    text = text.lower()
-    return any(k in text for k in SAFETY_POSITIVE_KEYWORDS)
+    return "safety_positive" in classify(text)
@@ -1,3 +1,5 @@
+from constant.intent_classifier import classify, register
+
 LLM_KEYWORDS = [
     # 🔹 Comparison & choice
     "compare",
@@ -45,6 +47,8 @@ LLM_KEYWORDS = [
     "placement comparison"
 ]
 
+register("llm", LLM_KEYWORDS)
+
+
 def should_go_to_llm(question: str) -> bool:
-    q = question.lower()
-    return any(keyword in q for keyword in LLM_KEYWORDS)
+    return "llm" in classify(question)
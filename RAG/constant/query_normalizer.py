@@ -0,0 +1,126 @@
+# constant/query_normalizer.py
+#
+# One preprocessing pass per question. normalize_query() builds every form
+# of the query the routers and the retriever match against (each of them
+# used to re-normalize the raw text itself) and caches the result, so a
+# question is only normalized once however many routers look at it.
+
+import re
+from functools import lru_cache
+
+_PUNCT = re.compile(r"[^\w\s]")
+_NON_ALNUM = re.compile(r"[^a-z0-9\s]")
+_SEPARATORS = re.compile(r"[?,.:_-]")
+_BTECH = re.compile(r"\bb\s*\.?\s*tech\b")
+
+# Short course names and the phrases they stand for; a query mentioning
+# the short name is expanded with all of them for keyword retrieval.
+ALIAS_MAP = {
+    "aiml": ["aiml","ai ml","cse aiml","btech aiml","b.tech aiml","artificial intelligence","ai & ml"],
+    "cse": ["cse","cs","computer science","btech cse","b.tech cse"],
+    "ds": ["ds","data science","btech ds","cse ds","b.tech ds"],
+    "iot": ["iot","internet of things","btech iot","b.tech iot"],
+    "csbs": ["csbs","computer science business system"],
+    "cy": ["cyber security","cse cy","cs cyber","btech cyber"],
+    "mca": ["mca","master of computer application"],
+    "mba": ["mba","master of business administration"],
+    "mechanical": ["mechanical", "me", "mech", "mechanical engineering", "btech me", "b tech me"],
+}
+
+# First branch with a whole-word signal in the query wins.
+BRANCH_SIGNALS = {
+    "cse": ["computer science", "cse"],
+    "cs": ["computer science", "cs"],
+    "ece": ["electronics", "electronics and communication", "ece"],
+    "vlsi": ["vlsi", "vlsi design", "vlsi design and technology"],
+    "it": ["information technology", "it"],
+    "me": ["mechanical", "mechanical engineering"],
+    "bio": ["biotechnology"],
+    "bca": ["bca", "bachelor of computer applications"],
+    "csbs": ["computer science and business systems", "csbs"],
+    "mathematics and computing": ["mathematics and computing", "mnc", "math computing"]
+}
+
+# First specialization with a signal anywhere in the query wins.
+SPECIALIZATION_SIGNALS = {
+    "aiml": ["aiml", "artificial intelligence and machine learning"],
+    "ai": ["artificial intelligence"],
+    "ds": ["data science"],
+    "cy": ["cyber", "cyber security"],
+    "iot": ["iot", "internet of things"],
+    "twinning": ["twinning", "international"],
+    "aiml twinning": ["aiml twinning", "international twinning"]
+}
+
+_BRANCH_PATTERNS = [
+    (branch, re.compile(r"\b(?:" + "|".join(map(re.escape, signals)) + r")\b"))
+    for branch, signals in BRANCH_SIGNALS.items()
+]
+
+
+def _collapse(text: str) -> str:
+    return " ".join(text.split())
+
+
+def expand_aliases(text: str) -> str:
+    expanded = text
+    for short, full in ALIAS_MAP.items():
+        if short in text:
+            expanded += " " + " ".join(full)
+    return expanded
+
+
+def detect_branch(text: str):
+    for branch, pattern in _BRANCH_PATTERNS:
+        if pattern.search(text):
+            return branch
+    return None
+
+
+def detect_specialization(text: str):
+    for spec, signals in SPECIALIZATION_SIGNALS.items():
+        for s in signals:
+            if s in text:
+                return spec
+    return None
+
+
+class NormalizedQuery:
+    """
+    Every normalized form of one question:
+
+    lower          - lowercased, stripped raw text
+    plain          - lower with ? , . : - _ turned into spaces (club, event, research)
+    text           - lower with all punctuation turned into spaces (course routers)
+    alnum          - only [a-z0-9] words (retriever, institute)
+    course_text    - text with "b.tech" -> "btech" and "&" -> " and " (btech, mtech)
+    expanded       - alnum plus the ALIAS_MAP phrases of every short name in it
+    tokens         - words of text, in order
+    token_set      - the same as a frozenset
+    branch         - B.Tech branch named in the query, or None
+    specialization - specialization named in the query, or None
+    """
+
+    __slots__ = ("raw", "lower", "plain", "text", "alnum", "course_text", "expanded",
+                 "tokens", "token_set", "branch", "specialization")
+
+    def __init__(self, raw: str):
+        self.raw = raw or ""
+        self.lower = self.raw.lower().strip()
+        self.plain = _collapse(_SEPARATORS.sub(" ", self.lower))
+        self.text = _collapse(_PUNCT.sub(" ", self.lower))
+        self.alnum = _collapse(_NON_ALNUM.sub(" ", self.lower))
+        self.course_text = _collapse(_PUNCT.sub(" ", _BTECH.sub("btech", self.lower.replace("&", " and "))))
+        self.expanded = expand_aliases(self.alnum)
+        self.tokens = tuple(self.text.split())
+        self.token_set = frozenset(self.tokens)
+        self.branch = detect_branch(self.course_text)
+        self.specialization = detect_specialization(self.course_text)
+
+    def __repr__(self):
+        return f"NormalizedQuery({self.raw!r})"
+
+
+@lru_cache(maxsize=4096)
+def normalize_query(query: str) -> NormalizedQuery:
+    return NormalizedQuery(query)
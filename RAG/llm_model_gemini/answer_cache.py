@@ -0,0 +1,275 @@
+# rag/answer_cache.py
+#
+# Cache of LLM answers keyed on the normalized question and the version of
+# the data the answer was generated from. Any change to data/*.json or
+# data_chunk/ (e.g. a scraper rebuild) produces a new version, so stale
+# answers are never served.
+
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from constant.query_normalizer import normalize_query
+from llm_model_gemini.context_builder import context_fingerprint
+from llm_model_gemini.llm.gemini_client import HIGH_TRAFFIC_MESSAGE, is_detailed_query
+from llm_model_gemini.retreiver.chunk_store import CHUNK_STORE
+from llm_model_gemini.retreiver.vector_store import VECTOR_STORE
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# "memory" (per process), "redis" (shared, needs the redis package and
+# REDIS_URL) or "off".
+ANSWER_CACHE_BACKEND = os.getenv("ANSWER_CACHE_BACKEND", "memory")
+ANSWER_CACHE_TTL = int(os.getenv("ANSWER_CACHE_TTL", str(6 * 3600)))
+ANSWER_CACHE_SIZE = int(os.getenv("ANSWER_CACHE_SIZE", "2000"))
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+# Cosine similarity above which a differently worded question reuses a
+# cached answer. 0 disables it; needs the dense index (vector_store.py).
+ANSWER_CACHE_SIMILARITY = float(os.getenv("ANSWER_CACHE_SIMILARITY", "0"))
+
+# Questions leaning on earlier turns ("tell me more about it") depend on
+# the conversation, so they are neither served from nor stored in the cache.
+FOLLOW_UP_WORDS = {"it", "its", "this", "that", "these", "those", "they", "them", "their", "he", "she", "more"}
+
+
+class MemoryBackend:
+    """
+    In-process LRU with a per-entry TTL.
+    """
+
+    def __init__(self, size: int = ANSWER_CACHE_SIZE):
+        self.size = size
+        self._entries = OrderedDict()  # key -> (expires at, answer)
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, answer: str, ttl: int):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, answer)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class RedisBackend:
+    """
+    Shared cache for several workers. Redis does the TTL eviction; run it
+    with maxmemory-policy allkeys-lru for the LRU part.
+    """
+
+    PREFIX = "niet:answer:"
+
+    def __init__(self, url: str = REDIS_URL):
+        self.client = redis.Redis.from_url(url, socket_timeout=0.2, decode_responses=True)
+        self.client.ping()
+
+    def get(self, key: str):
+        return self.client.get(self.PREFIX + key)
+
+    def set(self, key: str, answer: str, ttl: int):
+        self.client.setex(self.PREFIX + key, ttl, answer)
+
+    def clear(self):
+        for key in self.client.scan_iter(self.PREFIX + "*"):
+            self.client.delete(key)
+
+    def __len__(self):
+        return sum(1 for _ in self.client.scan_iter(self.PREFIX + "*"))
+
+
+def make_backend(kind: str = ANSWER_CACHE_BACKEND):
+    if kind == "off":
+        return None
+    if kind == "redis":
+        try:
+            if redis is None:
+                raise RuntimeError("redis package is not installed")
+            return RedisBackend()
+        except Exception as e:
+            print("Redis answer cache unavailable, using in-process cache:", e)
+    return MemoryBackend()
+
+
+def context_version() -> str:
+    """
+    Hash of everything an answer is generated from: the static context
+    files and the retrieval chunks.
+    """
+    CHUNK_STORE.refresh()
+    raw = f"{context_fingerprint()}:{CHUNK_STORE.fingerprint}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def is_follow_up(question: str) -> bool:
+    return is_detailed_query(question) or bool(FOLLOW_UP_WORDS & normalize_query(question).token_set)
+
+
+class AnswerCache:
+    """
+    Exact lookups on the normalized question, plus an optional embedding
+    match against recently cached questions of the same data version.
+    """
+
+    def __init__(self, backend, ttl: int = ANSWER_CACHE_TTL,
+                 similarity: float = ANSWER_CACHE_SIMILARITY, size: int = ANSWER_CACHE_SIZE):
+        self.backend = backend
+        self.ttl = ttl
+        self.similarity = similarity
+        self.size = size
+
+        self._version = None
+        self._vectors = OrderedDict()  # key -> question embedding
+        self._stats = {"hits": 0, "semantic_hits": 0, "misses": 0, "skipped": 0, "stores": 0, "invalidations": 0}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    def _key(self, question: str, version: str) -> str:
+        raw = json.dumps([version, normalize_query(question).alnum])
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def _current_version(self) -> str:
+        version = context_version()
+        if version != self._version:
+            with self._lock:
+                if self._version is not None and version != self._version:
+                    # Data was rebuilt: drop what this process holds. Old
+                    # Redis keys can no longer be looked up and expire.
+                    if isinstance(self.backend, MemoryBackend):
+                        self.backend.clear()
+                    self._vectors.clear()
+                    self._stats["invalidations"] += 1
+                self._version = version
+        return version
+
+    def _count(self, stat: str):
+        with self._lock:
+            self._stats[stat] += 1
+
+    def _similar_key(self, question: str):
+        if not self.similarity or np is None or not self._vectors:
+            return None
+        vector = VECTOR_STORE.embed(question)
+        if vector is None:
+            return None
+
+        with self._lock:
+            keys = list(self._vectors)
+            matrix = np.stack([self._vectors[k] for k in keys])
+        sims = matrix @ vector
+        best = int(np.argmax(sims))
+        return keys[best] if sims[best] >= self.similarity else None
+
+    def lookup(self, question: str):
+        if not self.enabled:
+            return None
+        if is_follow_up(question):
+            self._count("skipped")
+            return None
+
+        try:
+            key = self._key(question, self._current_version())
+            answer = self.backend.get(key)
+            if answer is not None:
+                self._count("hits")
+                return answer
+
+            similar = self._similar_key(question)
+            if similar is not None:
+                answer = self.backend.get(similar)
+                if answer is not None:
+                    self._count("semantic_hits")
+                    return answer
+
+        except Exception as e:
+            print("Answer cache lookup failed:", e)
+
+        self._count("misses")
+        return None
+
+    def store(self, question: str, answer: str):
+        if not self.enabled or not answer or answer == HIGH_TRAFFIC_MESSAGE:
+            return
+        if is_follow_up(question):
+            return
+
+        try:
+            key = self._key(question, self._current_version())
+            self.backend.set(key, answer, self.ttl)
+            self._count("stores")
+
+            if self.similarity and np is not None:
+                vector = VECTOR_STORE.embed(question)
+                if vector is not None:
+                    with self._lock:
+                        self._vectors[key] = vector
+                        self._vectors.move_to_end(key)
+                        while len(self._vectors) > self.size:
+                            self._vectors.popitem(last=False)
+
+        except Exception as e:
+            print("Answer cache store failed:", e)
+
+    async def alookup(self, question: str):
+        """
+        lookup() for the async request path, run in a worker thread: Redis
+        round trips, the data version check (which may rehash the chunks)
+        and question embeddings all block.
+        """
+        if not self.enabled:
+            return None
+        return await asyncio.to_thread(self.lookup, question)
+
+    async def astore(self, question: str, answer: str):
+        if self.enabled:
+            await asyncio.to_thread(self.store, question, answer)
+
+    def clear(self):
+        if self.enabled:
+            self.backend.clear()
+        with self._lock:
+            self._vectors.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            out = dict(self._stats)
+        lookups = out["hits"] + out["semantic_hits"] + out["misses"]
+        out["backend"] = type(self.backend).__name__ if self.enabled else "off"
+        out["entries"] = len(self.backend) if self.enabled else 0
+        out["hit_ratio"] = round((out["hits"] + out["semantic_hits"]) / lookups, 3) if lookups else 0.0
+        return out
+
+
+ANSWER_CACHE = AnswerCache(make_backend())
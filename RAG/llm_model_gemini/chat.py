@@ -1,9 +1,12 @@
 # rag/chat.py
 
+import asyncio
+
 from llm_model_gemini.retreiver.unified_retriever import retrieve_chunks
-from llm_model_gemini.llm.gemini_client import generate_answer
+from llm_model_gemini.llm.gemini_client import HIGH_TRAFFIC_MESSAGE, agenerate_answer, astream_answer, generate_answer
 from llm_model_gemini.memory.chat_memory import add, get
-from llm_model_gemini.context_builder import build_context
+from llm_model_gemini.context_builder import assemble_context
+from llm_model_gemini.answer_cache import ANSWER_CACHE
 
 def build_rag_context(chunks):
     texts = []
@@ -26,29 +29,109 @@ def build_rag_context(chunks):
                 if isinstance(item, str):
                     texts.append(item)
 
-    return "\n".join(texts)
+    # The same chunk text can come back more than once; send it once.
+    return "\n".join(dict.fromkeys(texts))
 
-def chat(user_query: str):
-    add("user", user_query)
+def _direct_reply(user_query: str, session_id: str = None):
+    add("user", user_query, session_id)
 
     if "syllabus" in user_query.lower() or "pdf" in user_query.lower():
         reply = (
             "For the complete and official syllabus, please visit:\n\n"
             "https://www.niet.co.in/academics/syllabus"
         )
-        add("assistant", reply)
+        add("assistant", reply, session_id)
         return reply
+    return None
+
+
+def _prompt_args(user_query: str, session_id: str, cached):
+    if cached is not None:
+        add("assistant", cached, session_id)
+        return cached, None
 
-    data_context = build_context()
+    data_context, _ = assemble_context(user_query)
 
     chunks = retrieve_chunks(user_query, top_k=3)
     rag_context = build_rag_context(chunks) if chunks else ""
 
-    final_context = data_context
-    if rag_context:
-        final_context += "\n\nADDITIONAL INFORMATION:\n" + rag_context
+    return None, (data_context, user_query, get(session_id), rag_context)
+
+
+def _remember_reply(reply: str, session_id: str = None):
+    # The busy answer is not part of the conversation: keeping it would
+    # pollute the history the next prompt (and its coalesce key) is built from.
+    if reply != HIGH_TRAFFIC_MESSAGE:
+        add("assistant", reply, session_id)
+
+
+def prepare_chat(user_query: str, session_id: str = None):
+    """
+    Everything chat() does before the LLM call. Returns (reply, None) when
+    the question can be answered directly, otherwise (None, prompt_args)
+    for generate_answer / agenerate_answer. History is read from and
+    written to the caller's session only.
+    """
+    reply = _direct_reply(user_query, session_id)
+    if reply is not None:
+        return reply, None
+    return _prompt_args(user_query, session_id, ANSWER_CACHE.lookup(user_query))
+
+
+async def aprepare_chat(user_query: str, session_id: str = None):
+    """
+    prepare_chat() for the async path: the answer cache lookup, context
+    assembly and retrieval (which may load and run the embedding model)
+    happen in worker threads, not on the event loop.
+    """
+    reply = _direct_reply(user_query, session_id)
+    if reply is not None:
+        return reply, None
+    cached = await ANSWER_CACHE.alookup(user_query)
+    return await asyncio.to_thread(_prompt_args, user_query, session_id, cached)
+
+
+def chat(user_query: str, session_id: str = None):
+    reply, prompt_args = prepare_chat(user_query, session_id)
+    if prompt_args is None:
+        return reply
 
-    reply = generate_answer(final_context, user_query, get())
+    reply = generate_answer(*prompt_args)
+    ANSWER_CACHE.store(user_query, reply)
 
-    add("assistant", reply)
+    _remember_reply(reply, session_id)
     return reply
+
+
+async def achat(user_query: str, session_id: str = None):
+    reply, prompt_args = await aprepare_chat(user_query, session_id)
+    if prompt_args is None:
+        return reply
+
+    reply = await agenerate_answer(*prompt_args)
+    await ANSWER_CACHE.astore(user_query, reply)
+
+    _remember_reply(reply, session_id)
+    return reply
+
+
+async def astream_chat(user_query: str, session_id: str = None):
+    """
+    achat() that yields the reply piece by piece as the LLM produces it.
+    The reply is cached and remembered only once the stream has finished:
+    astream_answer raises when it breaks off midway, and a client that
+    goes away stops this generator before that point.
+    """
+    reply, prompt_args = await aprepare_chat(user_query, session_id)
+    if prompt_args is None:
+        yield reply
+        return
+
+    parts = []
+    async for token in astream_answer(*prompt_args):
+        parts.append(token)
+        yield token
+
+    reply = "".join(parts).strip()
+    await ANSWER_CACHE.astore(user_query, reply)
+    _remember_reply(reply, session_id)
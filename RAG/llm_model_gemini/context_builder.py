@@ -1,7 +1,60 @@
+import hashlib
 import json
 import os
+import threading
+from pathlib import Path
+
+from llm_model_gemini.retreiver.unified_retriever import detect_source
+from llm_model_gemini.token_counter import count_tokens
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+DATA_DIR = BASE_DIR / "data"
+
+CONTEXT_FILES = [
+    "admission_data.json",
+    "course_data.json",
+    "facility_data.json",
+    "club_data.json",
+    "overview_research_data.json",
+]
+
+# Sections sent for each intent reported by detect_source, in priority
+# order. Anything not listed is pruned from the prompt.
+SOURCE_SECTIONS = {
+    "general": ["about", "courses", "facilities"],
+    "course": ["courses", "about"],
+    "admission": ["admission", "courses"],
+    "club": ["clubs", "about"],
+    "event": ["about"],
+    "facility": ["facilities", "about"],
+    "overview": ["about"],
+}
+# Unclassified queries ("what is the fee") are most often about admission
+# and courses, so those are kept first when the budget runs out.
+ALL_SECTIONS = ["admission", "courses", "about", "facilities", "clubs"]
+
+SECTION_ORDER = ["about", "admission", "courses", "facilities", "clubs"]
+
+# Upper bound on context tokens per prompt; the default fits every section
+# of the current data. Set CONTEXT_PRUNING=0 to send the whole static
+# context as before.
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "2500"))
+CONTEXT_PRUNING = os.getenv("CONTEXT_PRUNING", "1") != "0"
+
+# Precomputed context written by `python -m llm_model_gemini.context_builder`
+# or at startup, and loaded at boot. Requests never write it.
+CONTEXT_ARTIFACT = DATA_DIR / "static_context.json"
+# Bumped whenever the artifact layout changes; other versions are rebuilt.
+CONTEXT_ARTIFACT_VERSION = 2
+
+_cache = {
+    "stats": None,
+    "fingerprint": None,
+    "context": None,
+    "sections": None,
+}
+_lock = threading.Lock()
 
-DATA_DIR = "data"
 
 def load_json(filename):
     path = os.path.join(DATA_DIR, filename)
@@ -9,62 +62,240 @@ def load_json(filename):
         return json.load(f)
 
 
-def build_context():
+def _file_stats():
+    stats = []
+    for name in CONTEXT_FILES:
+        try:
+            st = os.stat(DATA_DIR / name)
+            stats.append((name, st.st_mtime_ns, st.st_size))
+        except OSError:
+            stats.append((name, None, None))
+    return tuple(stats)
+
+
+def _content_hash():
+    h = hashlib.sha256()
+    for name in CONTEXT_FILES:
+        h.update(name.encode("utf-8"))
+        try:
+            with open(DATA_DIR / name, "rb") as f:
+                h.update(f.read())
+        except OSError:
+            h.update(b"<missing>")
+    return h.hexdigest()
+
+
+def render_sections():
     admission = load_json("admission_data.json")
     courses = load_json("course_data.json")
     facilities = load_json("facility_data.json")
     clubs = load_json("club_data.json")
     overview_research = load_json("overview_research_data.json")
 
-    context = []
+    context = {name: [] for name in SECTION_ORDER}
 
     # --- ABOUT NIET ---
-    context.append("ABOUT NIET:")
+    context["about"].append("ABOUT NIET:")
     if isinstance(overview_research, dict):
         for k, v in overview_research.items():
-            context.append(f"{k.replace('_', ' ').title()}: {v}")
+            context["about"].append(f"{k.replace('_', ' ').title()}: {v}")
 
     # --- ADMISSION ---
-    context.append("\nADMISSION INFORMATION:")
+    context["admission"].append("\nADMISSION INFORMATION:")
     if isinstance(admission, dict):
         for k, v in admission.items():
-            context.append(f"- {k.replace('_', ' ').title()}: {v}")
+            context["admission"].append(f"- {k.replace('_', ' ').title()}: {v}")
 
     # --- COURSES ---
-    context.append("\nCOURSES OFFERED:")
+    context["courses"].append("\nCOURSES OFFERED:")
     if isinstance(courses, dict):
         for value in courses.values():
             if isinstance(value, list):
                 for course in value:
                     if isinstance(course, dict):
-                        context.append(
+                        context["courses"].append(
                             f"- {course.get('course_name', '')}: {course.get('overview', '')}"
                         )
             elif isinstance(value, dict):
-                context.append(
+                context["courses"].append(
                     f"- {value.get('course_name', '')}: {value.get('overview', '')}"
                 )
 
     # --- FACILITIES ---
-    context.append("\nFACILITIES:")
+    context["facilities"].append("\nFACILITIES:")
     if isinstance(facilities, dict):
         for value in facilities.values():
             if isinstance(value, list):
                 for f in value:
                     if isinstance(f, dict):
-                        context.append(f"- {f.get('name', '')}")
+                        context["facilities"].append(f"- {f.get('name', '')}")
             elif isinstance(value, dict):
-                context.append(f"- {value.get('name', '')}")
+                context["facilities"].append(f"- {value.get('name', '')}")
 
     # --- CLUBS ---
-    context.append("\nSTUDENT CLUBS:")
+    context["clubs"].append("\nSTUDENT CLUBS:")
     if isinstance(clubs, dict):
         for value in clubs.values():
             if isinstance(value, list):
                 for c in value:
                     if isinstance(c, dict):
-                        context.append(f"- {c.get('name', '')}")
+                        context["clubs"].append(f"- {c.get('name', '')}")
             elif isinstance(value, dict):
-                context.append(f"- {value.get('name', '')}")
+                context["clubs"].append(f"- {value.get('name', '')}")
+
+    return {name: "\n".join(lines) for name, lines in context.items()}
+
+
+def save_context_artifact(path=CONTEXT_ARTIFACT):
+    try:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({
+                "version": CONTEXT_ARTIFACT_VERSION,
+                "fingerprint": _cache["fingerprint"],
+                "sections": _cache["sections"],
+            }, f, ensure_ascii=False)
+    except OSError as e:
+        print("Failed to write context artifact:", e)
+
+
+def load_context_artifact(path=CONTEXT_ARTIFACT) -> bool:
+    """
+    Seed the cache from a precomputed artifact. Ignored if it was written
+    in another format or the data files no longer match the fingerprint
+    it was built from.
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            artifact = json.load(f)
+    except (OSError, ValueError):
+        return False
+
+    if not isinstance(artifact, dict) or artifact.get("version") != CONTEXT_ARTIFACT_VERSION:
+        print(f"Ignoring context artifact {path}: unknown format")
+        return False
+    sections = artifact.get("sections")
+    if (not isinstance(sections, dict)
+            or any(not isinstance(sections.get(name), str) for name in SECTION_ORDER)):
+        print(f"Ignoring context artifact {path}: unknown format")
+        return False
+
+    with _lock:
+        stats = _file_stats()
+        if artifact.get("fingerprint") != _content_hash():
+            return False
+
+        _cache["stats"] = stats
+        _cache["fingerprint"] = artifact["fingerprint"]
+        _cache["sections"] = sections
+        _cache["context"] = "\n".join(sections[name] for name in SECTION_ORDER)
+        return True
+
+
+def context_fingerprint() -> str:
+    """
+    Content hash of the data files the current context was built from.
+    """
+    build_context()
+    return _cache["fingerprint"]
+
+
+def _refresh():
+    stats = _file_stats()
+    if stats == _cache["stats"]:
+        return
+
+    with _lock:
+        if stats != _cache["stats"]:
+            fingerprint = _content_hash()
+            if fingerprint != _cache["fingerprint"]:
+                sections = render_sections()
+                _cache["sections"] = sections
+                _cache["context"] = "\n".join(sections[name] for name in SECTION_ORDER)
+                _cache["fingerprint"] = fingerprint
+            _cache["stats"] = stats
+
+
+def build_context():
+    """
+    Static institute context, rebuilt only when a data file changes.
+    A cheap stat check runs per call; files are hashed only when their
+    mtime or size moved, and re-rendered only when the content differs.
+    """
+    _refresh()
+    return _cache["context"]
+
+
+def build_sections():
+    _refresh()
+    return _cache["sections"]
+
+
+def _trim_to_budget(text: str, budget: int) -> str:
+    """
+    Keep whole lines from the top of a section until the budget is hit.
+    """
+    kept = []
+    used = 0
+    for line in text.split("\n"):
+        cost = count_tokens(line) + 1
+        if used + cost > budget:
+            break
+        kept.append(line)
+        used += cost
+    return "\n".join(kept)
+
+
+def assemble_context(query: str, budget: int = None, pruning: bool = None):
+    """
+    Pick the context sections relevant to the query's intent and fit them
+    into a token budget.
+
+    Returns (context, report) where report lists the detected source, the
+    tokens used per section and the sections that were dropped or trimmed.
+    """
+    budget = CONTEXT_TOKEN_BUDGET if budget is None else budget
+    pruning = CONTEXT_PRUNING if pruning is None else pruning
+
+    sections = build_sections()
+    source = detect_source(query or "") if pruning else "all"
+    wanted = SOURCE_SECTIONS.get(source, ALL_SECTIONS)
+
+    report = {"source": source, "budget": budget, "sections": {}, "trimmed": [], "dropped": []}
+
+    remaining = budget
+    chosen = {}
+    for name in wanted:
+        text = sections.get(name, "").strip("\n")
+        if not text:
+            continue
+
+        tokens = count_tokens(text)
+        if pruning and tokens > remaining:
+            text = _trim_to_budget(text, remaining)
+            if not text or text.count("\n") == 0:
+                report["dropped"].append(name)
+                continue
+            report["trimmed"].append(name)
+            tokens = count_tokens(text)
+
+        chosen[name] = text
+        report["sections"][name] = tokens
+        remaining -= tokens
+
+    for name in SECTION_ORDER:
+        if name not in wanted and sections.get(name):
+            report["dropped"].append(name)
+
+    # Keep the canonical section order so the same intent always produces
+    # byte-identical context.
+    context = "\n\n".join(chosen[name] for name in SECTION_ORDER if name in chosen)
+    report["total"] = sum(report["sections"].values())
+    return context, report
+
 
-    return "\n".join(context)
+if __name__ == "__main__":
+    build_context()
+    save_context_artifact()
+    print(f"Wrote {CONTEXT_ARTIFACT} ({len(_cache['context'])} chars)")
+    for name, text in _cache["sections"].items():
+        print(f"  {name}: {count_tokens(text)} tokens")
@@ -0,0 +1,153 @@
+# rag/llm/circuit_breaker.py
+
+import os
+import threading
+import time
+from collections import deque
+
+# Rolling window the error and slow-call rates are computed over.
+BREAKER_WINDOW = float(os.getenv("BREAKER_WINDOW", "60"))
+# The breaker never trips on fewer calls than this in the window.
+BREAKER_MIN_CALLS = int(os.getenv("BREAKER_MIN_CALLS", "5"))
+# Trip when this share of calls in the window failed...
+BREAKER_ERROR_RATE = float(os.getenv("BREAKER_ERROR_RATE", "0.5"))
+# ...or took longer than BREAKER_SLOW_CALL seconds.
+BREAKER_SLOW_CALL = float(os.getenv("BREAKER_SLOW_CALL", "10"))
+BREAKER_SLOW_RATE = float(os.getenv("BREAKER_SLOW_RATE", "0.8"))
+# Seconds an open breaker waits before letting a single probe through.
+BREAKER_COOLDOWN = float(os.getenv("BREAKER_COOLDOWN", "30"))
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Per-provider breaker over a rolling window of call outcomes.
+
+    closed    - calls flow; trips to open when the error or slow-call
+                rate in the window crosses its threshold
+    open      - calls are refused until the cooldown has passed
+    half_open - one probe call is let through; success closes the
+                breaker, failure opens it for another cooldown
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.trips = 0
+        self._calls = deque()  # (finished at, ok, latency)
+        self._probe = False
+        self._lock = threading.Lock()
+
+    def _prune(self, now: float):
+        while self._calls and now - self._calls[0][0] > BREAKER_WINDOW:
+            self._calls.popleft()
+
+    def _rates(self):
+        n = len(self._calls)
+        if not n:
+            return 0.0, 0.0
+        errors = sum(1 for _, ok, _ in self._calls if not ok)
+        slow = sum(1 for _, _, latency in self._calls if latency >= BREAKER_SLOW_CALL)
+        return errors / n, slow / n
+
+    def _open(self, now: float, reason: str):
+        self.state = OPEN
+        self.opened_at = now
+        self.trips += 1
+        self._probe = False
+        print(f"Circuit breaker for {self.name} opened ({reason})")
+
+    def allow(self) -> bool:
+        """
+        Whether a call may be sent now. In half-open state this claims the
+        single probe slot, so callers must follow up with record() or
+        release().
+        """
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+
+            if self.state == OPEN:
+                if time.monotonic() - self.opened_at < BREAKER_COOLDOWN:
+                    return False
+                self.state = HALF_OPEN
+
+            if self._probe:
+                return False
+            self._probe = True
+            return True
+
+    def release(self):
+        """
+        Give back a probe slot whose call was cancelled before finishing.
+        """
+        with self._lock:
+            self._probe = False
+
+    def record(self, ok: bool, latency: float):
+        with self._lock:
+            now = time.monotonic()
+
+            if self.state == HALF_OPEN:
+                self._probe = False
+                if ok and latency < BREAKER_SLOW_CALL:
+                    self.state = CLOSED
+                    self._calls.clear()
+                    print(f"Circuit breaker for {self.name} closed")
+                else:
+                    self._open(now, "probe failed")
+                return
+
+            if self.state == OPEN:
+                return
+
+            self._calls.append((now, ok, latency))
+            self._prune(now)
+            if len(self._calls) < BREAKER_MIN_CALLS:
+                return
+
+            error_rate, slow_rate = self._rates()
+            if error_rate >= BREAKER_ERROR_RATE:
+                self._open(now, f"error rate {error_rate:.0%}")
+            elif slow_rate >= BREAKER_SLOW_RATE:
+                self._open(now, f"slow-call rate {slow_rate:.0%}")
+
+    def health(self) -> dict:
+        with self._lock:
+            now = time.monotonic()
+            self._prune(now)
+            error_rate, slow_rate = self._rates()
+            latencies = [latency for _, ok, latency in self._calls if ok]
+            retry_in = None
+            if self.state == OPEN:
+                retry_in = round(max(BREAKER_COOLDOWN - (now - self.opened_at), 0.0), 1)
+            return {
+                "state": self.state,
+                "calls": len(self._calls),
+                "error_rate": round(error_rate, 3),
+                "slow_rate": round(slow_rate, 3),
+                "avg_latency": round(sum(latencies) / len(latencies), 3) if latencies else None,
+                "trips": self.trips,
+                "retry_in": retry_in,
+            }
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def breaker(name: str) -> CircuitBreaker:
+    with _breakers_lock:
+        if name not in _breakers:
+            _breakers[name] = CircuitBreaker(name)
+        return _breakers[name]
+
+
+def breaker_health() -> dict:
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {b.name: b.health() for b in breakers}
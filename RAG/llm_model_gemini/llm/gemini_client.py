@@ -1,9 +1,25 @@
 # rag/llm/gemini_client.py
 
+import asyncio
 import os
+import threading
+import time
 from dotenv import load_dotenv
 from google import genai
-from openai import OpenAI
+from google.genai import types
+from openai import AsyncOpenAI, OpenAI
+
+from llm_model_gemini.llm.circuit_breaker import breaker
+from llm_model_gemini.llm.prompt_assembly import PromptAssembly
+from llm_model_gemini.llm.prompt_metrics import record_prompt_breakdown, record_prompt_usage
+from llm_model_gemini.llm.provider_orchestrator import Provider, orchestrate
+from llm_model_gemini.llm.request_coalescer import (
+    SINGLE_FLIGHT,
+    ProviderBusy,
+    coalesce_key,
+    provider_gate,
+    retry_after,
+)
 load_dotenv()
 
 # TEST_MODE = True        
@@ -18,7 +34,36 @@ client = genai.Client(
 openai_client = OpenAI(
     api_key=os.getenv("OPENAI_API_KEY")
 )
+async_openai_client = AsyncOpenAI(
+    api_key=os.getenv("OPENAI_API_KEY")
+)
 MODEL = "models/gemini-2.0-flash-lite"
+OPENAI_MODEL = "gpt-4.1-mini"
+GEMINI_MODEL = "models/gemini-2.5-flash-lite"
+
+# Optional explicit Gemini context cache for the system prefix. Implicit
+# caching already applies to 2.5 models; this pins it for GEMINI_CACHE_TTL.
+GEMINI_EXPLICIT_CACHE = os.getenv("GEMINI_EXPLICIT_CACHE", "0") == "1"
+GEMINI_CACHE_TTL = int(os.getenv("GEMINI_CACHE_TTL", "3600"))
+
+# Per-provider hard timeout (seconds) and output-token cap (0 = uncapped).
+# The order providers are tried in and the hedging policy live in
+# provider_orchestrator (PROVIDER_POLICY, HEDGE_DELAY).
+OPENAI_TIMEOUT = float(os.getenv("OPENAI_TIMEOUT", "20"))
+GEMINI_TIMEOUT = float(os.getenv("GEMINI_TIMEOUT", "20"))
+OPENAI_MAX_TOKENS = int(os.getenv("OPENAI_MAX_TOKENS", "0")) or None
+GEMINI_MAX_TOKENS = int(os.getenv("GEMINI_MAX_TOKENS", "0")) or None
+
+# Registered up front so /health and /metrics list both providers from boot.
+for _provider in ("openai", "gemini"):
+    breaker(_provider)
+    provider_gate(_provider)
+
+HIGH_TRAFFIC_MESSAGE = (
+    "Our system is currently experiencing high traffic. "
+    "Please try again in a few minutes or visit our website: "
+    "https://www.niet.co.in/"
+)
 
 def is_detailed_query(question: str) -> bool:
     q = question.lower()
@@ -35,13 +80,11 @@ def is_detailed_query(question: str) -> bool:
         "complete information"
     ])
 
-def build_prompt(context: str, question: str, history: list) -> str:
-    history_text = "\n".join(
-        f"{h['role']}: {h['content']}" for h in history
-    )
-
-    return f"""
-You are a friendly, professional admission counsellor and assistant for NIET.
+# Everything that is the same for every request: instructions and
+# leadership info. It is sent first and must stay byte-identical between
+# calls so provider-side prefix caching (OpenAI automatic prompt caching,
+# Gemini implicit/explicit caching) can reuse it.
+SYSTEM_PROMPT = """You are a friendly, professional admission counsellor and assistant for NIET.
 
 TONE & STYLE:
 - Be warm, clear, and human-like (not robotic).
@@ -256,9 +299,6 @@ or
 8. Do NOT mention internal rules or data sources.
 
 if use ask about director, chairperson, related to director give this answer according to given data
-Available Information (use only this):
-
-{context}
 
 OFFICIAL NIET LEADERSHIP INFORMATION
 
@@ -410,52 +450,356 @@ If relevant information is NOT present in the context, reply exactly:
 FORMAT:
 - Start with a clear one-line answer.
 - Follow with 3–5 concise supporting points.
+"""
 
-Conversation History:
-{history_text}
 
-Available Information (use only this):
-{context}
+def assemble_prompt(context: str, question: str, history: list, rag_context: str = "") -> PromptAssembly:
+    """
+    The full prompt as ordered blocks. The intent-specific institute context
+    comes right after the system prefix (it repeats across requests with the
+    same intent), then the parts that change every time: retrieved chunks,
+    history and question.
+    """
+    history_text = "\n".join(
+        f"{h['role']}: {h['content']}" for h in history
+    )
 
-User Question:
-{question}
+    return (
+        PromptAssembly()
+        .add("instructions", SYSTEM_PROMPT)
+        .add("context", context, "Available Information (use only this):")
+        .add("rag_chunks", rag_context, "ADDITIONAL INFORMATION:")
+        .add("history", history_text, "Conversation History:")
+        .add("question", f"{question}\n\nFinal Answer (human, clear, and helpful):", "User Question:")
+    )
 
-Final Answer (human, clear, and helpful):
-"""
 
-def generate_answer(context: str, question: str, history: list):
-    prompt = build_prompt(context, question, history)
+def build_user_prompt(context: str, question: str, history: list, rag_context: str = "") -> str:
+    return assemble_prompt(context, question, history, rag_context).user
+
+
+def build_prompt(context: str, question: str, history: list, rag_context: str = "") -> str:
+    prompt = assemble_prompt(context, question, history, rag_context)
+    return prompt.system + "\n" + prompt.user
 
-    try:
-        completion = openai_client.chat.completions.create(
-            model="gpt-4.1-mini",
-            messages=[
-                {"role": "system", "content": "You are a helpful NIET admission assistant."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.2
-        )
-
-        answer = completion.choices[0].message.content.strip()
-        return answer
 
-    except Exception as openai_error:
-        print("OpenAI failed:", openai_error)
+_gemini_cache = {"name": None, "expires": 0.0}
+_gemini_cache_lock = threading.Lock()
 
+
+def gemini_cache_stale() -> bool:
+    return GEMINI_EXPLICIT_CACHE and time.monotonic() >= _gemini_cache["expires"]
+
+
+def refresh_gemini_cache():
+    """
+    (Re)create the explicit Gemini context cache if it expired. This is a
+    blocking network call: run it at startup, on the sync path, or through
+    asyncio.to_thread. A refresh already running elsewhere is not waited
+    for; the caller sends the system prompt uncached meanwhile.
+    """
+    if not gemini_cache_stale() or not _gemini_cache_lock.acquire(blocking=False):
+        return
+    try:
+        now = time.monotonic()
+        if now < _gemini_cache["expires"]:
+            return
         try:
-            response = client.models.generate_content(
-                model="models/gemini-2.5-flash-lite",
-                contents=prompt
+            cache = client.caches.create(
+                model=GEMINI_MODEL,
+                config=types.CreateCachedContentConfig(
+                    system_instruction=SYSTEM_PROMPT,
+                    ttl=f"{GEMINI_CACHE_TTL}s",
+                ),
             )
+            _gemini_cache["name"] = cache.name
+            # Renew a minute early so we never reference an expired cache.
+            _gemini_cache["expires"] = now + max(GEMINI_CACHE_TTL - 60, 60)
+        except Exception as e:
+            print("Gemini context cache unavailable:", e)
+            _gemini_cache["name"] = None
+            _gemini_cache["expires"] = now + 300
+    finally:
+        _gemini_cache_lock.release()
+
+
+async def arefresh_gemini_cache():
+    if gemini_cache_stale():
+        await asyncio.to_thread(refresh_gemini_cache)
+
+
+def gemini_config(max_tokens: int = None, timeout: float = None):
+    """
+    Request config for the current cache state; never calls the network.
+    """
+    if GEMINI_EXPLICIT_CACHE and _gemini_cache["name"] and time.monotonic() < _gemini_cache["expires"]:
+        config = types.GenerateContentConfig(cached_content=_gemini_cache["name"])
+    else:
+        config = types.GenerateContentConfig(system_instruction=SYSTEM_PROMPT)
+    if max_tokens:
+        config.max_output_tokens = max_tokens
+    if timeout:
+        config.http_options = types.HttpOptions(timeout=int(timeout * 1000))
+    return config
+
+
+def record_openai_usage(completion):
+    usage = getattr(completion, "usage", None)
+    if usage is None:
+        return
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached = getattr(details, "cached_tokens", 0) if details else 0
+    record_prompt_usage("openai", usage.prompt_tokens or 0, cached or 0)
+
+
+def record_gemini_usage(response):
+    usage = getattr(response, "usage_metadata", None)
+    if usage is None:
+        return
+    record_prompt_usage(
+        "gemini",
+        usage.prompt_token_count or 0,
+        usage.cached_content_token_count or 0,
+    )
+
 
-            answer = response.text.strip()
-            return answer
+def openai_messages(prompt: PromptAssembly) -> list:
+    return [
+        {"role": "system", "content": prompt.system},
+        {"role": "user", "content": prompt.user}
+    ]
 
-        except Exception as gemini_error:
-            print("Gemini also failed:", gemini_error)
 
-            return (
-                "Our system is currently experiencing high traffic. "
-                "Please try again in a few minutes or visit our website: "
-                "https://www.niet.co.in/"
-            )
\ No newline at end of file
+def openai_limits(max_tokens: int = None, timeout: float = None) -> dict:
+    limits = {}
+    if max_tokens:
+        limits["max_tokens"] = max_tokens
+    if timeout:
+        limits["timeout"] = timeout
+    return limits
+
+
+def _openai_answer_sync(prompt: PromptAssembly) -> str:
+    completion = openai_client.chat.completions.create(
+        model=OPENAI_MODEL,
+        messages=openai_messages(prompt),
+        temperature=0.2,
+        **openai_limits(OPENAI_MAX_TOKENS, OPENAI_TIMEOUT)
+    )
+    record_openai_usage(completion)
+    return completion.choices[0].message.content.strip()
+
+
+def _gemini_answer_sync(prompt: PromptAssembly) -> str:
+    refresh_gemini_cache()
+    response = client.models.generate_content(
+        model=GEMINI_MODEL,
+        contents=prompt.user,
+        config=gemini_config(GEMINI_MAX_TOKENS, GEMINI_TIMEOUT)
+    )
+    record_gemini_usage(response)
+    return response.text.strip()
+
+
+def _call_sync(name: str, call, prompt: PromptAssembly) -> str:
+    """
+    One sync provider call through the provider's concurrency gate; a 429
+    pauses the provider and is raised as ProviderBusy.
+    """
+    gate = provider_gate(name)
+    with gate.slot():
+        try:
+            return call(prompt)
+        except Exception as e:
+            delay = retry_after(e)
+            if delay is None:
+                raise
+            gate.rate_limited(delay)
+            raise ProviderBusy(f"{name} rate limited") from e
+
+
+def _generate(prompt: PromptAssembly) -> str:
+    record_prompt_breakdown(prompt.token_report())
+
+    # OpenAI first, then Gemini; a provider whose breaker is open is not
+    # called at all, and a busy one is passed over without waiting.
+    for name, call in (("openai", _openai_answer_sync), ("gemini", _gemini_answer_sync)):
+        provider_breaker = breaker(name)
+        if not provider_breaker.allow():
+            print(f"{name} circuit open, skipping")
+            continue
+
+        started = time.monotonic()
+        try:
+            answer = _call_sync(name, call, prompt)
+        except ProviderBusy as e:
+            provider_breaker.release()
+            print(e)
+            continue
+        except Exception as e:
+            provider_breaker.record(False, time.monotonic() - started)
+            print(f"{name} failed:", e)
+            continue
+
+        provider_breaker.record(True, time.monotonic() - started)
+        return answer
+
+    return HIGH_TRAFFIC_MESSAGE
+
+
+def generate_answer(context: str, question: str, history: list, rag_context: str = ""):
+    """
+    Identical questions asked while one is already being answered (same
+    normalized question, context and history) share its upstream call.
+    """
+    prompt = assemble_prompt(context, question, history, rag_context)
+    key = coalesce_key(question, context, history, rag_context)
+    return SINGLE_FLIGHT.do(key, lambda: _generate(prompt))
+
+
+async def _openai_answer(prompt: PromptAssembly, max_tokens: int = None) -> str:
+    completion = await async_openai_client.chat.completions.create(
+        model=OPENAI_MODEL,
+        messages=openai_messages(prompt),
+        temperature=0.2,
+        **openai_limits(max_tokens)
+    )
+    record_openai_usage(completion)
+    return completion.choices[0].message.content
+
+
+async def _gemini_answer(prompt: PromptAssembly, max_tokens: int = None) -> str:
+    await arefresh_gemini_cache()
+    response = await client.aio.models.generate_content(
+        model=GEMINI_MODEL,
+        contents=prompt.user,
+        config=gemini_config(max_tokens)
+    )
+    record_gemini_usage(response)
+    return response.text
+
+
+def providers_for(prompt: PromptAssembly) -> list:
+    """
+    The providers in preference order, bound to one prompt.
+    """
+    return [
+        Provider("openai", lambda n: _openai_answer(prompt, n), OPENAI_TIMEOUT, OPENAI_MAX_TOKENS),
+        Provider("gemini", lambda n: _gemini_answer(prompt, n), GEMINI_TIMEOUT, GEMINI_MAX_TOKENS),
+    ]
+
+
+async def agenerate_answer(context: str, question: str, history: list, rag_context: str = ""):
+    """
+    Non-blocking generate_answer for the async request path: the worker
+    is free to serve other chats while waiting on the provider. Providers
+    are combined according to PROVIDER_POLICY (sequential, hedged, race),
+    and identical in-flight questions share one call as in generate_answer.
+    """
+    prompt = assemble_prompt(context, question, history, rag_context)
+    key = coalesce_key(question, context, history, rag_context)
+    return await SINGLE_FLIGHT.ado(key, lambda: _agenerate(prompt))
+
+
+async def _agenerate(prompt: PromptAssembly) -> str:
+    record_prompt_breakdown(prompt.token_report())
+
+    _, answer = await orchestrate(providers_for(prompt))
+    return answer or HIGH_TRAFFIC_MESSAGE
+
+
+async def _openai_stream(prompt: PromptAssembly):
+    stream = await async_openai_client.chat.completions.create(
+        model=OPENAI_MODEL,
+        messages=openai_messages(prompt),
+        temperature=0.2,
+        stream=True,
+        stream_options={"include_usage": True},
+        **openai_limits(OPENAI_MAX_TOKENS, OPENAI_TIMEOUT)
+    )
+    async for chunk in stream:
+        if chunk.usage is not None:
+            record_openai_usage(chunk)
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
+
+
+async def _gemini_stream(prompt: PromptAssembly):
+    await arefresh_gemini_cache()
+    stream = await client.aio.models.generate_content_stream(
+        model=GEMINI_MODEL,
+        contents=prompt.user,
+        config=gemini_config(GEMINI_MAX_TOKENS, GEMINI_TIMEOUT)
+    )
+    usage = None
+    async for chunk in stream:
+        usage = chunk if getattr(chunk, "usage_metadata", None) else usage
+        if chunk.text:
+            yield chunk.text
+    if usage is not None:
+        record_gemini_usage(usage)
+
+
+async def _breaker_stream(name: str, stream):
+    """
+    Pass a provider stream through, reporting its time to first token (or
+    its failure) to the provider's breaker.
+    """
+    provider_breaker = breaker(name)
+    started = time.monotonic()
+    first_token = None
+    finished = False
+    try:
+        async for text in stream:
+            if first_token is None:
+                first_token = time.monotonic() - started
+            yield text
+        finished = True
+        provider_breaker.record(True, first_token if first_token is not None else time.monotonic() - started)
+    except Exception:
+        finished = True
+        provider_breaker.record(False, time.monotonic() - started)
+        raise
+    finally:
+        # Client went away mid-stream: neither a success nor a failure.
+        if not finished:
+            provider_breaker.release()
+
+
+async def astream_answer(context: str, question: str, history: list, rag_context: str = ""):
+    """
+    Yield answer text as the provider generates it. Falls back to the
+    Gemini stream only if OpenAI fails before sending anything, and skips
+    a provider whose breaker is open or that is busy. A failure after text
+    was sent is raised, so callers can tell a cut-off answer from a full
+    one. Streams are not
+    shared between callers, but each holds a slot of its provider's gate.
+    """
+    prompt = assemble_prompt(context, question, history, rag_context)
+    record_prompt_breakdown(prompt.token_report())
+
+    sent = False
+    for name, open_stream in (("openai", _openai_stream), ("gemini", _gemini_stream)):
+        if not breaker(name).allow():
+            print(f"{name} circuit open, skipping")
+            continue
+
+        gate = provider_gate(name)
+        try:
+            async with gate.aslot():
+                async for text in _breaker_stream(name, open_stream(prompt)):
+                    sent = True
+                    yield text
+            return
+        except ProviderBusy as e:
+            breaker(name).release()
+            print(e)
+        except Exception as e:
+            print(f"{name} stream failed:", e)
+            delay = retry_after(e)
+            if delay is not None:
+                gate.rate_limited(delay)
+            if sent:
+                raise
+
+    yield HIGH_TRAFFIC_MESSAGE
@@ -0,0 +1,64 @@
+# rag/llm/prompt_assembly.py
+
+from llm_model_gemini.token_counter import count_tokens
+
+# Blocks in the order they are sent. "instructions" is the system prefix,
+# the rest make up the user message.
+BLOCK_ORDER = ["instructions", "context", "rag_chunks", "history", "question"]
+
+
+class PromptAssembly:
+    """
+    Ordered prompt blocks. Each block may be added once, and a block whose
+    text repeats an earlier block is sent empty, so a piece of context can
+    never appear twice in one prompt.
+    """
+
+    def __init__(self):
+        self.blocks = {}
+
+    def add(self, name: str, text: str, heading: str = None):
+        if name not in BLOCK_ORDER:
+            raise ValueError(f"Unknown prompt block: {name}")
+        if name in self.blocks:
+            raise ValueError(f"Prompt block added twice: {name}")
+
+        text = text or ""
+        if text.strip():
+            for other, (_, other_text) in self.blocks.items():
+                if other_text.strip() == text.strip():
+                    print(f"Prompt block {name} repeats {other}; sending it once")
+                    text = ""
+                    break
+
+        self.blocks[name] = (heading, text)
+        return self
+
+    def render(self, name: str) -> str:
+        heading, text = self.blocks.get(name, (None, ""))
+        if heading is None:
+            return text
+        return f"{heading}\n{text}"
+
+    @property
+    def system(self) -> str:
+        return self.render("instructions")
+
+    @property
+    def user(self) -> str:
+        return "\n\n".join(self.render(name) for name in BLOCK_ORDER[1:] if self._sent(name))
+
+    def _sent(self, name: str) -> bool:
+        # Optional blocks are left out entirely when empty.
+        if name not in self.blocks:
+            return False
+        return name != "rag_chunks" or bool(self.blocks[name][1].strip())
+
+    def token_report(self) -> dict:
+        """
+        Tokens per block as rendered, plus the total.
+        """
+        report = {name: count_tokens(self.render(name)) if self._sent(name) else 0
+                  for name in BLOCK_ORDER}
+        report["total"] = sum(report.values())
+        return report
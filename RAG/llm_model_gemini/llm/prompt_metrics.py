@@ -0,0 +1,63 @@
+# rag/llm/prompt_metrics.py
+
+import threading
+
+_stats = {}
+_breakdown = {"prompts": 0, "tokens": {}}
+_lock = threading.Lock()
+
+
+def record_prompt_usage(provider: str, prompt_tokens: int, cached_tokens: int):
+    """
+    Track cached vs uncached prompt tokens reported by the provider.
+    """
+    with _lock:
+        s = _stats.setdefault(provider, {
+            "calls": 0,
+            "prompt_tokens": 0,
+            "cached_tokens": 0,
+        })
+        s["calls"] += 1
+        s["prompt_tokens"] += prompt_tokens
+        s["cached_tokens"] += cached_tokens
+
+    print(
+        f"[{provider}] prompt tokens: {prompt_tokens} "
+        f"(cached {cached_tokens}, uncached {prompt_tokens - cached_tokens})"
+    )
+
+
+def prompt_cache_stats() -> dict:
+    with _lock:
+        out = {}
+        for provider, s in _stats.items():
+            out[provider] = dict(s)
+            out[provider]["uncached_tokens"] = s["prompt_tokens"] - s["cached_tokens"]
+            out[provider]["cache_hit_ratio"] = (
+                round(s["cached_tokens"] / s["prompt_tokens"], 3) if s["prompt_tokens"] else 0.0
+            )
+        return out
+
+
+def record_prompt_breakdown(report: dict):
+    """
+    Log the per-block token report of one prompt and keep running totals.
+    """
+    with _lock:
+        _breakdown["prompts"] += 1
+        for block, tokens in report.items():
+            _breakdown["tokens"][block] = _breakdown["tokens"].get(block, 0) + tokens
+
+    print("Prompt tokens:", " ".join(f"{k}={v}" for k, v in report.items()))
+
+
+def prompt_breakdown_stats() -> dict:
+    """
+    Average tokens per block over all prompts sent so far.
+    """
+    with _lock:
+        n = _breakdown["prompts"]
+        return {
+            "prompts": n,
+            "avg_tokens": {k: round(v / n, 1) for k, v in _breakdown["tokens"].items()} if n else {},
+        }
@@ -0,0 +1,203 @@
+# rag/llm/provider_orchestrator.py
+
+import asyncio
+import os
+import threading
+import time
+
+from llm_model_gemini.llm.circuit_breaker import breaker
+from llm_model_gemini.llm.request_coalescer import ProviderBusy, provider_gate, retry_after
+
+# How the providers of one request are combined:
+#   sequential - next provider only after the previous one failed (old behavior)
+#   hedged     - also start the next provider if no answer within HEDGE_DELAY
+#   race       - start every provider at once, first good answer wins
+PROVIDER_POLICY = os.getenv("PROVIDER_POLICY", "sequential")
+POLICIES = ("sequential", "hedged", "race")
+
+# Seconds to wait for a provider before hedging; set it near the primary
+# provider's p95 latency so only the slow tail pays for a second call.
+HEDGE_DELAY = float(os.getenv("HEDGE_DELAY", "3.0"))
+
+_stats = {"requests": 0, "hedges": 0, "unanswered": 0, "providers": {}}
+_lock = threading.Lock()
+
+
+class Provider:
+    """
+    One LLM backend: an async call(max_tokens) returning the answer text,
+    a hard timeout in seconds and an output-token cap (None = uncapped).
+    """
+
+    def __init__(self, name: str, call, timeout: float, max_tokens: int = None):
+        self.name = name
+        self.call = call
+        self.timeout = timeout
+        self.max_tokens = max_tokens
+
+    async def answer(self) -> str:
+        """
+        Call the provider through its concurrency gate. A 429 pauses the
+        provider and is raised as ProviderBusy, like a full queue.
+        """
+        gate = provider_gate(self.name)
+        async with gate.aslot():
+            try:
+                text = await asyncio.wait_for(self.call(self.max_tokens), self.timeout)
+            except Exception as e:
+                delay = retry_after(e)
+                if delay is None:
+                    raise
+                gate.rate_limited(delay)
+                raise ProviderBusy(f"{self.name} rate limited") from e
+        text = (text or "").strip()
+        if not text:
+            raise ValueError("empty answer")
+        return text
+
+
+def _record(name: str, outcome: str, latency: float = None):
+    with _lock:
+        s = _stats["providers"].setdefault(name, {
+            "wins": 0, "errors": 0, "timeouts": 0, "cancelled": 0, "skipped": 0,
+            "busy": 0, "discarded": 0, "latency_total": 0.0,
+        })
+        s[outcome] += 1
+        if latency is not None:
+            s["latency_total"] += latency
+
+
+def _settle(provider: Provider, task, latency: float, first: bool):
+    """
+    Record a finished provider task. Returns its answer, or None if it
+    failed or was busy. A good answer that arrived with (but after) the
+    winner counts as "discarded", not as a win.
+    """
+    try:
+        answer = task.result()
+    except ProviderBusy as e:
+        print(e)
+        _record(provider.name, "busy")
+        breaker(provider.name).release()
+        return None
+    except asyncio.TimeoutError:
+        print(f"{provider.name} timed out after {provider.timeout}s")
+        _record(provider.name, "timeouts")
+        breaker(provider.name).record(False, latency)
+        return None
+    except Exception as e:
+        print(f"{provider.name} failed:", e)
+        _record(provider.name, "errors")
+        breaker(provider.name).record(False, latency)
+        return None
+
+    _record(provider.name, "wins" if first else "discarded", latency if first else None)
+    breaker(provider.name).record(True, latency)
+    return answer
+
+
+def _hedge_delay(policy: str, hedge_delay: float):
+    if policy == "race":
+        return 0.0
+    if policy == "hedged":
+        return HEDGE_DELAY if hedge_delay is None else hedge_delay
+    return None
+
+
+async def orchestrate(providers: list, policy: str = None, hedge_delay: float = None):
+    """
+    Ask the providers (in preference order) under the given policy.
+    Returns (provider name, answer), or (None, None) when none answered.
+
+    A failed provider always hands over to the next one straight away;
+    the policies only differ in when the next one starts while the
+    current one is still running. Losers are cancelled once a provider
+    answers. Providers whose circuit breaker is open are skipped; a
+    provider that is busy (full queue, rate limited) hands over too, but
+    does not count against its breaker.
+    """
+    policy = policy or PROVIDER_POLICY
+    if policy not in POLICIES:
+        print(f"Unknown PROVIDER_POLICY {policy!r}, using sequential")
+        policy = "sequential"
+    delay = _hedge_delay(policy, hedge_delay)
+
+    with _lock:
+        _stats["requests"] += 1
+
+    waiting = list(providers)
+    running = {}
+
+    def start_next():
+        while waiting:
+            provider = waiting.pop(0)
+            if not breaker(provider.name).allow():
+                _record(provider.name, "skipped")
+                continue
+            task = asyncio.ensure_future(provider.answer())
+            running[task] = (provider, time.monotonic())
+            return
+
+    try:
+        start_next()
+        while running:
+            timeout = delay if waiting else None
+            done, _ = await asyncio.wait(running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+            if not done:
+                # Deadline passed with nothing back: hedge with the next provider.
+                if policy == "hedged":
+                    with _lock:
+                        _stats["hedges"] += 1
+                start_next()
+                continue
+
+            # Several tasks can finish in the same wait; each is recorded
+            # by its own outcome, and the first answer among them wins.
+            winner = None
+            failed = 0
+            for task in done:
+                provider, started = running.pop(task)
+                answer = _settle(provider, task, time.monotonic() - started, winner is None)
+                if answer is None:
+                    failed += 1
+                elif winner is None:
+                    winner = (provider.name, answer)
+
+            if winner is not None:
+                return winner
+            for _ in range(failed):
+                if waiting:
+                    start_next()
+
+        with _lock:
+            _stats["unanswered"] += 1
+        return None, None
+
+    finally:
+        for task, (provider, started) in running.items():
+            if task.done():
+                # Finished after the last wait returned: not a cancellation.
+                _settle(provider, task, time.monotonic() - started, False)
+                continue
+            task.cancel()
+            _record(provider.name, "cancelled")
+            breaker(provider.name).release()
+
+
+def provider_stats() -> dict:
+    with _lock:
+        out = {
+            "policy": PROVIDER_POLICY,
+            "hedge_delay": HEDGE_DELAY,
+            "requests": _stats["requests"],
+            "hedges": _stats["hedges"],
+            "unanswered": _stats["unanswered"],
+            "providers": {},
+        }
+        for name, s in _stats["providers"].items():
+            out["providers"][name] = {k: v for k, v in s.items() if k != "latency_total"}
+            out["providers"][name]["avg_win_latency"] = (
+                round(s["latency_total"] / s["wins"], 3) if s["wins"] else None
+            )
+        return out
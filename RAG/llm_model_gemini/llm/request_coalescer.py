@@ -0,0 +1,321 @@
+# rag/llm/request_coalescer.py
+
+import asyncio
+import hashlib
+import os
+import re
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+
+# Upstream calls allowed at once per provider (<NAME>_MAX_IN_FLIGHT
+# overrides it for one provider). Further callers wait in a queue of at
+# most LLM_MAX_QUEUE for up to LLM_QUEUE_TIMEOUT seconds; past that they
+# are refused straight away and get the busy answer.
+LLM_MAX_IN_FLIGHT = int(os.getenv("LLM_MAX_IN_FLIGHT", "8"))
+LLM_MAX_QUEUE = int(os.getenv("LLM_MAX_QUEUE", "32"))
+LLM_QUEUE_TIMEOUT = float(os.getenv("LLM_QUEUE_TIMEOUT", "5"))
+# Seconds a provider that answered 429 is not called, if it did not say
+# how long to wait (Retry-After).
+RATE_LIMIT_COOLDOWN = float(os.getenv("RATE_LIMIT_COOLDOWN", "10"))
+
+_NON_ALNUM = re.compile(r"[^a-z0-9\s]")
+
+
+class ProviderBusy(Exception):
+    """
+    A provider call refused locally: its queue is full, the wait for a
+    slot timed out, or the provider is rate limiting us.
+    """
+
+
+def _normalize(text: str) -> str:
+    return " ".join(_NON_ALNUM.sub(" ", (text or "").lower()).split())
+
+
+def coalesce_key(question: str, context: str, history: list, rag_context: str = "") -> str:
+    """
+    Single-flight key: the normalized question plus a hash of everything
+    else the prompt is built from. History turns are normalized too, so
+    two fresh sessions asking "What is NIET?" and "what is niet" share one
+    call, while a "tell me more" in two different conversations does not.
+    """
+    h = hashlib.sha1()
+    for part in (context or "", rag_context or ""):
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    for turn in history:
+        h.update(f"{turn['role']}: {_normalize(turn['content'])}\n".encode("utf-8"))
+    return _normalize(question) + "|" + h.hexdigest()
+
+
+def retry_after(error: Exception):
+    """
+    Seconds to back off if the error is a 429 from the provider (None if
+    it is not one). Uses the Retry-After header when there is one.
+    """
+    status = getattr(error, "status_code", None) or getattr(error, "code", None)
+    if status != 429:
+        return None
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return RATE_LIMIT_COOLDOWN
+
+
+class _Waiter:
+    __slots__ = ("event", "loop", "future", "granted")
+
+    def __init__(self, event=None, loop=None, future=None):
+        self.event = event
+        self.loop = loop
+        self.future = future
+        self.granted = False
+
+
+def _resolve(future):
+    if not future.done():
+        future.set_result(True)
+
+
+class ProviderGate:
+    """
+    Bounded concurrency for one provider, shared by the sync and async
+    paths. Slots are handed to queued callers first come, first served;
+    a full queue, a queue wait over LLM_QUEUE_TIMEOUT or a rate-limit
+    cooldown raise ProviderBusy instead of blocking.
+    """
+
+    def __init__(self, name: str, max_in_flight: int, max_queue: int):
+        self.name = name
+        self.max_in_flight = max(max_in_flight, 1)
+        self.max_queue = max(max_queue, 0)
+        self.in_flight = 0
+        self.limited_until = 0.0
+        self._waiters = deque()
+        self._stats = {
+            "admitted": 0, "queued": 0, "rejected_full": 0,
+            "rejected_timeout": 0, "rejected_rate_limited": 0, "rate_limits": 0,
+        }
+        self._lock = threading.Lock()
+
+    def _admit(self, make_waiter):
+        """
+        Take a free slot (returns None) or join the queue (returns the
+        waiter).
+        """
+        with self._lock:
+            if time.monotonic() < self.limited_until:
+                self._stats["rejected_rate_limited"] += 1
+                raise ProviderBusy(f"{self.name} is rate limited")
+            if self.in_flight < self.max_in_flight and not self._waiters:
+                self.in_flight += 1
+                self._stats["admitted"] += 1
+                return None
+            if len(self._waiters) >= self.max_queue:
+                self._stats["rejected_full"] += 1
+                raise ProviderBusy(f"{self.name} queue is full")
+            waiter = make_waiter()
+            self._waiters.append(waiter)
+            self._stats["queued"] += 1
+            return waiter
+
+    def _settle(self, waiter: _Waiter):
+        """
+        After a queued wait: keep the slot that was handed over, or leave
+        the queue and refuse.
+        """
+        with self._lock:
+            if not waiter.granted:
+                self._waiters.remove(waiter)
+                self._stats["rejected_timeout"] += 1
+                raise ProviderBusy(f"{self.name} queue wait timed out")
+            self._stats["admitted"] += 1
+            limited = time.monotonic() < self.limited_until
+            if limited:
+                self._stats["rejected_rate_limited"] += 1
+        if limited:
+            self.release()
+            raise ProviderBusy(f"{self.name} is rate limited")
+
+    def _abandon(self, waiter: _Waiter):
+        with self._lock:
+            if not waiter.granted:
+                self._waiters.remove(waiter)
+                return
+        self.release()
+
+    def acquire(self):
+        waiter = self._admit(lambda: _Waiter(event=threading.Event()))
+        if waiter is not None:
+            waiter.event.wait(LLM_QUEUE_TIMEOUT)
+            self._settle(waiter)
+
+    async def aacquire(self):
+        loop = asyncio.get_running_loop()
+        waiter = self._admit(lambda: _Waiter(loop=loop, future=loop.create_future()))
+        if waiter is None:
+            return
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), LLM_QUEUE_TIMEOUT)
+        except asyncio.TimeoutError:
+            pass
+        except asyncio.CancelledError:
+            self._abandon(waiter)
+            raise
+        self._settle(waiter)
+
+    def release(self):
+        """
+        Free a slot; the first queued caller gets it directly.
+        """
+        with self._lock:
+            if not self._waiters:
+                self.in_flight -= 1
+                return
+            waiter = self._waiters.popleft()
+            waiter.granted = True
+        if waiter.event is not None:
+            waiter.event.set()
+        else:
+            waiter.loop.call_soon_threadsafe(_resolve, waiter.future)
+
+    @contextmanager
+    def slot(self):
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    @asynccontextmanager
+    async def aslot(self):
+        await self.aacquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def rate_limited(self, seconds: float = None):
+        seconds = RATE_LIMIT_COOLDOWN if seconds is None else seconds
+        with self._lock:
+            self.limited_until = max(self.limited_until, time.monotonic() + seconds)
+            self._stats["rate_limits"] += 1
+        print(f"{self.name} rate limited, pausing calls for {seconds:.0f}s")
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "max_in_flight": self.max_in_flight,
+                "in_flight": self.in_flight,
+                "queued_now": len(self._waiters),
+                "limited_for": round(max(self.limited_until - time.monotonic(), 0.0), 1),
+                **self._stats,
+            }
+
+
+class _Call:
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Identical calls made while one is in flight wait for it and share its
+    result instead of starting their own. do() is for threads, ado() for
+    coroutines; each keeps its own table of in-flight calls.
+    """
+
+    def __init__(self):
+        self._calls = {}  # key -> _Call
+        self._tasks = {}  # (event loop id, key) -> asyncio.Task
+        self._stats = {"calls": 0, "coalesced": 0}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, fn):
+        with self._lock:
+            self._stats["calls"] += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self._stats["coalesced"] += 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+
+    async def ado(self, key: str, make):
+        """
+        Await make()'s result, sharing one task between identical keys.
+        The task is shielded, so a caller that goes away does not cancel
+        the call for the others.
+        """
+        loop = asyncio.get_running_loop()
+        task_key = (id(loop), key)
+        with self._lock:
+            self._stats["calls"] += 1
+            task = self._tasks.get(task_key)
+            if task is None:
+                task = loop.create_task(make())
+                self._tasks[task_key] = task
+                task.add_done_callback(lambda t: self._forget(task_key, t))
+            else:
+                self._stats["coalesced"] += 1
+        return await asyncio.shield(task)
+
+    def _forget(self, task_key, task):
+        with self._lock:
+            if self._tasks.get(task_key) is task:
+                del self._tasks[task_key]
+        # Every waiter may have gone away; mark the error as seen.
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"in_flight": len(self._calls) + len(self._tasks), **self._stats}
+
+
+SINGLE_FLIGHT = SingleFlight()
+
+_gates = {}
+_gates_lock = threading.Lock()
+
+
+def provider_gate(name: str) -> ProviderGate:
+    with _gates_lock:
+        if name not in _gates:
+            max_in_flight = int(os.getenv(f"{name.upper()}_MAX_IN_FLIGHT", str(LLM_MAX_IN_FLIGHT)))
+            _gates[name] = ProviderGate(name, max_in_flight, LLM_MAX_QUEUE)
+        return _gates[name]
+
+
+def llm_queue_stats() -> dict:
+    with _gates_lock:
+        gates = list(_gates.values())
+    return {
+        "single_flight": SINGLE_FLIGHT.stats(),
+        "providers": {g.name: g.stats() for g in gates},
+    }
@@ -1,9 +1,200 @@
 # rag/memory/chat_memory.py
 
-history = []
+import os
+import re
+import threading
+import time
+from collections import OrderedDict, deque
 
-def add(role, content):
-    history.append({"role": role, "content": content})
+from llm_model_gemini.token_counter import count_tokens
 
-def get():
-    return history[-6:]
\ No newline at end of file
+# Turns kept per session; older turns are dropped as new ones arrive.
+SESSION_MAX_TURNS = int(os.getenv("SESSION_MAX_TURNS", "6"))
+# Sessions untouched for this many seconds are evicted.
+SESSION_IDLE_TTL = int(os.getenv("SESSION_IDLE_TTL", "1800"))
+# Hard caps across all sessions; least recently used sessions go first.
+MAX_SESSIONS = int(os.getenv("MAX_SESSIONS", "5000"))
+MAX_MEMORY_CHARS = int(os.getenv("MAX_MEMORY_CHARS", "20000000"))
+# A single turn longer than this is truncated before it is stored.
+MAX_TURN_CHARS = 4000
+MAX_SESSION_ID_LENGTH = 128
+
+# Compaction: once a session's turns pass HISTORY_TOKEN_BUDGET tokens, all
+# but the last HISTORY_KEEP_TURNS are folded into a short running summary.
+# Set HISTORY_COMPACTION=0 to send the raw turns as before.
+HISTORY_COMPACTION = os.getenv("HISTORY_COMPACTION", "1") != "0"
+HISTORY_TOKEN_BUDGET = int(os.getenv("HISTORY_TOKEN_BUDGET", "400"))
+HISTORY_KEEP_TURNS = int(os.getenv("HISTORY_KEEP_TURNS", "2"))
+HISTORY_SUMMARY_TOKENS = int(os.getenv("HISTORY_SUMMARY_TOKENS", "150"))
+SUMMARY_WORDS_PER_TURN = 20
+
+_MARKUP = re.compile(r"[^\w\s.,:;!?()/%&'+-]")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+|\n+")
+_SPACES = re.compile(r"\s+")
+
+
+class Session:
+    def __init__(self):
+        self.turns = deque()   # {"role", "content"}
+        self.tokens = deque()  # token count of each turn
+        self.summary = []      # one line per folded turn
+        self.chars = 0
+        self.last_seen = time.monotonic()
+
+
+_sessions = OrderedDict()  # session id -> Session, least recently used first
+_total_chars = 0
+_stats = {"evicted_idle": 0, "evicted_capacity": 0, "compactions": 0}
+_lock = threading.Lock()
+
+
+def summarize_turn(turn: dict) -> str:
+    """
+    One short line for a turn: the first non-empty sentence with emoji and
+    markdown stripped (course cards start with their title line), cut to
+    SUMMARY_WORDS_PER_TURN words.
+    """
+    text = _MARKUP.sub(" ", turn["content"])
+    for sentence in _SENTENCE_END.split(text):
+        words = _SPACES.sub(" ", sentence).strip().split(" ")
+        if words != [""]:
+            line = " ".join(words[:SUMMARY_WORDS_PER_TURN])
+            if len(words) > SUMMARY_WORDS_PER_TURN:
+                line += " ..."
+            return f"{turn['role']}: {line}"
+    return f"{turn['role']}: (empty)"
+
+
+def _session_key(session_id):
+    """
+    The key a session is stored under, or None for a request without a
+    session id (old clients, api.py): those get no history at all rather
+    than one shared by every such caller.
+    """
+    if not session_id:
+        return None
+    return str(session_id)[:MAX_SESSION_ID_LENGTH]
+
+
+def _drop(key: str, reason: str):
+    global _total_chars
+    session = _sessions.pop(key)
+    _total_chars -= session.chars
+    _stats[reason] += 1
+
+
+def _evict(keep: str):
+    now = time.monotonic()
+    for key in list(_sessions):
+        if now - _sessions[key].last_seen <= SESSION_IDLE_TTL:
+            break
+        if key != keep:
+            _drop(key, "evicted_idle")
+
+    while len(_sessions) > MAX_SESSIONS or _total_chars > MAX_MEMORY_CHARS:
+        key = next(iter(_sessions))
+        if key == keep:
+            break
+        _drop(key, "evicted_capacity")
+
+
+def _pop_oldest(session: Session, fold: bool):
+    global _total_chars
+    turn = session.turns.popleft()
+    session.tokens.popleft()
+    session.chars -= len(turn["content"])
+    _total_chars -= len(turn["content"])
+
+    if fold:
+        line = summarize_turn(turn)
+        session.summary.append(line)
+        session.chars += len(line)
+        _total_chars += len(line)
+
+
+def _trim_summary(session: Session):
+    global _total_chars
+    while len(session.summary) > 1 and count_tokens("\n".join(session.summary)) > HISTORY_SUMMARY_TOKENS:
+        line = session.summary.pop(0)
+        session.chars -= len(line)
+        _total_chars -= len(line)
+
+
+def _compact(session: Session):
+    if sum(session.tokens) <= HISTORY_TOKEN_BUDGET or len(session.turns) <= HISTORY_KEEP_TURNS:
+        return
+    while len(session.turns) > HISTORY_KEEP_TURNS:
+        _pop_oldest(session, fold=True)
+    _trim_summary(session)
+    _stats["compactions"] += 1
+
+
+def add(role, content, session_id=None):
+    global _total_chars
+    content = (content or "")[:MAX_TURN_CHARS]
+    key = _session_key(session_id)
+    if key is None:
+        return
+
+    with _lock:
+        session = _sessions.get(key)
+        if session is None:
+            session = _sessions[key] = Session()
+
+        if len(session.turns) >= SESSION_MAX_TURNS:
+            _pop_oldest(session, fold=HISTORY_COMPACTION)
+
+        session.turns.append({"role": role, "content": content})
+        session.tokens.append(count_tokens(content))
+        session.chars += len(content)
+        _total_chars += len(content)
+
+        if HISTORY_COMPACTION:
+            _compact(session)
+            _trim_summary(session)
+
+        session.last_seen = time.monotonic()
+        _sessions.move_to_end(key)
+
+        _evict(keep=key)
+
+
+def get(session_id=None):
+    """
+    History for the prompt: the running summary of older turns (if any)
+    followed by the turns kept verbatim.
+    """
+    key = _session_key(session_id)
+    if key is None:
+        return []
+    with _lock:
+        session = _sessions.get(key)
+        if session is None:
+            return []
+        session.last_seen = time.monotonic()
+        _sessions.move_to_end(key)
+
+        history = list(session.turns)
+        if session.summary:
+            history.insert(0, {
+                "role": "Summary of earlier conversation",
+                "content": "\n".join(session.summary),
+            })
+        return history
+
+
+def clear(session_id=None):
+    global _total_chars
+    key = _session_key(session_id)
+    with _lock:
+        if key in _sessions:
+            _total_chars -= _sessions.pop(key).chars
+
+
+def memory_stats() -> dict:
+    with _lock:
+        return {
+            "sessions": len(_sessions),
+            "chars": _total_chars,
+            **_stats,
+        }
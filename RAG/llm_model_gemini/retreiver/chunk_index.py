@@ -0,0 +1,233 @@
+# rag/retreiver/chunk_index.py
+
+import math
+import os
+import re
+from collections import Counter
+from typing import Dict, List, Optional
+
+_NON_ALNUM = re.compile(r"[^a-z0-9\s]")
+_SPACES = re.compile(r"\s+")
+
+# Per-word substring lookups are cached; the cache is simply dropped when it
+# grows past this many words so odd traffic cannot grow it without bound.
+MAX_CACHED_WORDS = 4096
+
+# BM25 parameters. Field weights let the short, curated fields outrank a
+# long answer body that merely mentions a word in passing.
+BM25_K1 = float(os.getenv("BM25_K1", "1.2"))
+BM25_B = float(os.getenv("BM25_B", "0.75"))
+
+FIELD_WEIGHTS = {
+    "keywords": 3.0,
+    "course": 2.5,
+    "event_name": 2.5,
+    "question": 2.0,
+    "branch": 1.5,
+    "specialization": 1.5,
+    "type": 1.0,
+    "placements": 0.5,
+    "answer": 1.0,
+}
+
+
+def normalize(text: str) -> str:
+    if not text:
+        return ""
+    text = text.lower()
+    text = _NON_ALNUM.sub(" ", text)
+    text = _SPACES.sub(" ", text)
+    return text.strip()
+
+
+def chunk_fields(chunk: Dict) -> Dict[str, str]:
+    """
+    Raw text of every searchable field of a chunk, in search-text order.
+    """
+    placement = chunk.get("placements", {})
+    if isinstance(placement, dict):
+        placement_text = " ".join(str(v) for v in placement.values())
+    else:
+        placement_text = ""
+
+    return {
+        "course": chunk.get("course", ""),
+        "type": chunk.get("type", ""),
+        "event_name": chunk.get("event_name", ""),
+        "branch": chunk.get("branch", ""),
+        "specialization": chunk.get("specialization", ""),
+        "question": chunk.get("question", ""),
+        "answer": chunk.get("answer", ""),
+        "placements": placement_text,
+        "keywords": " ".join(chunk.get("keywords", [])),
+    }
+
+
+def search_text(chunk: Dict) -> str:
+    """
+    The normalized text a chunk is matched against.
+    """
+    return normalize(" ".join(chunk_fields(chunk).values()))
+
+
+class BM25Ranker:
+    """
+    Field-weighted BM25 (BM25F) over whole tokens. Per-token contributions
+    are computed once and cached, so a query costs one dict merge per
+    distinct query token.
+    """
+
+    def __init__(self, chunks: List[Dict], field_weights: Dict[str, float] = FIELD_WEIGHTS,
+                 k1: float = BM25_K1, b: float = BM25_B):
+        self.k1 = k1
+        self.b = b
+        self.field_weights = field_weights
+
+        field_counts = []
+        field_lengths = {field: 0 for field in field_weights}
+
+        for chunk in chunks:
+            counts = {}
+            for field, text in chunk_fields(chunk).items():
+                if field not in field_weights:
+                    continue
+                tokens = normalize(text).split()
+                counts[field] = (Counter(tokens), len(tokens))
+                field_lengths[field] += len(tokens)
+            field_counts.append(counts)
+
+        n = max(len(chunks), 1)
+        self.avg_lengths = {f: (total / n) or 1.0 for f, total in field_lengths.items()}
+
+        # token -> {cid: weighted, length-normalized term frequency}
+        self.weighted_tf = {}
+        for cid, counts in enumerate(field_counts):
+            for field, (counter, length) in counts.items():
+                weight = field_weights[field]
+                norm = 1 - b + b * length / self.avg_lengths[field]
+                for token, tf in counter.items():
+                    per_chunk = self.weighted_tf.setdefault(token, {})
+                    per_chunk[cid] = per_chunk.get(cid, 0.0) + weight * tf / norm
+
+        self.n = len(chunks)
+        self._token_cache = {}
+
+    def token_scores(self, token: str) -> Dict[int, float]:
+        cached = self._token_cache.get(token)
+        if cached is not None:
+            return cached
+
+        postings = self.weighted_tf.get(token, {})
+        df = len(postings)
+        idf = math.log(1 + (self.n - df + 0.5) / (df + 0.5))
+
+        cached = {
+            cid: idf * tf * (self.k1 + 1) / (tf + self.k1)
+            for cid, tf in postings.items()
+        }
+
+        if len(self._token_cache) >= MAX_CACHED_WORDS:
+            self._token_cache.clear()
+        self._token_cache[token] = cached
+        return cached
+
+    def score(self, tokens: List[str]) -> Dict[int, float]:
+        scores = {}
+        for token in dict.fromkeys(tokens):
+            for cid, s in self.token_scores(token).items():
+                scores[cid] = scores.get(cid, 0.0) + s
+        return scores
+
+
+class ChunkIndex:
+    """
+    Normalized search text for every chunk plus a token -> chunk-id
+    inverted index. Chunk ids follow source order, so sorting by id
+    reproduces the old load-order tie breaking.
+    """
+
+    def __init__(self, sources: Dict[str, List[Dict]]):
+        self.chunks = []
+        self.sources = []
+        self.texts = []
+        self.postings = {}
+        self._substring_cache = {}
+        self._bm25 = None
+
+        for source, chunks in sources.items():
+            for chunk in chunks:
+                if not isinstance(chunk, dict):
+                    continue
+
+                cid = len(self.chunks)
+                text = search_text(chunk)
+
+                self.chunks.append(chunk)
+                self.sources.append(source)
+                self.texts.append(text)
+
+                for token in set(text.split()):
+                    self.postings.setdefault(token, []).append(cid)
+
+    def substring_ids(self, word: str) -> frozenset:
+        """
+        Ids of chunks whose search text contains `word` as a substring.
+
+        Query words never contain spaces, so a match always falls inside a
+        single indexed token; scanning the vocabulary once per word is
+        enough and much cheaper than scanning every chunk's text.
+        """
+        cached = self._substring_cache.get(word)
+        if cached is not None:
+            return cached
+
+        ids = set()
+        for token, token_ids in self.postings.items():
+            if word in token:
+                ids.update(token_ids)
+
+        if len(self._substring_cache) >= MAX_CACHED_WORDS:
+            self._substring_cache.clear()
+
+        cached = frozenset(ids)
+        self._substring_cache[word] = cached
+        return cached
+
+    def score_substring(self, words: List[str], sources: Optional[List[str]] = None) -> List[tuple]:
+        """
+        Compatibility scoring: +3 for every query word found anywhere in the
+        chunk text. Returns (score, chunk) pairs, best first, ties in load
+        order.
+        """
+        scores = {}
+        for word in words:
+            for cid in self.substring_ids(word):
+                scores[cid] = scores.get(cid, 0) + 3
+
+        if sources is not None:
+            allowed = set(sources)
+            scores = {cid: s for cid, s in scores.items() if self.sources[cid] in allowed}
+
+        ranked = sorted(scores.items(), key=lambda x: (-x[1], x[0]))
+        return [(score, self.chunks[cid]) for cid, score in ranked]
+
+    @property
+    def bm25(self) -> BM25Ranker:
+        # Built on first use so the default substring mode pays nothing.
+        if self._bm25 is None:
+            self._bm25 = BM25Ranker(self.chunks)
+        return self._bm25
+
+    def score_bm25(self, query: str, sources: Optional[List[str]] = None) -> List[tuple]:
+        """
+        Opt-in BM25 ranking over whole normalized tokens. Returns
+        (score, chunk) pairs, best first, ties in load order.
+        """
+        scores = self.bm25.score(normalize(query).split())
+
+        if sources is not None:
+            allowed = set(sources)
+            scores = {cid: s for cid, s in scores.items() if self.sources[cid] in allowed}
+
+        ranked = sorted(scores.items(), key=lambda x: (-x[1], x[0]))
+        return [(score, self.chunks[cid]) for cid, score in ranked]
@@ -0,0 +1,132 @@
+# rag/retreiver/chunk_store.py
+
+import hashlib
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from llm_model_gemini.retreiver.chunk_index import ChunkIndex
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+CHUNK_ROOT = BASE_DIR / "data_chunk"
+
+# Order matters: it is the order chunks were concatenated in by the old
+# per-query loader, so ties in scoring still resolve the same way.
+SOURCE_DIRS = {
+    "course": CHUNK_ROOT / "course_data_chunk",
+    "facility": CHUNK_ROOT / "facilities_data_chunk",
+    "club": CHUNK_ROOT / "club_data_chunk",
+    "overview": CHUNK_ROOT / "overview_research_data_chunk",
+    "admission": CHUNK_ROOT / "admission_data_chunk",
+    "event": CHUNK_ROOT / "event_data_chunk",
+    "general": CHUNK_ROOT / "general_question_chunk",
+}
+
+# Seconds between mtime checks. Stat calls are cheap but there is no need
+# to make them on every single request.
+REFRESH_INTERVAL = 2.0
+
+
+class ChunkStore:
+    """
+    Process-wide cache of every *_chunks.json file, grouped by source.
+    Files are parsed once and only re-read when their mtime changes; the
+    search index is rebuilt whenever anything was reloaded.
+    """
+
+    def __init__(self, source_dirs: Dict[str, Path], refresh_interval: float = REFRESH_INTERVAL):
+        self.source_dirs = source_dirs
+        self.refresh_interval = refresh_interval
+        self.version = 0
+        self.fingerprint = None
+
+        self._files = {}      # path -> (mtime_ns, chunks)
+        self._sources = {}    # source -> chunks (in file order)
+        self._index = None
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+
+    def _load_file(self, file: Path) -> List[Dict]:
+        try:
+            with open(file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if isinstance(data, list):
+                return data
+        except Exception as e:
+            print(f"Failed to load {file.name}: {e}")
+        return []
+
+    def refresh(self, force: bool = False) -> bool:
+        """
+        Re-read changed files. Returns True if anything was reloaded.
+        """
+        now = time.monotonic()
+        if not force and now - self._last_check < self.refresh_interval:
+            return False
+
+        with self._lock:
+            self._last_check = now
+            changed = False
+            seen = set()
+            sources = {}
+
+            for source, directory in self.source_dirs.items():
+                chunks = []
+                if directory.exists():
+                    for file in directory.glob("*_chunks.json"):
+                        seen.add(file)
+                        try:
+                            mtime = file.stat().st_mtime_ns
+                        except OSError:
+                            continue
+
+                        cached = self._files.get(file)
+                        if cached is None or cached[0] != mtime:
+                            cached = (mtime, self._load_file(file))
+                            self._files[file] = cached
+                            changed = True
+
+                        chunks.extend(cached[1])
+                sources[source] = chunks
+
+            for file in list(self._files):
+                if file not in seen:
+                    del self._files[file]
+                    changed = True
+
+            if changed or not self._sources:
+                self._sources = sources
+                self._index = ChunkIndex(sources)
+                self.version += 1
+                # Content hash, stable across processes (unlike version).
+                self.fingerprint = hashlib.sha1(
+                    json.dumps(sources, sort_keys=True, ensure_ascii=False).encode("utf-8")
+                ).hexdigest()
+
+            return changed
+
+    def get(self, source: str) -> List[Dict]:
+        self.refresh()
+        return self._sources.get(source, [])
+
+    @property
+    def index(self) -> ChunkIndex:
+        self.refresh()
+        return self._index
+
+    def get_many(self, sources: Optional[List[str]] = None) -> List[Dict]:
+        self.refresh()
+        if sources is None:
+            sources = list(self.source_dirs)
+
+        chunks = []
+        for source in self.source_dirs:
+            if source in sources:
+                chunks.extend(self._sources.get(source, []))
+        return chunks
+
+
+CHUNK_STORE = ChunkStore(SOURCE_DIRS)
+CHUNK_STORE.refresh(force=True)
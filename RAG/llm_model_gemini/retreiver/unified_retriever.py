@@ -1,62 +1,19 @@
-import json
-import re
-from pathlib import Path
-from typing import List, Dict
-
-BASE_DIR = Path(__file__).resolve().parents[2]
-
-COURSE_CHUNK_DIR = BASE_DIR / "data_chunk" / "course_data_chunk"
-FACILITY_CHUNK_DIR = BASE_DIR / "data_chunk" / "facilities_data_chunk"
-CLUB_CHUNK_DIR = BASE_DIR / "data_chunk" / "club_data_chunk"
-OVERVIEW_RESEARCH_DIR=BASE_DIR/ "data_chunk" / "overview_research_data_chunk"
-ADMISSION_CHUNK_DIR = BASE_DIR / "data_chunk" / "admission_data_chunk"
-EVENT_CHUNK_DIR=BASE_DIR/ "data_chunk"/ "event_data_chunk"
-GENERAL_CHUNK_DIR=BASE_DIR/"data_chunk"/"general_question_chunk"
-
-
-ALIAS_MAP= {
-    "aiml": ["aiml","ai ml","cse aiml","btech aiml","b.tech aiml","artificial intelligence","ai & ml"],
-    "cse": ["cse","cs","computer science","btech cse","b.tech cse"],
-    "ds": ["ds","data science","btech ds","cse ds","b.tech ds"],
-    "iot": ["iot","internet of things","btech iot","b.tech iot"],
-    "csbs": ["csbs","computer science business system"],
-    "cy": ["cyber security","cse cy","cs cyber","btech cyber"],
-    "mca": ["mca","master of computer application"],
-    "mba": ["mba","master of business administration"],
-    "mechanical": ["mechanical", "me", "mech", "mechanical engineering", "btech me", "b tech me"],
-}
-
-def normalize(text: str) -> str:
-    if not text:
-        return ""
-    text = text.lower()
-    text = re.sub(r"[^a-z0-9\s]", " ", text)
-    text = re.sub(r"\s+", " ", text)
-    return text.strip()
-
-def load_chunks_from_dir(directory: Path) -> List[Dict]:
-    chunks = []
-
-    if not directory.exists():
-        return chunks
-
-    for file in directory.glob("*_chunks.json"):
-        try:
-            with open(file, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                if isinstance(data, list):
-                    chunks.extend(data)
-        except Exception as e:
-            print(f"Failed to load {file.name}: {e}")
-
-    return chunks
-
-def expand_query(query: str) -> str:
-    expanded = query
-    for short, full in ALIAS_MAP.items():
-        if short in query:
-            expanded += " " + " ".join(full)
-    return expanded
+import os
+from typing import List, Dict, Optional
+
+from constant.query_normalizer import ALIAS_MAP, normalize_query
+from llm_model_gemini.retreiver.chunk_store import CHUNK_STORE
+from llm_model_gemini.retreiver.vector_store import VECTOR_STORE
+
+# "substring" keeps the original flat +3-per-word scoring; "bm25" ranks by
+# field-weighted BM25 over whole tokens.
+RETRIEVAL_MODE = os.getenv("RETRIEVAL_MODE", "substring")
+
+# "keyword" uses RETRIEVAL_MODE only, "dense" uses the embedding index
+# (see vector_store.py), "hybrid" fuses both. Dense backends quietly fall
+# back to keyword scoring when the index or its dependencies are missing.
+RETRIEVER_BACKEND = os.getenv("RETRIEVER_BACKEND", "keyword")
+HYBRID_ALPHA = float(os.getenv("HYBRID_ALPHA", "0.5"))
 
 def detect_source(query: str) -> str:
     q = query.lower()
@@ -97,78 +54,74 @@ def detect_source(query: str) -> str:
     return "all"
 
 
-def retrieve_chunks(query: str, top_k: int = 3) -> List[Dict]:
-    query = normalize(query)
-    query = expand_query(query)
-    source = detect_source(query)
+def keyword_scores(query: str, sources: Optional[List[str]], mode: str) -> List[tuple]:
+    if mode == "bm25":
+        return CHUNK_STORE.index.score_bm25(query, sources)
+    return CHUNK_STORE.index.score_substring(query.split(), sources)
 
 
-    chunks = []
-    # if "admission" in query:
-        # return load_chunks_from_dir(ADMISSION_CHUNK_DIR)[:top_k]
+def fuse_scores(keyword: List[tuple], dense: List[tuple], alpha: float = HYBRID_ALPHA) -> List[tuple]:
+    """
+    Weighted sum of max-normalized keyword scores and cosine similarities.
+    Ties keep keyword order.
+    """
+    fused = {}
+    order = []
 
-    if source in ("course", "all"):
-        chunks.extend(load_chunks_from_dir(COURSE_CHUNK_DIR))
+    top = keyword[0][0] if keyword else 0
+    for score, chunk in keyword:
+        key = id(chunk)
+        fused[key] = [(1 - alpha) * (score / top if top else 0.0), chunk]
+        order.append(key)
 
-    if source in ("facility", "all"):
-        chunks.extend(load_chunks_from_dir(FACILITY_CHUNK_DIR))
+    for score, chunk in dense:
+        key = id(chunk)
+        if key not in fused:
+            fused[key] = [0.0, chunk]
+            order.append(key)
+        fused[key][0] += alpha * max(score, 0.0)
 
-    if source in ("club", "all"):
-        chunks.extend(load_chunks_from_dir(CLUB_CHUNK_DIR))
+    rank = {key: i for i, key in enumerate(order)}
+    ranked = sorted(fused.items(), key=lambda x: (-x[1][0], rank[x[0]]))
+    return [(score, chunk) for _, (score, chunk) in ranked]
 
-    if source in ("overview", "all"):
-        chunks.extend(load_chunks_from_dir(OVERVIEW_RESEARCH_DIR))
-    if source in ("admission", "all"):
-        chunks.extend(load_chunks_from_dir(ADMISSION_CHUNK_DIR))
 
-    if source in ("event","all"):
-        chunks.extend(load_chunks_from_dir(EVENT_CHUNK_DIR))
+def retrieve_chunks(query: str, top_k: int = 3, mode: Optional[str] = None,
+                    backend: Optional[str] = None) -> List[Dict]:
+    mode = mode or RETRIEVAL_MODE
+    backend = backend or RETRIEVER_BACKEND
+    raw_query = query
 
-    if source in ("general", "all"):
-        chunks.extend(load_chunks_from_dir(GENERAL_CHUNK_DIR))
-
-    if "about niet" in query or query.strip() == "niet":
-        return load_chunks_from_dir(OVERVIEW_RESEARCH_DIR)[:top_k]
-    
-    scored = []
-
-    for chunk in chunks:
-        placement = chunk.get("placements", {})
-        placement_text = " ".join(str(v) for v in placement.values())
-
-        searchable = normalize(
-    " ".join([
-        chunk.get("course", ""),
-        chunk.get("type", ""),
-        chunk.get("event_name",""),
-        chunk.get("branch", ""),
-        chunk.get("specialization", ""),
-        chunk.get("question", ""),
-        chunk.get("answer", ""),
-        placement_text,
-        " ".join(chunk.get("keywords", [])),
-    ])
-)
-
-        score = 0
-        for word in query.split():
-            if word in searchable:
-                score += 3
+    query = normalize_query(query).expanded
+    source = detect_source(query)
 
 
-        if score > 0:
-            scored.append((score, chunk))
+    if source == "all":
+        chunks = CHUNK_STORE.get_many()
+    else:
+        chunks = CHUNK_STORE.get(source)
 
-    scored.sort(key=lambda x: x[0], reverse=True)
+    if "about niet" in query or query.strip() == "niet":
+        return CHUNK_STORE.get("overview")[:top_k]
+    
+    sources = None if source == "all" else [source]
+    if backend in ("dense", "hybrid") and VECTOR_STORE.available:
+        dense = VECTOR_STORE.search_chunks(raw_query, max(top_k, 10), sources)
+        if backend == "dense":
+            scored = dense
+        else:
+            scored = fuse_scores(keyword_scores(query, sources, mode), dense)
+    else:
+        scored = keyword_scores(query, sources, mode)
 
     if scored:
         return [chunk for _, chunk in scored[:top_k]]
 
     if source == "admission":
-        return load_chunks_from_dir(GENERAL_CHUNK_DIR)[:top_k]
+        return CHUNK_STORE.get("general")[:top_k]
 
     if source == "overview":
-        return load_chunks_from_dir(OVERVIEW_RESEARCH_DIR)[:top_k]
+        return CHUNK_STORE.get("overview")[:top_k]
 
     return chunks[:top_k]
 
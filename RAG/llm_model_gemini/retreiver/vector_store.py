@@ -0,0 +1,219 @@
+# rag/retreiver/vector_store.py
+#
+# Optional dense retriever. Needs numpy + sentence-transformers (and
+# optionally faiss-cpu); without them retrieve_chunks stays keyword-only.
+#
+# Build the index offline (from the RAG/ directory):
+#   EMBEDDING_MODEL_DIR=/models/all-MiniLM-L6-v2 python -m llm_model_gemini.retreiver.vector_store
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from llm_model_gemini.retreiver.chunk_index import chunk_fields
+from llm_model_gemini.retreiver.chunk_store import BASE_DIR, CHUNK_STORE
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import faiss
+except ImportError:
+    faiss = None
+
+EMBEDDING_MODEL_DIR = os.getenv("EMBEDDING_MODEL_DIR", "")
+VECTOR_INDEX_DIR = Path(os.getenv("VECTOR_INDEX_DIR", BASE_DIR / "vector_index"))
+# "numpy" (brute-force dot product) or "faiss" (flat inner-product index)
+VECTOR_SEARCH = os.getenv("VECTOR_SEARCH", "numpy")
+
+MATRIX_FILE = "embeddings.f32"
+META_FILE = "embeddings_meta.json"
+
+
+def chunk_key(chunk: Dict) -> str:
+    """
+    Stable id for a chunk, stored in the sidecar so matrix rows can be
+    mapped back to the chunks held by the chunk store.
+    """
+    raw = json.dumps(chunk, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def embedding_text(chunk: Dict) -> str:
+    return " ".join(v for v in chunk_fields(chunk).values() if v and v.strip())
+
+
+def load_embedder(model_dir: str = EMBEDDING_MODEL_DIR):
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(model_dir, device="cpu")
+
+
+def build_index(model_dir: str = EMBEDDING_MODEL_DIR, out_dir: Path = VECTOR_INDEX_DIR,
+                batch_size: int = 64) -> int:
+    """
+    Embed every chunk in the store and write a float32 matrix plus an id
+    sidecar. Returns the number of rows written.
+    """
+    if np is None:
+        raise RuntimeError("numpy is required to build the vector index")
+    if not model_dir:
+        raise RuntimeError("EMBEDDING_MODEL_DIR is not set")
+
+    chunks = CHUNK_STORE.index.chunks
+    embedder = load_embedder(model_dir)
+
+    vectors = embedder.encode(
+        [embedding_text(c) for c in chunks],
+        batch_size=batch_size,
+        normalize_embeddings=True,
+        show_progress_bar=False,
+    ).astype(np.float32)
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    matrix = np.memmap(out_dir / MATRIX_FILE, dtype=np.float32, mode="w+", shape=vectors.shape)
+    matrix[:] = vectors
+    matrix.flush()
+
+    with open(out_dir / META_FILE, "w", encoding="utf-8") as f:
+        json.dump({
+            "model": str(model_dir),
+            "rows": int(vectors.shape[0]),
+            "dim": int(vectors.shape[1]),
+            "ids": [chunk_key(c) for c in chunks],
+        }, f)
+
+    return int(vectors.shape[0])
+
+
+class VectorStore:
+    """
+    Memory-mapped embedding matrix answering top-k cosine queries.
+    Everything is loaded lazily on the first query. Rows whose chunk no
+    longer exists in the store are skipped until the index is rebuilt.
+    """
+
+    def __init__(self, index_dir: Path = VECTOR_INDEX_DIR, model_dir: str = EMBEDDING_MODEL_DIR,
+                 search: str = VECTOR_SEARCH):
+        self.index_dir = Path(index_dir)
+        self.model_dir = model_dir
+        self.search = search
+
+        self._matrix = None
+        self._ids = []
+        self._faiss_index = None
+        self._embedder = None
+        self._cid_by_key = {}
+        self._store_version = None
+        self._failed = False
+        self._lock = threading.Lock()
+
+    def _load(self) -> bool:
+        if self._matrix is not None:
+            return True
+        if self._failed:
+            return False
+
+        with self._lock:
+            if self._matrix is not None:
+                return True
+            try:
+                if np is None:
+                    raise RuntimeError("numpy is not installed")
+
+                with open(self.index_dir / META_FILE, "r", encoding="utf-8") as f:
+                    meta = json.load(f)
+
+                matrix = np.memmap(
+                    self.index_dir / MATRIX_FILE,
+                    dtype=np.float32,
+                    mode="r",
+                    shape=(meta["rows"], meta["dim"]),
+                )
+
+                if self.search == "faiss" and faiss is not None:
+                    self._faiss_index = faiss.IndexFlatIP(meta["dim"])
+                    self._faiss_index.add(np.ascontiguousarray(matrix))
+
+                self._embedder = load_embedder(self.model_dir or meta["model"])
+                self._ids = meta["ids"]
+                self._matrix = matrix
+                return True
+
+            except Exception as e:
+                print("Vector index unavailable, using keyword retrieval:", e)
+                self._failed = True
+                return False
+
+    @property
+    def available(self) -> bool:
+        return self._load()
+
+    def embed(self, text: str):
+        """
+        Normalized embedding of `text`, or None when no model is available.
+        """
+        if not text.strip() or not self._load():
+            return None
+        return self._embedder.encode([text], normalize_embeddings=True).astype(np.float32)[0]
+
+    def _cid_for(self, key: str) -> Optional[int]:
+        if self._store_version != CHUNK_STORE.version:
+            self._cid_by_key = {chunk_key(c): cid for cid, c in enumerate(CHUNK_STORE.index.chunks)}
+            self._store_version = CHUNK_STORE.version
+        return self._cid_by_key.get(key)
+
+    def search_chunks(self, query: str, top_k: int, sources: Optional[List[str]] = None) -> List[tuple]:
+        """
+        Returns (cosine score, chunk) pairs, best first.
+        """
+        if not query.strip() or not self._load():
+            return []
+
+        q = self._embedder.encode([query], normalize_embeddings=True).astype(np.float32)
+
+        # Over-fetch so source filtering still leaves top_k results.
+        k = min(len(self._ids), max(top_k * 4, top_k + 16))
+        if k <= 0:
+            return []
+
+        if self._faiss_index is not None:
+            scores, rows = self._faiss_index.search(q, k)
+            pairs = zip(scores[0].tolist(), rows[0].tolist())
+        else:
+            sims = self._matrix @ q[0]
+            rows = np.argpartition(-sims, k - 1)[:k]
+            rows = rows[np.argsort(-sims[rows])]
+            pairs = ((float(sims[r]), int(r)) for r in rows)
+
+        index = CHUNK_STORE.index
+        allowed = set(sources) if sources is not None else None
+
+        results = []
+        for score, row in pairs:
+            if row < 0:
+                continue
+            cid = self._cid_for(self._ids[row])
+            if cid is None:
+                continue
+            if allowed is not None and index.sources[cid] not in allowed:
+                continue
+            results.append((score, index.chunks[cid]))
+            if len(results) >= top_k:
+                break
+
+        return results
+
+
+VECTOR_STORE = VectorStore()
+
+
+if __name__ == "__main__":
+    rows = build_index()
+    print(f"Embedded {rows} chunks into {VECTOR_INDEX_DIR}")
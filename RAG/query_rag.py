@@ -1,19 +1,21 @@
-import re
-import os, sys
+import os, sys, threading, time
 
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
 from router.btech_router import btech_router
 from router.event_router import event_router
-from router.club_router import club_router
-from router.facilities_router import facility_router
+from router.club_router import CLUB_NAMES, club_router
+from router.facilities_router import FACILITY_TRIGGERS, facility_router
 from router.mtech_router import mtech_router
 from router.ug_pg_router import ug_pg_router
-from router.institute_router import institute_router
+from router.course_catalog import CATALOG
+from router.entity_matcher import correct_entities
+from router.institute_router import INSTITUTE_KEYWORDS, institute_router
 from router.admission_router import admission_router
 from router.research_router import research_router 
 from router.twinning_router import twinning_router
 from llm_model_gemini.chat import chat
+from constant.intent_classifier import PHRASE, PREFIX, WORD, classify, register
 
 VULGAR_KEYWORDS = {
     "sex",
@@ -35,90 +37,213 @@ VULGAR_KEYWORDS = {
     "worst college"
 }
 
+# Question starters left to the decision/LLM path instead of the routers.
+NON_ROUTER_STARTS = ("why", "which", "how","is","should","what","more","number","sex")
 
-def is_vulgar(q: str) -> bool:
-    return any(word in q for word in VULGAR_KEYWORDS)
+CLUB_KEYWORDS = ["club", "clubs", "society", "societies"]
 
-def answer_rag(query: str) -> str:
-    q = query.lower().strip()
+EVENT_KEYWORDS = ["event", "events", "hackathon", "conference"]
 
-    if q.startswith(("why", "which", "how","is","should","what","more","number","sex")):
-        return None
-    
-    if is_vulgar(q):
-        return chat(q)
+SYLLABUS_KEYWORDS = ["syllabus", "pdf", "subject", "subjects", "curriculum"]
 
-    if any(k in q for k in ["club", "clubs", "society", "societies"]):
-        res = club_router(q)
-        if isinstance(res, str) and res.strip():
-            return res
-        return (
-            "Please visit the official NIET Clubs & Societies page:\n"
-            "https://niet.co.in/students-life/student-clubs-societies"
-        )
-
-    if any(w in q for w in ["event", "events", "hackathon", "conference"]):
-        res = event_router(q)
-        if isinstance(res, str) and res.strip():
-            return res
-        
-    if "admission" in q:
-        res=admission_router(q)
-        if isinstance(res, str) and res.strip():
-            return res
-    
-    if any(w in q for w in ["syllabus", "pdf", "subject", "subjects", "curriculum"]):
-        return (
-            "To access the complete and officially updated course syllabus, "
-            "please visit:\nhttps://www.niet.co.in/academics/syllabus"
-        )
-
-    TWINNING_KEYWORDS = [
-        "twinning",
-        "international",
-        "abroad",
-        "foreign",
-        "semester abroad"
-    ]
-
-    if any(k in q for k in TWINNING_KEYWORDS):
-        twinning = twinning_router(q)
-        if twinning:
-            return twinning
-
-    res = mtech_router(q)
-    if isinstance(res, str) and res.strip():
-        return res
-
-    res = ug_pg_router(q)
-    if isinstance(res, str) and res.strip():
-        return res
-
-    BTECH_KEYWORDS = {
-        "btech", "b.tech",
-        "cse", "aiml", "ai",
-        "data science", "cyber security",
-        "iot", "ece", "me", "bio"
-    }
-
-    words = set(re.findall(r"[a-z]+", q))
-
-    if words.intersection(BTECH_KEYWORDS):
-        res = btech_router(q)
-        if isinstance(res, str) and res.strip():
-            return res
-        
-    res = facility_router(q)
-    if isinstance(res, str) and res.strip():
-        return res
+TWINNING_KEYWORDS = [
+    "twinning",
+    "international",
+    "abroad",
+    "foreign",
+    "semester abroad"
+]
+
+# Matched against whole words only.
+BTECH_KEYWORDS = {
+    "btech", "b.tech",
+    "cse", "aiml", "ai",
+    "data science", "cyber security",
+    "iot", "ece", "me", "bio"
+}
+
+RESEARCH_KEYWORDS = ["research", "project", "projects"]
+
+# Every M.Tech trigger ("mtech", "m tech", "master of technology",
+# "integrated technology") contains "tech", so the router can only answer
+# when it does.
+MTECH_TRIGGERS = ["tech"]
+
+GENERIC_TOKENS = {"niet", "in", "of", "and", "the", "year", "course", "5"}
+
+
+def ugpg_triggers():
+    """
+    ug_pg_router needs one of its course keywords inside the query, so the
+    query must contain at least one token of it. One token per keyword,
+    the longest non-generic one, is enough as a trigger.
+    """
+    triggers = set()
+    for keyword in CATALOG.aliases("ug_pg"):
+        tokens = keyword.split()
+        if not tokens:
+            # An empty keyword matches every query: the router must always run.
+            return [""]
+        specific = [t for t in tokens if t not in GENERIC_TOKENS] or tokens
+        triggers.add(max(specific, key=len))
+    return sorted(triggers)
+
+register("non_router", NON_ROUTER_STARTS, PREFIX)
+register("vulgar", VULGAR_KEYWORDS)
+register("club", CLUB_KEYWORDS)
+register("club_name", CLUB_NAMES, PHRASE)
+register("event", EVENT_KEYWORDS)
+register("admission", ["admission"])
+register("syllabus", SYLLABUS_KEYWORDS)
+register("twinning", TWINNING_KEYWORDS)
+register("btech", BTECH_KEYWORDS, WORD)
+register("research", RESEARCH_KEYWORDS)
+register("mtech", MTECH_TRIGGERS)
+register("facility", FACILITY_TRIGGERS)
+register("institute", INSTITUTE_KEYWORDS)
+
+UGPG_TRIGGERS = ugpg_triggers()
+if UGPG_TRIGGERS != [""]:
+    register("ug_pg", UGPG_TRIGGERS)
+
+
+def is_vulgar(q: str) -> bool:
+    return "vulgar" in classify(q)
+
+# Returned by route_rag when the question has to go to the LLM.
+LLM_FALLBACK = object()
+
+CLUB_PAGE_ANSWER = (
+    "Please visit the official NIET Clubs & Societies page:\n"
+    "https://niet.co.in/students-life/student-clubs-societies"
+)
+
+SYLLABUS_ANSWER = (
+    "To access the complete and officially updated course syllabus, "
+    "please visit:\nhttps://www.niet.co.in/academics/syllabus"
+)
+
+
+def is_answer(res) -> bool:
+    return isinstance(res, str) and bool(res.strip())
+
+
+def club_step(q: str):
+    res = club_router(q)
+    return res if is_answer(res) else CLUB_PAGE_ANSWER
+
+
+def syllabus_step(q: str):
+    return SYLLABUS_ANSWER
+
+
+class Route:
+    """
+    One step of the router cascade: runs `handler` only when the intent
+    `label` (or one of a tuple of labels) was found in the query (None =
+    always), and returns its result if `accept` says it is an answer.
+    """
+
+    def __init__(self, name, handler, label=None, accept=is_answer):
+        self.name = name
+        self.handler = handler
+        self.label = label
+        self.labels = None if label is None else frozenset((label,) if isinstance(label, str) else label)
+        self.accept = accept
+
+
+# Same order as the old cascade; the first accepted answer wins.
+ROUTES = [
+    # A club named without the word "club" ("kathputliyaan") is a club question.
+    Route("club", club_step, ("club", "club_name")),
+    Route("event", event_router, "event"),
+    Route("admission", admission_router, "admission"),
+    Route("syllabus", syllabus_step, "syllabus"),
+    Route("twinning", twinning_router, "twinning", accept=bool),
+    Route("mtech", mtech_router, "mtech"),
+    Route("ug_pg", ug_pg_router, "ug_pg" if UGPG_TRIGGERS != [""] else None),
+    Route("btech", btech_router, "btech"),
+    Route("facility", facility_router, "facility"),
+    Route("research", research_router, "research"),
+    Route("institute", institute_router, "institute"),
+]
+
+_router_stats = {route.name: {"calls": 0, "hits": 0, "misses": 0, "skipped": 0, "time": 0.0}
+                 for route in ROUTES}
+_dispatch_stats = {"queries": 0, "corrected": 0, "non_router": 0, "vulgar": 0, "llm_fallback": 0}
+_stats_lock = threading.Lock()
+
+
+def route_rag(query: str):
+    """
+    Fix misspelled entity names, classify the query once, then run only
+    the routers whose intent was found, in cascade order. Returns the
+    router answer, None, or LLM_FALLBACK.
+    """
+    raw = query.lower().strip()
+    q = correct_entities(raw)
+    intents = classify(q)
+
+    with _stats_lock:
+        _dispatch_stats["queries"] += 1
+        if q != raw:
+            _dispatch_stats["corrected"] += 1
+
+    if "non_router" in intents:
+        with _stats_lock:
+            _dispatch_stats["non_router"] += 1
+        return None
     
-    if "research" in q or "project" in q or "projects" in q:
-        res=research_router(q)
-        if isinstance(res,str) and res.strip():
+    if "vulgar" in intents:
+        with _stats_lock:
+            _dispatch_stats["vulgar"] += 1
+        return LLM_FALLBACK
+
+    for route in ROUTES:
+        stats = _router_stats[route.name]
+        if route.labels is not None and route.labels.isdisjoint(intents):
+            with _stats_lock:
+                stats["skipped"] += 1
+            continue
+
+        started = time.perf_counter()
+        res = route.handler(q)
+        elapsed = time.perf_counter() - started
+
+        hit = route.accept(res)
+        with _stats_lock:
+            stats["calls"] += 1
+            stats["hits" if hit else "misses"] += 1
+            stats["time"] += elapsed
+        if hit:
             return res
-    
-    res = institute_router(q)
-    if isinstance(res, str) and res.strip():
-        return res
-    
-    return chat(q)
+
+    with _stats_lock:
+        _dispatch_stats["llm_fallback"] += 1
+    return LLM_FALLBACK
+
+
+def router_stats() -> dict:
+    """
+    Per-router hit/miss/skip counts and time spent, for /metrics.
+    """
+    with _stats_lock:
+        routers = {}
+        for name, s in _router_stats.items():
+            routers[name] = {
+                "calls": s["calls"],
+                "hits": s["hits"],
+                "misses": s["misses"],
+                "skipped": s["skipped"],
+                "total_ms": round(s["time"] * 1000, 2),
+                "avg_ms": round(s["time"] * 1000 / s["calls"], 3) if s["calls"] else None,
+            }
+        return {**_dispatch_stats, "routers": routers}
+
+
+def answer_rag(query: str, session_id: str = None) -> str:
+    res = route_rag(query)
+    if res is LLM_FALLBACK:
+        return chat(correct_entities(query.lower().strip()), session_id)
+    return res
+
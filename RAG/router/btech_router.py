@@ -1,26 +1,8 @@
 # btech_router.py
 
-import json, os, re
-
-BTECH_PATH = os.path.join(os.path.dirname(__file__), "../data_chunk/course_data_chunk/btech_chunks.json")
-with open(BTECH_PATH, "r", encoding="utf-8") as f:
-    data = json.load(f)
-
-BTECH_DATA = data if isinstance(data, list) else [data]
-
-def normalize(text: str) -> str:
-    text = text.lower()
-    text = re.sub(r"\bb\s*\.?\s*tech\b", "btech", text)   
-    text = re.sub(r"[^\w\s]", " ", text)
-    return " ".join(text.split())
-
-def detect_branch(q: str):
-    q = q.lower()
-    for branch, signals in BRANCH_SIGNALS.items():
-        for s in signals:
-            if re.search(rf"\b{s}\b", q):
-                return branch
-    return None
+from constant.query_normalizer import normalize_query
+from router.course_catalog import CATALOG
+
 def normalize_branch(branch: str):
     for key, aliases in BRANCH_ALIASES.items():
         for a in aliases:
@@ -29,13 +11,6 @@ def normalize_branch(branch: str):
     return branch
 
 
-def detect_specialization(q: str):
-    for spec, signals in SPECIALIZATION_SIGNALS.items():
-        for s in signals:
-            if s in q:
-                return spec
-    return None
-
 BRANCH_ALIASES = {
     "cse": [
         "cse",
@@ -85,29 +60,6 @@ SPECIALIZATION_MAP = {
     "iot": ["iot", "internet of things"]
 }
 
-BRANCH_SIGNALS = {
-    "cse": ["computer science", "cse"],
-    "cs": ["computer science", "cs"],
-    "ece": ["electronics", "electronics and communication", "ece"],
-    "vlsi": ["vlsi", "vlsi design", "vlsi design and technology"],
-    "it": ["information technology", "it"],
-    "me": ["mechanical", "mechanical engineering"],
-    "bio": ["biotechnology"],
-    "bca": ["bca", "bachelor of computer applications"],
-    "csbs": ["computer science and business systems", "csbs"],
-    "mathematics and computing": ["mathematics and computing", "mnc", "math computing"]
-}
-
-SPECIALIZATION_SIGNALS = {
-    "aiml": ["aiml", "artificial intelligence and machine learning"],
-    "ai": ["artificial intelligence"],
-    "ds": ["data science"],
-    "cy": ["cyber", "cyber security"],
-    "iot": ["iot", "internet of things"],
-    "twinning": ["twinning", "international"],
-    "aiml twinning": ["aiml twinning", "international twinning"]
-}
-
 CSE_SPECIALIZATIONS = {
     "aiml",
     "ai",
@@ -141,26 +93,26 @@ def format_full_course(c: dict) -> str:
 
 
 def btech_router(query: str):
-    q = normalize(query)
+    nq = normalize_query(query)
+    q = nq.course_text
 
-    branch = detect_branch(q)
-    specialization = detect_specialization(q)
+    branch = nq.branch
+    specialization = nq.specialization
 
     if not branch and specialization in CSE_SPECIALIZATIONS:
         branch="cse"
         
     
-    branch_courses = [c for c in BTECH_DATA if c.get("branch") == branch]
+    if not branch:
+        return None
+    branch_courses = CATALOG.by_branch("btech", branch)
     if not branch_courses:
         return None
 
-    selected_course = branch_courses[0]
-
+    selected = branch_courses[0]
     if specialization:
-        for c in branch_courses:
-            if normalize(c.get("specialization", "")) == specialization:
-                selected_course = c
-                break
+        selected = CATALOG.find("btech", branch, specialization) or selected
+    selected_course = selected.record
 
     props = selected_course.get("properties", {})
     placements = selected_course.get("placements", {})
@@ -1,5 +1,10 @@
 import json
 import os
+import re
+
+from constant.intent_classifier import trie_pattern
+from constant.query_normalizer import normalize_query
+from router.entity_matcher import correct_entities
 
 # Project root directory (RAG/)
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
@@ -42,6 +47,122 @@ CLUB_LIST = {
 }
 
 # QUERY NORMALIZATION
+
+# Common spelling / wording corrections, each mapped straight to its final
+# form. They are applied in one left-to-right pass where the longest
+# phrase at a position wins, so a rewritten phrase is never rewritten
+# again ("spectrum club" becomes "spectrum (cinematography ) club", not
+# "... club club"). Misspelled club names ("katputliyan", "cultral") are
+# fixed by router/entity_matcher.py before these are applied.
+CLUB_CORRECTIONS = {
+    "clubs":"club",
+    "scoieties": "societies",
+    "hobyy": "hobby",
+    "hobi": "hobby",
+    "nritya bhaktiya": "nritya bhakti",
+    "traditional":"nritya bhakti",
+
+    "hid ": "hope in darkness ",
+    "hope darkness": "hope in darkness",
+
+    "khushiyan baaton": "khushiyan baaton club",
+
+    #for spectrun
+    "spectrum":"spectrum (cinematography ) club",
+    "spectrum club":"spectrum (cinematography ) club",
+
+    #megapixels
+    "megapixels":"megapixels (photography & videography ) club",
+    "megapixels club":"megapixels (photography & videography ) club",
+    "photography club":"megapixels (photography & videography ) club",
+    "videography club":"megapixels (photography & videography ) club",
+
+    #green gold society
+    "green gold society":"green gold society club",
+
+    #juventas club 
+    "juventas club":"juventas (dance) club",
+    "dance club":"juventas (dance) club",
+
+    #harmonic club
+    "harmonics club":"harmonics (music) club",
+    "music club":"harmonics (music) club",
+
+    #dodge haming club
+    "dodge gaming":"dodge gaming club",
+
+    #table tenn club
+    "table tenn":"table tenn club",
+    "table tennis":"table tennis club",
+    "table club":"table tenn club",
+
+    #kathputliyaan club
+    "kathputliyaan":"kathputliyaan club",
+    "theatre club":"kathputliyaan club",
+}
+
+# "What/Tell is Kathputliyaan (The Theatre Club)" -> "kathputliyaan".
+_CLUB_QUESTION = re.compile(r"^what\s*/\s*tell (?:is|about) (.+?)(?: \(.*\))?(?: club)?$")
+
+
+def club_names(clubs: list) -> list:
+    """
+    The names of the clubs in the data, taken from their "What/Tell
+    about ..." questions, plus the one-word spelling of two-word names
+    ("nrityabhakti").
+    """
+    names = []
+    for club in clubs:
+        m = _CLUB_QUESTION.match(" ".join(club.get("question", "").lower().split()))
+        if m:
+            name = m.group(1)
+            names.append(name)
+            if name.count(" ") == 1:
+                names.append(name.replace(" ", ""))
+    return names
+
+
+# Names that identify a club without the word "club" ("tell me about
+# kathputliyaan"); route_rag sends questions naming one to club_router.
+CLUB_NAMES = club_names(CLUB_DATA)
+
+# Alias mapping (different words -> same club): a question naming one of
+# these is replaced as a whole by the club it stands for, the first alias
+# in this order winning.
+CLUB_ALIASES = {
+    "acting club": "kathputliyaan",
+    "cinema club": "spectrum",
+    "film club": "spectrum",
+    "ngo club": "khushiyan baaton club",
+    "social club": "khushiyan baaton club",
+}
+
+
+def _with_club_forms(phrases: dict) -> dict:
+    """
+    Add the "... clubs" form of every phrase ending in "club", and the
+    "... club(s)" forms of every phrase already rewritten to a club, so
+    "music clubs" does not leave a stray "s" and "kathputliyan club" does
+    not become "kathputliyaan club club".
+    """
+    out = dict(phrases)
+    for phrase, value in phrases.items():
+        if phrase.endswith("club"):
+            out.setdefault(phrase + "s", value)
+        elif isinstance(value, str) and value.endswith("club"):
+            out.setdefault(phrase.rstrip() + " club", value)
+            out.setdefault(phrase.rstrip() + " clubs", value)
+    return out
+
+
+CLUB_CORRECTIONS = _with_club_forms(CLUB_CORRECTIONS)
+_ALIAS_RANK = _with_club_forms({alias: i for i, alias in enumerate(CLUB_ALIASES)})
+_ALIAS_VALUES = list(CLUB_ALIASES.values())
+
+# Phrases only start at a word boundary ("hid " must not match "orchid ").
+_CORRECTION_PATTERN = re.compile(r"\b" + trie_pattern(list(CLUB_CORRECTIONS) + list(_ALIAS_RANK)))
+
+
 def club_normalize(query: str) -> str:
     """
     Normalizes user input so that:
@@ -50,106 +171,63 @@ def club_normalize(query: str) -> str:
     - Common spelling mistakes are fixed
     - Similar phrases map to one standard form
     """
-    q = query.lower().strip()
-
-    # Remove punctuation that can break matching
-    for ch in ["?", ",", ".", ":", "-", "_"]:
-        q = q.replace(ch, " ")
-
-    # Common spelling / wording corrections
-    corrections = {
-        "clubs":"club",
-        "scoieties": "societies",
-        "scoiety": "society",
-        "hobyy": "hobby",
-        "hobi": "hobby",
-        "cultral": "cultural",
-        "cutural": "cultural",
-        "nritya bhkati": "nritya bhakti",
-        "nritya bhaktiya": "nritya bhakti",
-        "traditional":"nritya bhakti",
-
-        "katputliyan": "kathputliyaan",
-        "kathputliyan": "kathputliyaan",
-        "hid ": "hope in darkness",
-        "hope darkness": "hope in darkness",
-
-        # IMPORTANT FIX for YOUR PROBLEM
-        "khushiyan baton": "khushiyan baaton club",
-        "khushiyan baaton": "khushiyan baaton club",
-        "khushiyan batton": "khushiyan baaton club",
-        "khushiya baaton": "khushiyan baaton club",
-        
-        #for spectrun
-        "spectrum":"spectrum (cinematography ) club",
-        "spectrum club":"spectrum (cinematography ) club",
-
-        #megapixels
-        "megapixels":"megapixels (photography & videography ) club",
-        "megapixels club":"megapixels (photography & videography ) club",
-        "photography club":"megapixels (photography & videography ) club",
-        "videography club":"megapixels (photography & videography ) club",
-
-        #green gold society
-        "green gold society":"green gold society club",
-        "green-gold-society":"green gold society club",
-
-        #juventas club 
-        "juventas club":"juventas (dance) club",
-        "dance club":"juventas (dance) club",
-
-        #harmonic club
-        "harmonics club":"harmonics (music) club",
-        "music club":"harmonics (music) club",
-
-        #editorial club
-        "editorial-club":"editorial club",
-        "editorial  club":"editorial club",
-
-        #yoga club
-        "yoga-club":"yoga club",
-
-        #dodge haming club
-        "dodge gaming":"dodge gaming club",
-
-        #chess club
-        "chess-club":"chess club",
-
-        #table tenn club
-        "table tenn":"table tenn club",
-        "table club":"table tenn club",
-
-        #kathputliyaan club
-        "kathputliyaan":"kathputliyaan club",
-        "theatre club":"kathputliyaan club"
-    }
+    # Lowercased, misspelled club names fixed, punctuation that can break
+    # matching removed. The trailing space lets "hid " match at the end of
+    # the question too.
+    q = normalize_query(correct_entities(query)).plain + " "
 
-    for wrong, right in corrections.items():
-        q = q.replace(wrong, right)
-
-    # Alias mapping (different words → same club)
-    alias_map = {
-        "dance club": "nritya bhakti",
-        "traditional dance": "nritya bhakti",
-        "theatre club": "kathputliyaan",
-        "acting club": "kathputliyaan",
-        "music club": "harmonics",
-        "photography club": "megapixels",
-        "videography club": "megapixels",
-        "cinema club": "spectrum",
-        "film club": "spectrum",
-        "ngo club": "khushiyan baaton club",
-        "social club": "khushiyan baaton club",
-    }
+    aliases = []
+
+    def rewrite(m):
+        phrase = m.group(0)
+        if phrase in _ALIAS_RANK:
+            aliases.append(_ALIAS_RANK[phrase])
+            return phrase
+        return CLUB_CORRECTIONS[phrase]
 
-    for key, value in alias_map.items():
-        if key in q:
-            q = value
+    q = _CORRECTION_PATTERN.sub(rewrite, q)
+    if aliases:
+        q = _ALIAS_VALUES[min(aliases)]
 
     # Remove extra spaces
     return " ".join(q.split())
 
 
+def build_keyword_index(clubs: list):
+    """
+    Map every club keyword to the first club (in data order) with it or
+    with one of its prefixes as a keyword, plus one lookahead regex that
+    finds the longest keyword starting at each position of a query.
+    """
+    first = {}
+    for i, club in enumerate(clubs):
+        for k in club.get("keywords", []):
+            if k and k not in first:
+                first[k] = i
+
+    index = {
+        key: min(i for k, i in first.items() if key.startswith(k))
+        for key in first
+    }
+    pattern = re.compile("(?=(" + trie_pattern(index) + "))") if index else None
+    return index, pattern
+
+
+KEYWORD_CLUBS, _KEYWORD_PATTERN = build_keyword_index(CLUB_DATA)
+
+
+def find_club(q: str):
+    """
+    The first club in CLUB_DATA with a keyword inside q, or None.
+    """
+    if _KEYWORD_PATTERN is None:
+        return None
+    found = _KEYWORD_PATTERN.findall(q)
+    if not found:
+        return None
+    return CLUB_DATA[min(KEYWORD_CLUBS[k] for k in found)]
+
+
 # CONSTANT CLUB GROUPS
  
 OUTDOOR_CLUBS = [
@@ -231,10 +309,9 @@ def club_router(query: str):
     if "cultural" in q or "hobby" in q or "activities" in q:
         return format_list("Cultural & Hobby Clubs", CULTURAL_CLUBS)
 
-    for club in CLUB_DATA:
-        for k in club.get("keywords", []):
-            if k in q:
-                return club["answer"]
+    club = find_club(q)
+    if club:
+        return club["answer"]
 
 
 # LOCAL TESTING
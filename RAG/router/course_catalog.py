@@ -0,0 +1,120 @@
+# course_catalog.py
+#
+# Every course the course routers answer about, loaded once from
+# data_chunk/course_data_chunk/*_chunks.json into Course records and
+# indexed by branch, specialization, type and keyword, so routers look
+# courses up instead of scanning and re-normalizing them per query.
+
+import json
+import os
+import re
+
+COURSE_DIR = os.path.join(os.path.dirname(__file__), "..", "data_chunk", "course_data_chunk")
+
+_PUNCT = re.compile(r"[^\w\s]")
+
+
+def normalize(text: str) -> str:
+    """
+    Lowercase, punctuation to spaces, collapsed whitespace.
+    """
+    if not text:
+        return ""
+    text = text.lower()
+    text = _PUNCT.sub(" ", text)
+    return " ".join(text.split())
+
+
+class Course:
+    """
+    One course record. Index fields are normalized once here; `record`
+    is the original JSON object the routers render answers from.
+    """
+
+    def __init__(self, source: str, record: dict):
+        self.source = source
+        self.record = record
+        self.name = record.get("course") or ""
+        self.type = normalize(record.get("type"))
+        self.branch = normalize(record.get("branch"))
+        self.specialization = normalize(record.get("specialization"))
+        self.keywords = tuple(normalize(k) for k in record.get("keywords", []))
+        # Title and keywords as one normalized string, for substring checks.
+        self.text = normalize(self.name + " " + " ".join(record.get("keywords", [])))
+
+    def __repr__(self):
+        return f"Course({self.source!r}, {self.name!r})"
+
+
+class CourseCatalog:
+    """
+    Courses grouped by source ("btech", "mtech", "ug_pg", ...), in file
+    order, with lookup indexes per source. Every index keeps file order,
+    so "first match" lookups give the same course the old scans did.
+    """
+
+    def __init__(self):
+        self._courses = {}          # source -> [Course]
+        self._by_branch = {}        # (source, branch) -> [Course]
+        self._by_type_branch = {}   # (source, type, branch) -> [Course]
+        self._by_specialization = {}  # (source, branch, specialization) -> [Course]
+        self._by_alias = {}         # (source, keyword) -> [Course]
+
+    def add(self, source: str, records):
+        """
+        Register (or replace) the courses of one source.
+        """
+        if isinstance(records, dict):
+            records = [records]
+        courses = [Course(source, r) for r in records if isinstance(r, dict)]
+        self._courses[source] = courses
+
+        for index in (self._by_branch, self._by_type_branch, self._by_specialization, self._by_alias):
+            for key in [k for k in index if k[0] == source]:
+                del index[key]
+
+        for c in courses:
+            self._by_branch.setdefault((source, c.branch), []).append(c)
+            self._by_type_branch.setdefault((source, c.type, c.branch), []).append(c)
+            self._by_specialization.setdefault((source, c.branch, c.specialization), []).append(c)
+            for keyword in set(c.keywords):
+                self._by_alias.setdefault((source, keyword), []).append(c)
+
+    def load_dir(self, directory: str = COURSE_DIR):
+        """
+        Load every <source>_chunks.json file of the directory.
+        """
+        for file in sorted(os.listdir(directory)):
+            if not file.endswith("_chunks.json"):
+                continue
+            with open(os.path.join(directory, file), "r", encoding="utf-8") as f:
+                self.add(file[:-len("_chunks.json")], json.load(f))
+
+    def courses(self, source: str) -> list:
+        return self._courses.get(source, [])
+
+    def by_branch(self, source: str, branch: str, type: str = None) -> list:
+        if type is None:
+            return self._by_branch.get((source, normalize(branch)), [])
+        return self._by_type_branch.get((source, normalize(type), normalize(branch)), [])
+
+    def find(self, source: str, branch: str, specialization: str, type: str = None):
+        """
+        First course of the source with this branch and specialization
+        (and type, if given), or None.
+        """
+        courses = self._by_specialization.get((source, normalize(branch), normalize(specialization)), [])
+        if type is not None:
+            type = normalize(type)
+            courses = [c for c in courses if c.type == type]
+        return courses[0] if courses else None
+
+    def by_alias(self, source: str, keyword: str) -> list:
+        return self._by_alias.get((source, normalize(keyword)), [])
+
+    def aliases(self, source: str) -> list:
+        return [keyword for (s, keyword) in self._by_alias if s == source]
+
+
+CATALOG = CourseCatalog()
+CATALOG.load_dir()
@@ -0,0 +1,312 @@
+# course_facts.py
+#
+# Fact questions about the course catalog answered straight from the
+# structured `properties` / `placements` fields: which course has the
+# highest or lowest package, seats or duration, the average across a group
+# of courses, side-by-side comparisons of named courses and single facts
+# about one course. A question the engine does not fully understand returns
+# None and goes to the LLM as before.
+
+import re
+
+from constant.query_normalizer import BRANCH_SIGNALS, SPECIALIZATION_SIGNALS, normalize_query
+from constant.intent_classifier import trie_pattern
+from router.course_catalog import CATALOG, normalize
+from router.entity_matcher import correct_entities
+
+# metric -> (label, record section, key, numeric unit)
+FIELDS = {
+    "highest": ("Highest Package", "placements", "highest", "LPA"),
+    "average": ("Average Package", "placements", "average", "LPA"),
+    "seats": ("Seats", "properties", "seats", "seats"),
+    "duration": ("Duration", "properties", "duration", "years"),
+}
+# (metric, aggregate) -> ranking title
+RANKING_TITLES = {
+    ("highest", "max"): "Highest package",
+    ("average", "max"): "Highest average package",
+    ("average", "min"): "Lowest average package",
+    ("seats", "max"): "Most seats",
+    ("seats", "min"): "Fewest seats",
+    ("duration", "max"): "Longest duration",
+    ("duration", "min"): "Shortest duration",
+    ("highest", "avg"): "Average highest package",
+    ("average", "avg"): "Average package",
+    ("seats", "avg"): "Average seats",
+    ("duration", "avg"): "Average duration",
+}
+# Text-only fields shown in side-by-side comparisons.
+TEXT_FIELDS = {
+    "eligibility": ("Eligibility", "properties", "eligibility"),
+}
+COMPARE_ORDER = ("duration", "seats", "eligibility", "average", "highest")
+
+PACKAGE_WORDS = {"package", "packages", "salary", "ctc", "lpa", "placement", "placements"}
+SEAT_WORDS = {"seat", "seats", "intake"}
+DURATION_WORDS = {"duration", "long", "longest", "shortest", "years", "semesters"}
+ELIGIBILITY_WORDS = {"eligibility", "eligible", "criteria"}
+
+MAX_WORDS = {"highest", "maximum", "max", "most", "top", "largest", "biggest", "longest", "more"}
+MIN_WORDS = {"lowest", "minimum", "min", "least", "fewest", "smallest", "shortest", "less", "fewer"}
+AVG_WORDS = {"average", "avg", "mean"}
+COMPARE_WORDS = {"compare", "comparison", "vs", "versus", "difference", "differ"}
+# "which cse specialization ..." ranks the courses of the named branch.
+GROUP_WORDS = {"specialization", "specializations", "branches", "courses", "programs", "programmes"}
+# Questions asking for an opinion, or about something other than the
+# courses ("which company gave the highest package"), are left to the LLM.
+OPINION_WORDS = {"best", "better", "good", "worth", "should", "recommend", "prefer", "can", "will", "chance", "chances"}
+OTHER_SUBJECT_WORDS = {
+    "company", "companies", "recruiter", "recruiters", "employer", "employers",
+    "student", "students", "alumni", "batch",
+}
+
+# Scope words -> (label, predicate over Course)
+SCOPES = {
+    "btech": ("B.Tech", lambda c: c.type == "btech"),
+    "mtech": ("M.Tech", lambda c: c.type == "mtech"),
+    "mba": ("MBA", lambda c: c.name.upper().startswith("MBA")),
+    "ug": ("undergraduate", lambda c: c.type in ("btech", "ug", "bba")),
+    "pg": ("postgraduate", lambda c: c.type in ("mtech", "pg", "mca")),
+}
+# Checked in order; "branch" only means B.Tech when no other programme is
+# named ("which branch has the highest package in mtech").
+_SCOPE_PATTERNS = [
+    ("btech", re.compile(r"\bbtech\b")),
+    ("mtech", re.compile(r"\bm\s*tech\b")),
+    ("mba", re.compile(r"\bmba\b")),
+    ("ug", re.compile(r"\b(?:ug|undergraduate|bachelor|bachelors)\b")),
+    ("pg", re.compile(r"\b(?:pg|postgraduate|master|masters)\b")),
+    ("btech", re.compile(r"\b(?:branch|branches)\b")),
+]
+
+# Bare branch signals that are ordinary English words ("is it better").
+AMBIGUOUS_SIGNALS = {"it", "me"}
+
+_NUMBER = re.compile(r"\d+(?:\.\d+)?")
+
+
+def parse_number(text):
+    """
+    First number in a field value ("5.68 LPA (approx)" -> 5.68), or None
+    when the value has none ("Varies yearly").
+    """
+    if not isinstance(text, str):
+        return None
+    m = _NUMBER.search(text)
+    return float(m.group(0)) if m else None
+
+
+class CourseFacts:
+    """
+    The structured fields of one course, with the numeric ones parsed once.
+    """
+
+    def __init__(self, course):
+        self.course = course
+        self.name = course.name
+        self.text = {}
+        self.values = {}
+        for metric, (_, section, key, _) in FIELDS.items():
+            value = (course.record.get(section) or {}).get(key)
+            self.text[metric] = value.strip() if isinstance(value, str) else "NA"
+            self.values[metric] = parse_number(value)
+        for metric, (_, section, key) in TEXT_FIELDS.items():
+            value = (course.record.get(section) or {}).get(key)
+            self.text[metric] = value.strip() if isinstance(value, str) else "NA"
+
+
+def _build_facts():
+    """
+    One CourseFacts per distinct course name (MBA, MCA, BBA and BCA are
+    listed under several sources), in catalog order.
+    """
+    facts = {}
+    for source in ("btech", "mtech", "ug_pg"):
+        for course in CATALOG.courses(source):
+            if course.name and course.name not in facts:
+                facts[course.name] = CourseFacts(course)
+    return list(facts.values())
+
+
+def _build_mentions(facts):
+    """
+    Phrase -> course, from every catalog keyword plus the branch and
+    specialization signals the B.Tech router understands. A phrase shared
+    by several courses goes to the one without a specialization ("mtech
+    cse" is M.Tech CSE, not the integrated programme).
+    """
+    by_name = {f.name: f for f in facts}
+    candidates = {}
+
+    def add(phrase, course):
+        phrase = normalize(phrase)
+        if phrase and course is not None and course.name in by_name:
+            candidates.setdefault(phrase, []).append(course)
+
+    for f in facts:
+        for keyword in f.course.keywords:
+            add(keyword, f.course)
+
+    for branch, signals in BRANCH_SIGNALS.items():
+        base = CATALOG.find("btech", branch, "") or next(iter(CATALOG.by_branch("btech", branch)), None)
+        for signal in signals:
+            if signal not in AMBIGUOUS_SIGNALS:
+                add(signal, base)
+
+    for spec, signals in SPECIALIZATION_SIGNALS.items():
+        course = CATALOG.find("btech", "cse", spec)
+        for signal in signals:
+            add(signal, course)
+
+    mentions = {}
+    for phrase, courses in candidates.items():
+        course = min(courses, key=lambda c: bool(c.specialization))
+        mentions[phrase] = by_name[course.name]
+    return mentions
+
+
+FACTS = _build_facts()
+MENTIONS = _build_mentions(FACTS)
+_MENTION_PATTERN = re.compile(r"\b(" + trie_pattern(sorted(MENTIONS)) + r")\b")
+
+
+def find_mentions(text: str) -> list:
+    """
+    Courses named in the text, longest phrase first at each position, in
+    order of appearance and without repeats.
+    """
+    found = []
+    for m in _MENTION_PATTERN.finditer(text):
+        f = MENTIONS[m.group(1)]
+        if f not in found:
+            found.append(f)
+    return found
+
+
+def detect_metric(words: set):
+    if words & PACKAGE_WORDS:
+        return "average" if words & AVG_WORDS else "highest"
+    if words & SEAT_WORDS:
+        return "seats"
+    if words & DURATION_WORDS:
+        return "duration"
+    if words & ELIGIBILITY_WORDS:
+        return "eligibility"
+    return None
+
+
+def detect_aggregate(words: set):
+    if words & MAX_WORDS:
+        return "max"
+    if words & MIN_WORDS:
+        return "min"
+    # With no max/min word, "average package" and "average seats" both
+    # ask for the mean across courses.
+    if words & AVG_WORDS:
+        return "avg"
+    return None
+
+
+def detect_scope(text: str):
+    for scope, pattern in _SCOPE_PATTERNS:
+        if pattern.search(text):
+            return scope
+    return None
+
+
+def _format_number(value: float, unit: str) -> str:
+    if unit == "seats":
+        return f"{round(value)} seats"
+    return f"{value:.2f}".rstrip("0").rstrip(".") + f" {unit}"
+
+
+def format_ranking(metric: str, aggregate: str, courses, group: str) -> str:
+    unit = FIELDS[metric][3]
+    title = RANKING_TITLES[metric, aggregate]
+    ranked = [f for f in courses if f.values[metric] is not None]
+    unranked = [f for f in courses if f.values[metric] is None]
+    if not ranked:
+        return None
+
+    if aggregate == "avg":
+        mean = sum(f.values[metric] for f in ranked) / len(ranked)
+        lines = [f"📊 *{title} across {group}*", "",
+                 f"Average: {_format_number(mean, unit)} ({len(ranked)} courses)", ""]
+    else:
+        pick = max if aggregate == "max" else min
+        best = pick(f.values[metric] for f in ranked)
+        winners = [f for f in ranked if f.values[metric] == best]
+        lines = [f"📊 *{title} among {group}*", ""]
+        lines += [f"🏆 {f.name}: {f.text[metric]}" for f in winners]
+        lines.append("")
+
+    lines.append("*All courses*")
+    reverse = aggregate != "min"
+    for f in sorted(ranked, key=lambda f: f.values[metric], reverse=reverse):
+        lines.append(f"• {f.name}: {f.text[metric]}")
+    for f in unranked:
+        lines.append(f"• {f.name}: {f.text[metric]}")
+    return "\n".join(lines)
+
+
+def format_comparison(courses, metric=None) -> str:
+    metrics = (metric,) if metric else COMPARE_ORDER
+    lines = ["📊 *" + " vs ".join(f.name for f in courses) + "*"]
+    for m in metrics:
+        label = FIELDS[m][0] if m in FIELDS else TEXT_FIELDS[m][0]
+        lines += ["", f"*{label}*"]
+        lines += [f"• {f.name}: {f.text[m]}" for f in courses]
+    return "\n".join(lines)
+
+
+def format_fact(course, metric: str) -> str:
+    label = FIELDS[metric][0] if metric in FIELDS else TEXT_FIELDS[metric][0]
+    return f"🎓 *{course.name}*\n\n• {label}: {course.text[metric]}"
+
+
+def course_facts(query: str):
+    """
+    Answer an aggregate, comparison or single-course fact question about
+    the courses from the catalog, or None if the question is not one.
+    """
+    text = normalize_query(correct_entities(query.lower().strip())).course_text
+    words = set(text.split())
+    if words & (OPINION_WORDS | OTHER_SUBJECT_WORDS):
+        return None
+    mentions = find_mentions(text)
+    metric = detect_metric(words)
+
+    if metric is None:
+        # Side by side on every field: "compare btech cse and btech it".
+        if len(mentions) >= 2 and words & COMPARE_WORDS:
+            return format_comparison(mentions)
+        return None
+
+    aggregate = detect_aggregate(words) if metric in FIELDS else None
+    # "Lowest package" means the lowest typical package, not the lowest
+    # of the highest ones.
+    if metric == "highest" and aggregate == "min":
+        metric = "average"
+
+    if len(mentions) >= 2:
+        if aggregate in ("max", "min"):
+            return format_ranking(metric, aggregate, mentions, "the courses asked about")
+        return format_comparison(mentions, metric)
+
+    # "how many seats in btech cse" needs no aggregate word.
+    if len(mentions) == 1 and not words & GROUP_WORDS:
+        return format_fact(mentions[0], metric)
+
+    if aggregate is None:
+        return None
+
+    if len(mentions) == 1:
+        course = mentions[0].course
+        group = [f for f in FACTS if f.course.source == course.source and f.course.branch == course.branch]
+        return format_ranking(metric, aggregate, group, f"{course.branch.upper()} courses")
+
+    scope = detect_scope(text)
+    if scope is None:
+        return format_ranking(metric, aggregate, FACTS, "all NIET courses")
+    label, belongs = SCOPES[scope]
+    return format_ranking(metric, aggregate, [f for f in FACTS if belongs(f.course)], f"{label} courses")
@@ -0,0 +1,260 @@
+# entity_matcher.py
+#
+# Typo-tolerant lookup of the entity words in data_chunk: club, course and
+# event names, branches, specializations and keywords. SymSpell-style,
+# every entity word is indexed under each of its deletions up to
+# MAX_EDIT_DISTANCE characters, so a misspelled word finds its candidates
+# with a handful of dict lookups and only those few are checked with a
+# real edit distance.
+
+import json
+import os
+import re
+import threading
+from collections import Counter
+from functools import lru_cache
+from pathlib import Path
+
+from constant.intent_classifier import vocabulary
+from llm_model_gemini.retreiver.chunk_index import normalize
+from llm_model_gemini.retreiver.chunk_store import CHUNK_STORE
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+# Every word in these files counts as correctly spelled.
+VOCABULARY_DIRS = (PROJECT_ROOT / "data", PROJECT_ROOT / "data_chunk")
+
+MAX_EDIT_DISTANCE = int(os.getenv("FUZZY_MAX_DISTANCE", "2"))
+# Shorter words are left alone: too many real words sit one edit apart.
+MIN_WORD_LENGTH = 5
+# Words shorter than this get at most one edit.
+TWO_EDIT_LENGTH = 8
+
+# Everyday words students use that do not occur in the data but sit
+# within an edit or two of an entity word ("payments" / "patents"). Their
+# plurals and other inflections are covered by base_forms().
+COMMON_WORDS = {
+    "ambulance", "apply", "bank", "bus", "camera", "career", "coaching", "cooler",
+    "counsellor", "counselor", "direction", "distance", "doctor", "document", "dress",
+    "electricity", "entrance", "exam", "famous", "file", "government", "gym", "hire", "hospital",
+    "internship", "join", "laptop", "lecture", "loan", "location", "mentor", "nearby",
+    "nurse", "parking", "payment", "printer", "private", "professor", "ragging", "recruit",
+    "recruiter", "refund", "reputed", "restaurant", "result", "route", "rule", "salary",
+    "scholarship", "shop", "study", "teacher", "timing", "topper", "transport", "tutor",
+    "uniform", "wifi", "workshop",
+}
+
+# Suffix -> replacements tried by base_forms(), most specific first.
+INFLECTIONS = (
+    ("ies", ("y",)),
+    ("es", ("", "e")),
+    ("s", ("",)),
+    ("ied", ("y",)),
+    ("ed", ("", "e")),
+    ("ing", ("", "e")),
+    ("ly", ("",)),
+    ("er", ("", "e")),
+)
+
+# Chunk fields whose words are entity names.
+ENTITY_FIELDS = ("course", "event_name", "branch", "specialization")
+
+_WORD = re.compile(r"[a-z]+")
+
+
+def deletes(word: str, distance: int) -> set:
+    """
+    Every string obtained by deleting up to `distance` characters.
+    """
+    out = {word}
+    frontier = {word}
+    for _ in range(distance):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        out |= frontier
+    return out
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """
+    Optimal string alignment distance (insertions, deletions,
+    substitutions and adjacent transpositions), or limit + 1 once it is
+    known to exceed `limit`.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+
+    prev2 = None
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                cur[j] = min(cur[j], prev2[j - 2] + 1)
+        if min(cur) > limit:
+            return limit + 1
+        prev2, prev = prev, cur
+    return prev[-1]
+
+
+def base_forms(word: str) -> set:
+    """
+    Candidate base words of an inflected form: "faculties" -> "faculty",
+    "experienced" -> "experience"/"experienc", "payments" -> "payment".
+    """
+    out = set()
+    for suffix, replacements in INFLECTIONS:
+        stem = word[:-len(suffix)]
+        if word.endswith(suffix) and len(stem) >= 3:
+            out.update(stem + r for r in replacements)
+    return out
+
+
+def allowed_distance(word: str) -> int:
+    if len(word) < MIN_WORD_LENGTH:
+        return 0
+    return min(1 if len(word) < TWO_EDIT_LENGTH else 2, MAX_EDIT_DISTANCE)
+
+
+class EntityMatcher:
+    """
+    `entities` counts how often each entity word occurs (ties between
+    equally close candidates go to the more frequent one). `known` holds
+    every word in the data; those and their inflected forms are never
+    corrected.
+    """
+
+    def __init__(self, entities: Counter, known: set):
+        self.entities = entities
+        self.known = set(known) | set(entities)
+        self._index = {}  # deletion -> entity words
+        for word in entities:
+            for d in deletes(word, MAX_EDIT_DISTANCE):
+                self._index.setdefault(d, []).append(word)
+
+    def is_known(self, word: str) -> bool:
+        """
+        A correctly spelled word: in the data, or an inflection of a word
+        that is ("faculties" when "faculty" is known).
+        """
+        return word in self.known or not self.known.isdisjoint(base_forms(word))
+
+    def lookup(self, word: str):
+        """
+        The entity word closest to a misspelled `word`, or None. Candidates
+        must start with the same letter (first-letter typos are rare, and
+        "banking" is not "ranking"), must not be a truncation of the word
+        ("director" is not "direct") and must not be an inflection of it
+        ("journal" is not "journals").
+        """
+        limit = allowed_distance(word)
+        if not limit:
+            return None
+
+        best, best_key = None, None
+        seen = set()
+        for d in deletes(word, limit):
+            for candidate in self._index.get(d, ()):
+                if candidate in seen:
+                    continue
+                seen.add(candidate)
+                if candidate[0] != word[0] or word.startswith(candidate) or word in base_forms(candidate):
+                    continue
+                distance = edit_distance(word, candidate, limit)
+                if distance > limit:
+                    continue
+                key = (distance, -self.entities[candidate], candidate)
+                if best_key is None or key < best_key:
+                    best, best_key = candidate, key
+        return best
+
+    def correct(self, text: str) -> str:
+        """
+        `text` (lowercase) with every unknown word replaced by the closest
+        entity word, if there is one.
+        """
+        def fix(m):
+            word = m.group(0)
+            if self.is_known(word):
+                return word
+            return self.lookup(word) or word
+
+        return _WORD.sub(fix, text)
+
+
+def _strings(value):
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for v in value.values():
+            yield from _strings(v)
+    elif isinstance(value, list):
+        for v in value:
+            yield from _strings(v)
+
+
+def known_words() -> set:
+    """
+    Words that are never corrected: everything in the data files, every
+    keyword the intent classifier looks for and COMMON_WORDS.
+    """
+    words = set(vocabulary()) | COMMON_WORDS
+    for directory in VOCABULARY_DIRS:
+        for file in directory.rglob("*.json"):
+            try:
+                with open(file, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except Exception as e:
+                print(f"Failed to load {file.name}: {e}")
+                continue
+            for text in _strings(data):
+                words.update(_WORD.findall(text.lower()))
+    return words
+
+
+def build_matcher() -> EntityMatcher:
+    entities = Counter()
+    for chunk in CHUNK_STORE.get_many():
+        for field in ENTITY_FIELDS:
+            value = chunk.get(field)
+            if isinstance(value, str):
+                entities.update(normalize(value).split())
+        for keyword in chunk.get("keywords", []) or []:
+            entities.update(normalize(keyword).split())
+
+    # Only alphabetic words are worth correcting towards.
+    entities = Counter({w: n for w, n in entities.items() if w.isalpha() and len(w) >= MIN_WORD_LENGTH})
+    return EntityMatcher(entities, known_words())
+
+
+_matcher = None
+_matcher_version = None
+_lock = threading.Lock()
+
+
+def entity_matcher() -> EntityMatcher:
+    """
+    The matcher for the current chunks; rebuilt when data_chunk changes.
+    """
+    global _matcher, _matcher_version
+    version = CHUNK_STORE.version
+    if _matcher is None or _matcher_version != version:
+        with _lock:
+            if _matcher is None or _matcher_version != version:
+                _matcher = build_matcher()
+                _matcher_version = version
+                _correct.cache_clear()
+    return _matcher
+
+
+@lru_cache(maxsize=4096)
+def _correct(text: str, version: int) -> str:
+    return entity_matcher().correct(text)
+
+
+def correct_entities(text: str) -> str:
+    """
+    Lowercase `text` with misspelled entity names fixed
+    ("katputliyan" -> "kathputliyaan").
+    """
+    return _correct(text, CHUNK_STORE.version)
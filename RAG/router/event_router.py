@@ -3,6 +3,8 @@ import os, sys
 from pathlib import Path
 import json
 
+from constant.query_normalizer import normalize_query
+
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
 
 DATA_PATH = Path(__file__).resolve().parent.parent / "data_chunk" /"event_data_chunk"/ "event_chunks.json"
@@ -11,15 +13,9 @@ with open(DATA_PATH, "r", encoding="utf-8") as f:
     DATA = json.load(f)
 
 
-def event_normalize(q: str) -> str:
-    q = q.lower().strip()
-    for ch in ["?", ",", ".", ":", "-"]:
-        q = q.replace(ch, " ")
-    return " ".join(q.split())
-
-
 def event_router(query: str):
-    q = event_normalize(query)
+    nq = normalize_query(query)
+    q = nq.plain
 
     for item in DATA:
         if item.get("category") != "event":
@@ -34,7 +30,7 @@ def event_router(query: str):
             continue
 
         for kw in item.get("keywords", []):
-            if kw.lower() in q.split():
+            if kw.lower() in nq.token_set:
                 return item.get("answer")
 
     if any(w in q for w in ["event", "events", "happening", "happenings", "news"]):
@@ -1,6 +1,7 @@
 import json
 import os
 import re
+import threading
 
 from llm_model_gemini.llm.gemini_client import generate_answer
 # Project root (RAG/)
@@ -13,15 +14,20 @@ DATA_PATH = os.path.join(
     "facility_chunks.json"
 )
 
-with open(DATA_PATH, "r", encoding="utf-8") as f:
-    FACILITY_DATA = json.load(f)
+ACADEMIC_URL = "https://niet.co.in/infrastructure/academic-facilities"
+HOSTEL_URL = "https://niet.co.in/campus-facilities/about-hostel"
+
+# Words the router answers to; anything else returns None straight away.
+FACILITY_TRIGGERS = ("academic", "hostel", "facility", "facilities")
+
+_LINES = re.compile(r"\n+|\. ")
 
 
 def to_bullets(text: str):
     """
     Convert paragraphs into bullet points
     """
-    lines = re.split(r"\n+|\. ", text)
+    lines = _LINES.split(text)
     bullets = []
     for line in lines:
         line = line.strip()
@@ -30,20 +36,15 @@ def to_bullets(text: str):
     return bullets
 
 
-def extract_url(text: str):
-    match = re.search(r"https?://\S+", text)
-    return match.group(0) if match else None
-
-
-def facility_router(query: str):
-    q = query.lower()
-
+def build_responses(data) -> dict:
+    """
+    Render the three answers (academic, hostel, both) from the facility
+    chunks.
+    """
     academic_points = []
     hostel_points = []
-    academic_url = None
-    hostel_url = None
 
-    for item in FACILITY_DATA:
+    for item in data:
         if not isinstance(item, dict):
             continue
 
@@ -53,46 +54,74 @@ def facility_router(query: str):
         if not answer:
             continue
 
-        bullets = to_bullets(answer)
-        url = extract_url(answer)
-
         if category == "campus_facilities":
-            academic_points.extend(bullets)
-            if url:
-                academic_url = url
+            academic_points.extend(to_bullets(answer))
 
         if category == "hostel_facilities":
-            hostel_points.extend(bullets)
-            if url:
-                hostel_url = url
-    academic_url="https://niet.co.in/infrastructure/academic-facilities"
+            hostel_points.extend(to_bullets(answer))
+
+    academic = "\n".join(academic_points) + f"\n\n🔗 {ACADEMIC_URL}"
+    hostel = "\n".join(hostel_points) + f"\n\n🔗 {HOSTEL_URL}"
+
+    return {
+        "academic": "Academic Facilities at NIET\n\n" + academic,
+        "hostel": "Hostel Facilities at NIET\n\n" + hostel,
+        "both": (
+            "🏫 Academic Facilities at NIET\n\n" + academic
+            + "\n\n"
+            + "🏠 Hostel Facilities at NIET\n\n" + hostel
+        ),
+    }
+
+
+FACILITY_DATA = []
+FACILITY_RESPONSES = {}
+_data_mtime = None
+_lock = threading.Lock()
+
+
+def load_facilities(force: bool = False):
+    """
+    (Re)load the facility chunks and re-render the answers, if the file
+    changed since the last load.
+    """
+    global FACILITY_DATA, FACILITY_RESPONSES, _data_mtime
+    try:
+        mtime = os.stat(DATA_PATH).st_mtime_ns
+    except OSError:
+        mtime = None
+    if not force and mtime == _data_mtime and FACILITY_RESPONSES:
+        return
+
+    with _lock:
+        with open(DATA_PATH, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        FACILITY_DATA = data
+        FACILITY_RESPONSES = build_responses(data)
+        _data_mtime = mtime
+
+
+load_facilities(force=True)
+
+
+def facility_router(query: str):
+    q = query.lower()
+
+    if not any(word in q for word in FACILITY_TRIGGERS):
+        return None
+
+    load_facilities()
+
     # Academic only
     if "academic" in q:
-        return (
-            "Academic Facilities at NIET\n\n"
-            + "\n".join(academic_points)
-            + (f"\n\n🔗 {academic_url}" if academic_url else "")
-        )
-    hostel_url="https://niet.co.in/campus-facilities/about-hostel"
+        return FACILITY_RESPONSES["academic"]
+
     # Hostel only
     if "hostel" in q:
-        return (
-            "Hostel Facilities at NIET\n\n"
-            + "\n".join(hostel_points)
-            + (f"\n\n🔗 {hostel_url}" if hostel_url else "")
-        )
+        return FACILITY_RESPONSES["hostel"]
 
     # Both
-    if "facility" in q or "facilities" in q:
-        return (
-            "🏫 Academic Facilities at NIET\n\n"
-            + "\n".join(academic_points)
-            + (f"\n\n🔗 {academic_url}" if academic_url else "")
-            + "\n\n"
-            + "🏠 Hostel Facilities at NIET\n\n"
-            + "\n".join(hostel_points)
-            + (f"\n\n🔗 {hostel_url}" if hostel_url else "")
-        )
+    return FACILITY_RESPONSES["both"]
 
 
 # ---- Local test ----
@@ -1,8 +1,8 @@
 import json
-import re
 from pathlib import Path
 from typing import Optional
 from llm_model_gemini.chat import chat
+from constant.query_normalizer import normalize_query
 
 # ---------------- Paths ----------------
 
@@ -15,12 +15,6 @@ with open(DATA_PATH, "r", encoding="utf-8") as f:
 
 # ---------------- Helpers ----------------
 
-def normalize(text: str) -> str:
-    text = text.lower()
-    text = re.sub(r"[^a-z0-9\s]", " ", text)
-    return " ".join(text.split())
-
-
 INSTITUTE_KEYWORDS = [
     "college",
     "about",
@@ -42,7 +36,7 @@ INSTITUTE_KEYWORDS = [
 # ---------------- Router ----------------
 
 def institute_router(query: str) -> Optional[str]:
-    q = normalize(query)
+    q = normalize_query(query).alnum
 
     # Fast intent check
     if not any(k in q for k in INSTITUTE_KEYWORDS):
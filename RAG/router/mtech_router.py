@@ -1,22 +1,7 @@
-import json, os, re
-
-# ---------------- LOAD DATA ----------------
-MTECH_PATH = os.path.join(
-    os.path.dirname(__file__),
-    "../data_chunk/course_data_chunk/mtech_chunks.json"
-)
-
-with open(MTECH_PATH, "r", encoding="utf-8") as f:
-    MTECH_DATA = json.load(f)
+from constant.query_normalizer import normalize_query
+from router.course_catalog import CATALOG
 
 # ---------------- HELPERS ----------------
-def normalize(text: str) -> str:
-    text = text.lower()
-    text = text.replace("&", "and")
-    text = re.sub(r"[^\w\s]", " ", text)
-    return " ".join(text.split())
-
-
 def extract_mtech_intent(q: str):
     intent = {
         "branch": None,
@@ -70,7 +55,7 @@ def format_full_mtech_course(c: dict) -> str:
 
 
 def mtech_router(query: str):
-    q = normalize(query)
+    q = normalize_query(query).course_text
 
     if not any(k in q for k in [
         "mtech", "m tech", "master of technology",
@@ -82,38 +67,29 @@ def mtech_router(query: str):
     best_course = None
 
     if intent["branch"] and intent["specialization"]:
-        for c in MTECH_DATA:
-            if (
-                c.get("type") == "mtech"
-                and c.get("branch") == intent["branch"]
-                and c.get("specialization") == intent["specialization"]
-            ):
-                best_course = c
-                break
+        best_course = CATALOG.find("mtech", intent["branch"], intent["specialization"], type="mtech")
 
     if not best_course and intent["branch"]:
-        for c in MTECH_DATA:
-            if c.get("type") == "mtech" and c.get("branch") == intent["branch"]:
-                best_course = c
-                break
+        courses = CATALOG.by_branch("mtech", intent["branch"], type="mtech")
+        best_course = courses[0] if courses else None
 
     if not best_course:
         best_score = -1
-        for c in MTECH_DATA:
+        for course in CATALOG.courses("mtech"):
             score = 0
-            for kw in map(normalize, c.get("keywords", [])):
+            for kw in course.keywords:
                 if kw == q:
                     score += 100
                 elif kw in q:
                     score += 30
             if score > best_score:
                 best_score = score
-                best_course = c
+                best_course = course
 
     if not best_course:
         return None
 
-    c = best_course
+    c = best_course.record
 
     if "seat" in q:
         return f"Seats: {c['properties'].get('seats','Not available')}"
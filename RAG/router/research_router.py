@@ -1,6 +1,8 @@
 import json
 import os
 
+from constant.query_normalizer import normalize_query
+
 # ---------- Load Research Chunk Data ----------
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 
@@ -18,13 +20,6 @@ OFFICIAL_RESEARCH_URL = "https://www.niet.co.in/research/overview"
 
 
 # ---------- Helpers ----------
-def normalize(q: str) -> str:
-    q = q.lower().strip()
-    for ch in ["?", ",", ".", "-", "_"]:
-        q = q.replace(ch, " ")
-    return " ".join(q.split())
-
-
 def bullets_from_lines(lines):
     return "\n".join(f"• {line}" for line in lines if line.strip())
 
@@ -51,7 +46,7 @@ def parse_project_answer(text: str):
 
 # ---------- Main Router ----------
 def research_router(query: str):
-    q = normalize(query)
+    q = normalize_query(query).plain
 
     # 🔹 FULL research (explicit request only)
     if any(k in q for k in [
@@ -1,4 +1,5 @@
-import re
+from constant.query_normalizer import normalize_query
+from router.course_catalog import CATALOG
 
 TWINNING_PROGRAMS = [
     {
@@ -121,18 +122,18 @@ TWINNING_PROGRAMS = [
 }
 ]
 
-# HELPERS
+CATALOG.add("twinning", TWINNING_PROGRAMS)
 
-def normalize(text: str) -> str:
-    if not text:
-        return ""
-    text = text.lower()
-    text = re.sub(r"[^\w\s]", " ", text)
-    return " ".join(text.split())
+# Keyword tokens of each program, for the last-resort keyword match.
+PROGRAM_TOKENS = [
+    (course, " ".join(course.keywords).split())
+    for course in CATALOG.courses("twinning")
+]
 
+# HELPERS
 
 def is_twinning_query(query: str) -> bool:
-    q = normalize(query)
+    q = normalize_query(query).text
     return any(word in q for word in [
         "twinning",
         "international",
@@ -163,7 +164,7 @@ def twinning_router(query: str):
     if not is_twinning_query(query):
         return None
 
-    q = normalize(query)
+    q = normalize_query(query).text
 
     specialization_intent = None
     if "aiml" in q or "machine learning" in q:
@@ -180,39 +181,28 @@ def twinning_router(query: str):
         branch_intent = "it"
 
     if specialization_intent and branch_intent:
-        for program in TWINNING_PROGRAMS:
-            text = normalize(
-                program.get("course", "") + " " + " ".join(program.get("keywords", []))
-            )
-
-            if (
-                specialization_intent in text
-                and branch_intent == program.get("branch")
-            ):
-                return format_twinning(program)  
+        for program in CATALOG.by_branch("twinning", branch_intent):
+            if specialization_intent in program.text:
+                return format_twinning(program.record)
 
     if branch_intent == "cse" and not specialization_intent:
-        results = [
-            p for p in TWINNING_PROGRAMS
-            if p.get("branch") == "cse"
-        ]
+        results = CATALOG.by_branch("twinning", "cse")
 
         if results:
-            return "\n\n".join(format_twinning(p) for p in results)
+            return "\n\n".join(format_twinning(p.record) for p in results)
 
     if branch_intent == "it":
-        for program in TWINNING_PROGRAMS:
-            if program.get("branch") == "it":
-                return format_twinning(program)
+        results = CATALOG.by_branch("twinning", "it")
+        if results:
+            return format_twinning(results[0].record)
 
-    results = []
-    for program in TWINNING_PROGRAMS:
-        keywords = normalize(" ".join(program.get("keywords", [])))
-        if any(k in q for k in keywords.split()):
-            results.append(program)
+    results = [
+        program for program, tokens in PROGRAM_TOKENS
+        if any(k in q for k in tokens)
+    ]
 
     if results:
-        return "\n\n".join(format_twinning(p) for p in results)
+        return "\n\n".join(format_twinning(p.record) for p in results)
 
     return "\n\n".join(format_twinning(p) for p in TWINNING_PROGRAMS)
 
@@ -1,13 +1,13 @@
-import json, os, re
+import re
 
-DATA_PATH = os.path.join(os.path.dirname(__file__), "../data_chunk/course_data_chunk/ug_pg_chunks.json")
-with open(DATA_PATH, "r", encoding="utf-8") as f:
-    UGPG_DATA = json.load(f)
+from constant.query_normalizer import normalize_query
+from router.course_catalog import CATALOG
 
-def normalize(q: str):
-    q = q.lower()
-    q = re.sub(r"[^\w\s]", " ", q)
-    return " ".join(q.split())
+# (course, [(keyword, whole-word pattern)]) with the patterns compiled once.
+UGPG_KEYWORDS = [
+    (course, [(k, re.compile(rf"\b{k}\b")) for k in course.keywords])
+    for course in CATALOG.courses("ug_pg")
+]
 
 EMPTY_FIELD_WORDS = ["seat","seats","duration","year","years","time","timing"]
 COURSE_HINTS = ["mba","mca","bca","bba","integrated"]
@@ -37,21 +37,20 @@ def format_ugpg_course(course: dict) -> str:
 - """ + "\n- ".join(course.get("why_choose", []))
 
 def ug_pg_router(query: str):
-    q = normalize(query)
+    q = normalize_query(query).text
 
 
     best_course = None
     best_score = 0
 
-    for data in UGPG_DATA:
-        keywords = [normalize(k) for k in data.get("keywords", [])]
+    for course, keywords in UGPG_KEYWORDS:
         score = 0
 
-        for k in keywords:
+        for k, pattern in keywords:
             if q == k:
                 score += 100
 
-            elif re.search(rf"\b{k}\b", q):
+            elif pattern.search(q):
                 score += 50
 
             elif k in q:
@@ -59,12 +58,12 @@ def ug_pg_router(query: str):
 
         if score > best_score:
             best_score = score
-            best_course = data
+            best_course = course
 
     if not best_course or best_score < 30:
         return None
 
-    c = best_course
+    c = best_course.record
 
 
     if any(w in q for w in ["placement", "package", "salary", "highest", "average"]):
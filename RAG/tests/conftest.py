@@ -0,0 +1,21 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# The LLM clients and the callback router read these at import; tests
+# never reach the real services.
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("GOOGLE_API_KEY", "test")
+os.environ.setdefault("MONGO_URI", "mongodb://localhost:1")
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+
+@pytest.fixture(autouse=True)
+def fresh_breakers(monkeypatch):
+    # Provider failures a test provokes must not open the breakers of the
+    # next one.
+    from llm_model_gemini.llm import circuit_breaker
+    monkeypatch.setattr(circuit_breaker, "_breakers", {})
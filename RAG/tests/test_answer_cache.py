@@ -0,0 +1,76 @@
+import asyncio
+import threading
+import time
+
+from llm_model_gemini.answer_cache import AnswerCache, MemoryBackend
+
+
+class _SlowBackend(MemoryBackend):
+    """
+    Stands in for Redis: every call blocks its thread for a while.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.threads = []
+
+    def get(self, key):
+        self.threads.append(threading.current_thread())
+        time.sleep(0.1)
+        return super().get(key)
+
+    def set(self, key, answer, ttl):
+        self.threads.append(threading.current_thread())
+        time.sleep(0.1)
+        super().set(key, answer, ttl)
+
+
+def test_blocking_backend_is_called_off_the_event_loop(monkeypatch):
+    monkeypatch.setattr(AnswerCache, "_current_version", lambda self: "v1")
+    backend = _SlowBackend()
+    cache = AnswerCache(backend)
+
+    async def main():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        tick_task = asyncio.create_task(ticker())
+        await cache.astore("what is the fee for btech", "The fee is ...")
+        answer = await cache.alookup("what is the fee for btech")
+        tick_task.cancel()
+        return threading.current_thread(), answer, ticks
+
+    loop_thread, answer, ticks = asyncio.run(main())
+    assert answer == "The fee is ..."
+    assert backend.threads and loop_thread not in backend.threads
+    # The loop kept running while the backend calls slept.
+    assert ticks >= 5
+
+
+def test_data_version_check_runs_off_the_event_loop(monkeypatch):
+    threads = []
+
+    def version(self):
+        threads.append(threading.current_thread())
+        return "v1"
+
+    monkeypatch.setattr(AnswerCache, "_current_version", version)
+    cache = AnswerCache(MemoryBackend())
+
+    async def main():
+        await cache.astore("what is the fee for btech", "The fee is ...")
+        return threading.current_thread(), await cache.alookup("what is the fee for btech")
+
+    loop_thread, answer = asyncio.run(main())
+    assert answer == "The fee is ..."
+    assert threads and loop_thread not in threads
+
+
+def test_disabled_cache_answers_nothing():
+    cache = AnswerCache(None)
+    assert asyncio.run(cache.alookup("what is the fee for btech")) is None
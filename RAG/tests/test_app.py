@@ -0,0 +1,36 @@
+from fastapi.testclient import TestClient
+
+import app
+from llm_model_gemini.llm.gemini_client import HIGH_TRAFFIC_MESSAGE
+
+client = TestClient(app.app)
+
+
+def _fail(question):
+    raise RuntimeError("boom")
+
+
+def test_chat_error_returns_the_shared_high_traffic_message(monkeypatch):
+    monkeypatch.setattr(app, "plan_chat", _fail)
+    body = client.post("/chat", json={"question": "hello"}).json()
+    assert body == {"type": "normal", "answer": HIGH_TRAFFIC_MESSAGE}
+
+
+def test_stream_error_returns_the_shared_high_traffic_message(monkeypatch):
+    monkeypatch.setattr(app, "plan_chat", _fail)
+    text = client.post("/chat/stream", json={"question": "hello"}).text
+    assert "event: done" in text
+    assert HIGH_TRAFFIC_MESSAGE.split("https")[0] in text
+
+
+def test_stream_cut_off_midway_ends_with_an_error_event(monkeypatch):
+    async def broken(question, session_id=None):
+        yield "NIET offers "
+        raise RuntimeError("connection reset")
+
+    monkeypatch.setattr(app, "plan_chat", lambda question: (None, question, None))
+    monkeypatch.setattr(app, "astream_chat", broken)
+    text = client.post("/chat/stream", json={"question": "which courses"}).text
+    assert "event: token" in text
+    assert "event: error" in text
+    assert "event: done" not in text
@@ -0,0 +1,74 @@
+import asyncio
+import threading
+
+import pytest
+
+from llm_model_gemini import chat
+from llm_model_gemini.llm import gemini_client
+from llm_model_gemini.memory.chat_memory import get
+
+
+def test_retrieval_runs_off_the_event_loop(monkeypatch):
+    threads = []
+
+    def retrieve(query, top_k=3):
+        threads.append(threading.current_thread())
+        return ["NIET offers B.Tech and M.Tech programmes."]
+
+    monkeypatch.setattr(chat, "retrieve_chunks", retrieve)
+    monkeypatch.setattr(chat.ANSWER_CACHE, "backend", None)
+
+    async def main():
+        return threading.current_thread(), await chat.aprepare_chat("which programmes are offered", "prep-session")
+
+    loop_thread, (reply, prompt_args) = asyncio.run(main())
+    assert reply is None
+    assert prompt_args[3] == "NIET offers B.Tech and M.Tech programmes."
+    assert threads and loop_thread not in threads
+
+
+def test_cut_off_stream_is_neither_cached_nor_remembered(monkeypatch):
+    async def cut_off(prompt):
+        yield "NIET offers "
+        yield "B.Tech in"
+        raise RuntimeError("connection reset")
+
+    async def unused(prompt):
+        raise AssertionError("no fallback once text was sent")
+        yield
+
+    monkeypatch.setattr(gemini_client, "_openai_stream", cut_off)
+    monkeypatch.setattr(gemini_client, "_gemini_stream", unused)
+    monkeypatch.setattr(chat, "retrieve_chunks", lambda query, top_k=3: [])
+    monkeypatch.setattr(chat.ANSWER_CACHE, "_current_version", lambda: "v1")
+    question = "which b.tech courses are offered at the campus"
+
+    received = []
+
+    async def main():
+        async for text in chat.astream_chat(question, "cut-off-session"):
+            received.append(text)
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(main())
+    assert received == ["NIET offers ", "B.Tech in"]
+    assert chat.ANSWER_CACHE.lookup(question) is None
+    assert get("cut-off-session") == [{"role": "user", "content": question}]
+
+
+def test_finished_stream_is_cached_and_remembered(monkeypatch):
+    async def full(prompt):
+        yield "NIET offers "
+        yield "B.Tech and MBA."
+
+    monkeypatch.setattr(gemini_client, "_openai_stream", full)
+    monkeypatch.setattr(chat, "retrieve_chunks", lambda query, top_k=3: [])
+    monkeypatch.setattr(chat.ANSWER_CACHE, "_current_version", lambda: "v1")
+    question = "which programmes are offered at the campus"
+
+    async def main():
+        return [text async for text in chat.astream_chat(question, "full-session")]
+
+    assert asyncio.run(main()) == ["NIET offers ", "B.Tech and MBA."]
+    assert chat.ANSWER_CACHE.lookup(question) == "NIET offers B.Tech and MBA."
+    assert get("full-session")[-1] == {"role": "assistant", "content": "NIET offers B.Tech and MBA."}
@@ -0,0 +1,106 @@
+from llm_model_gemini.memory import chat_memory
+from llm_model_gemini.memory.chat_memory import add, clear, get
+
+
+def test_sessions_are_isolated():
+    add("user", "what is the fee for btech", "alice")
+    add("assistant", "The B.Tech fee is ...", "alice")
+    add("user", "hostel facilities", "bob")
+
+    assert get("alice") == [
+        {"role": "user", "content": "what is the fee for btech"},
+        {"role": "assistant", "content": "The B.Tech fee is ..."},
+    ]
+    assert get("bob") == [{"role": "user", "content": "hostel facilities"}]
+
+    clear("alice")
+    assert get("alice") == []
+    assert get("bob") == [{"role": "user", "content": "hostel facilities"}]
+    clear("bob")
+
+
+def test_requests_without_a_session_keep_no_history():
+    sessions = chat_memory.memory_stats()["sessions"]
+    for session_id in (None, ""):
+        add("user", "my phone number is 98xxxxxx", session_id)
+        add("assistant", "Noted.", session_id)
+        assert get(session_id) == []
+    assert chat_memory.memory_stats()["sessions"] == sessions
+
+
+def _long_turn(i):
+    # About 50 tokens, whichever counter is in use.
+    return f"Answer number {i}. " + "The campus has labs, hostels and a library for students. " * 4
+
+
+def _compacting(monkeypatch, budget=120, keep=2, summary_tokens=150):
+    monkeypatch.setattr(chat_memory, "HISTORY_COMPACTION", True)
+    monkeypatch.setattr(chat_memory, "HISTORY_TOKEN_BUDGET", budget)
+    monkeypatch.setattr(chat_memory, "HISTORY_KEEP_TURNS", keep)
+    monkeypatch.setattr(chat_memory, "HISTORY_SUMMARY_TOKENS", summary_tokens)
+    monkeypatch.setattr(chat_memory, "SESSION_MAX_TURNS", 50)
+
+
+def test_no_compaction_under_the_budget(monkeypatch):
+    _compacting(monkeypatch, budget=10_000)
+    for i in range(4):
+        add("assistant", _long_turn(i), "small")
+    history = get("small")
+    assert [turn["role"] for turn in history] == ["assistant"] * 4
+    clear("small")
+
+
+def test_compaction_folds_older_turns_into_a_summary(monkeypatch):
+    _compacting(monkeypatch)
+    before = chat_memory.memory_stats()["compactions"]
+    add("user", "Tell me about the campus facilities at NIET please", "compact")
+    add("assistant", _long_turn(1), "compact")
+    add("user", "and the hostels?", "compact")
+    add("assistant", _long_turn(2), "compact")
+
+    history = get("compact")
+    assert chat_memory.memory_stats()["compactions"] > before
+    summary, *kept = history
+    assert summary["role"] == "Summary of earlier conversation"
+    assert summary["content"].splitlines()[0] == "user: Tell me about the campus facilities at NIET please"
+    assert "assistant: Answer number 1." in summary["content"]
+    # The last HISTORY_KEEP_TURNS turns stay verbatim.
+    assert kept == [
+        {"role": "user", "content": "and the hostels?"},
+        {"role": "assistant", "content": _long_turn(2)},
+    ]
+    clear("compact")
+
+
+def test_summary_is_replaced_not_stacked(monkeypatch):
+    _compacting(monkeypatch, summary_tokens=20)
+    for i in range(12):
+        add("assistant", _long_turn(i), "long")
+
+    history = get("long")
+    summaries = [turn for turn in history if turn["role"] == "Summary of earlier conversation"]
+    assert len(summaries) == 1 and history[0] is summaries[0]
+    lines = summaries[0]["content"].splitlines()
+    # Only the newest folded turns fit the summary budget.
+    assert lines[-1] == "assistant: Answer number 9."
+    assert not any("Answer number 0." in line for line in lines)
+    assert chat_memory.count_tokens(summaries[0]["content"]) <= 20 or len(lines) == 1
+    clear("long")
+
+
+def test_compaction_off_keeps_raw_turns(monkeypatch):
+    _compacting(monkeypatch)
+    monkeypatch.setattr(chat_memory, "HISTORY_COMPACTION", False)
+    monkeypatch.setattr(chat_memory, "SESSION_MAX_TURNS", 3)
+    for i in range(5):
+        add("assistant", _long_turn(i), "raw")
+    assert get("raw") == [{"role": "assistant", "content": _long_turn(i)} for i in (2, 3, 4)]
+    clear("raw")
+
+
+def test_summarize_turn_strips_markup_and_cuts_long_sentences():
+    line = chat_memory.summarize_turn({"role": "assistant", "content": "🎓 *B.Tech CSE*\n\n• Seats: 360"})
+    assert line == "assistant: B.Tech CSE"
+    words = " ".join(f"w{i}" for i in range(30))
+    assert chat_memory.summarize_turn({"role": "user", "content": words}) == \
+        "user: " + " ".join(f"w{i}" for i in range(20)) + " ..."
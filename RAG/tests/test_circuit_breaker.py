@@ -0,0 +1,119 @@
+import pytest
+
+from llm_model_gemini.llm import circuit_breaker
+from llm_model_gemini.llm.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(circuit_breaker, "time", clock)
+    monkeypatch.setattr(circuit_breaker, "BREAKER_WINDOW", 60.0)
+    monkeypatch.setattr(circuit_breaker, "BREAKER_MIN_CALLS", 4)
+    monkeypatch.setattr(circuit_breaker, "BREAKER_ERROR_RATE", 0.5)
+    monkeypatch.setattr(circuit_breaker, "BREAKER_SLOW_CALL", 10.0)
+    monkeypatch.setattr(circuit_breaker, "BREAKER_SLOW_RATE", 0.75)
+    monkeypatch.setattr(circuit_breaker, "BREAKER_COOLDOWN", 30.0)
+    return clock
+
+
+def _trip(b):
+    for _ in range(4):
+        assert b.allow()
+        b.record(False, 0.1)
+    assert b.state == OPEN
+
+
+def test_stays_closed_below_min_calls(clock):
+    b = CircuitBreaker("few")
+    for _ in range(3):
+        b.record(False, 0.1)
+    assert b.state == CLOSED and b.allow()
+
+
+def test_error_rate_trips_then_probe_closes(clock):
+    b = CircuitBreaker("errors")
+    _trip(b)
+    assert b.trips == 1
+    assert not b.allow()
+
+    clock.now += 31
+    assert b.allow()
+    assert b.state == HALF_OPEN
+    b.record(True, 0.2)
+    assert b.state == CLOSED
+    assert b.health()["calls"] == 0
+    assert b.allow()
+
+
+def test_half_open_lets_a_single_probe_through(clock):
+    b = CircuitBreaker("probe")
+    _trip(b)
+    clock.now += 31
+    assert b.allow()
+    assert not b.allow()
+    assert not b.allow()
+
+
+def test_failed_probe_reopens_for_another_cooldown(clock):
+    b = CircuitBreaker("reopen")
+    _trip(b)
+    clock.now += 31
+    assert b.allow()
+    b.record(False, 0.1)
+    assert b.state == OPEN and b.trips == 2
+    assert not b.allow()
+    clock.now += 31
+    assert b.allow()
+
+
+def test_slow_probe_counts_as_failed(clock):
+    b = CircuitBreaker("slow_probe")
+    _trip(b)
+    clock.now += 31
+    assert b.allow()
+    b.record(True, 12.0)
+    assert b.state == OPEN
+
+
+def test_released_probe_frees_the_slot(clock):
+    b = CircuitBreaker("release")
+    _trip(b)
+    clock.now += 31
+    assert b.allow()
+    b.release()
+    assert b.state == HALF_OPEN
+    assert b.allow()
+
+
+def test_slow_call_rate_trips(clock):
+    b = CircuitBreaker("slow")
+    b.record(True, 0.5)
+    for _ in range(3):
+        b.record(True, 11.0)
+    assert b.state == OPEN
+    assert b.health()["slow_rate"] == 0.75
+
+
+def test_old_calls_leave_the_window(clock):
+    b = CircuitBreaker("window")
+    for _ in range(3):
+        b.record(False, 0.1)
+    clock.now += 61
+    b.record(True, 0.1)
+    b.record(False, 0.1)
+    assert b.state == CLOSED
+    assert b.health()["calls"] == 2
+
+
+def test_breaker_is_shared_per_name():
+    assert circuit_breaker.breaker("same") is circuit_breaker.breaker("same")
+    assert "same" in circuit_breaker.breaker_health()
@@ -0,0 +1,48 @@
+from llm_model_gemini import context_builder
+
+
+def _force_rebuild(monkeypatch):
+    # An empty cache for this test only; the module's own is put back after.
+    monkeypatch.setattr(context_builder, "_cache", {key: None for key in context_builder._cache})
+
+
+def test_rebuild_does_not_write_artifact(monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("artifact written from the request path")
+
+    monkeypatch.setattr(context_builder, "save_context_artifact", fail)
+    _force_rebuild(monkeypatch)
+    context, _ = context_builder.assemble_context("what is the fee")
+    assert context
+
+
+def test_unclassified_query_keeps_admission_and_courses():
+    context, report = context_builder.assemble_context("what is the fee")
+    assert report["source"] == "all"
+    assert "ADMISSION INFORMATION" in context
+    assert "COURSES OFFERED" in context
+    assert "admission" not in report["dropped"]
+
+
+def test_pruning_keeps_admission_first_under_a_small_budget():
+    context, report = context_builder.assemble_context("what is the fee", budget=1300)
+    assert "ADMISSION INFORMATION" in context
+    assert "about" in report["dropped"] or "about" in report["trimmed"]
+
+
+def test_artifact_in_another_format_is_rebuilt(tmp_path):
+    old = tmp_path / "static_context.json"
+    # Older layout: no format version and one flat context string
+    # instead of per-section texts.
+    old.write_text('{"fingerprint": "%s", "context": "x"}' % context_builder._content_hash())
+    assert not context_builder.load_context_artifact(old)
+
+
+def test_artifact_round_trip(tmp_path, monkeypatch):
+    path = tmp_path / "static_context.json"
+    context_builder.build_context()
+    context_builder.save_context_artifact(path)
+    _force_rebuild(monkeypatch)
+    assert context_builder.load_context_artifact(path)
+    assert context_builder.build_context() == context_builder._cache["context"]
+    assert "ADMISSION INFORMATION" in context_builder.build_context()
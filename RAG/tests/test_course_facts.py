@@ -0,0 +1,61 @@
+import pytest
+
+from router.course_facts import course_facts, detect_scope
+
+
+@pytest.mark.parametrize("query, first_line", [
+    # max / min / avg rankings
+    ("which btech branch has highest package", "📊 *Highest package among B.Tech courses*"),
+    ("which branch has highest package in mtech", "📊 *Highest package among M.Tech courses*"),
+    ("which btech branch has lowest package", "📊 *Lowest average package among B.Tech courses*"),
+    ("which mtech has lowest seats", "📊 *Fewest seats among M.Tech courses*"),
+    ("which course has most seats", "📊 *Most seats among all NIET courses*"),
+    ("average package of btech", "📊 *Average package across B.Tech courses*"),
+    ("which cse specialization has highest package", "📊 *Highest package among CSE courses*"),
+    # comparisons
+    ("compare btech cse and btech it", "📊 *B.Tech CSE vs B.Tech-Information Technology*"),
+    ("btech cse vs btech it seats", "📊 *B.Tech CSE vs B.Tech-Information Technology*"),
+    # single-course facts, with or without an aggregate word
+    ("how many seats in btech cse", "🎓 *B.Tech CSE*"),
+    ("what is the duration of mba", "🎓 *MBA - Master of Business Administration*"),
+])
+def test_answered_from_the_catalog(query, first_line):
+    answer = course_facts(query)
+    assert answer is not None
+    assert answer.splitlines()[0] == first_line
+
+
+def test_single_fact_shows_the_field():
+    assert course_facts("how many seats in btech cse").splitlines()[-1].startswith("• Seats: ")
+
+
+def test_lowest_package_ranks_by_average_package():
+    lines = course_facts("which btech branch has lowest package").splitlines()
+    assert lines[2].endswith("LPA (approx)")
+
+
+@pytest.mark.parametrize("query", [
+    "which company gave highest package",
+    "which recruiters offer the highest package",
+    "which branch is best for placement",
+    "which has better placement cse or aiml",
+    "is btech cse placement good",
+    "can i get placement in btech cse",
+    "what is the fee for btech",
+    "tell me about niet",
+    "which branch",
+])
+def test_left_to_the_llm(query):
+    assert course_facts(query) is None
+
+
+@pytest.mark.parametrize("text, scope", [
+    ("which branch has highest package", "btech"),
+    ("which branch has highest package in mtech", "mtech"),
+    ("which branch of mba has most seats", "mba"),
+    ("which pg branch has most seats", "pg"),
+    ("btech branches", "btech"),
+    ("highest package", None),
+])
+def test_detect_scope(text, scope):
+    assert detect_scope(text) == scope
@@ -0,0 +1,39 @@
+import asyncio
+import threading
+import time
+
+from llm_model_gemini.llm import gemini_client
+
+
+class _Caches:
+    def __init__(self):
+        self.threads = []
+
+    def create(self, **kwargs):
+        self.threads.append(threading.current_thread())
+        time.sleep(0.05)
+        return type("Cache", (), {"name": "cachedContents/test"})()
+
+
+def test_cache_is_created_off_the_event_loop(monkeypatch):
+    caches = _Caches()
+    monkeypatch.setattr(gemini_client, "GEMINI_EXPLICIT_CACHE", True)
+    monkeypatch.setattr(type(gemini_client.client), "caches", property(lambda self: caches))
+    monkeypatch.setitem(gemini_client._gemini_cache, "name", None)
+    monkeypatch.setitem(gemini_client._gemini_cache, "expires", 0.0)
+
+    async def main():
+        loop_thread = threading.current_thread()
+        # The config itself never touches the network.
+        assert gemini_client.gemini_config().cached_content is None
+        await gemini_client.arefresh_gemini_cache()
+        return loop_thread
+
+    loop_thread = asyncio.run(main())
+    assert len(caches.threads) == 1
+    assert caches.threads[0] is not loop_thread
+    assert gemini_client.gemini_config().cached_content == "cachedContents/test"
+
+    # Fresh cache: no further create calls.
+    asyncio.run(gemini_client.arefresh_gemini_cache())
+    assert len(caches.threads) == 1
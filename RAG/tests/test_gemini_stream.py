@@ -0,0 +1,48 @@
+import asyncio
+
+import pytest
+
+from llm_model_gemini.llm import gemini_client
+
+
+def _collect(stream):
+    async def main():
+        return [text async for text in stream]
+    return asyncio.run(main())
+
+
+def test_failure_after_tokens_is_raised(monkeypatch):
+    async def cut_off(prompt):
+        yield "NIET offers "
+        yield "B.Tech in"
+        raise RuntimeError("connection reset")
+
+    async def unused(prompt):
+        raise AssertionError("no fallback once text was sent")
+        yield
+
+    monkeypatch.setattr(gemini_client, "_openai_stream", cut_off)
+    monkeypatch.setattr(gemini_client, "_gemini_stream", unused)
+
+    received = []
+
+    async def main():
+        async for text in gemini_client.astream_answer("ctx", "which courses", []):
+            received.append(text)
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(main())
+    assert received == ["NIET offers ", "B.Tech in"]
+
+
+def test_failure_before_any_token_falls_back(monkeypatch):
+    async def down(prompt):
+        raise RuntimeError("down")
+        yield
+
+    async def gemini(prompt):
+        yield "from gemini"
+
+    monkeypatch.setattr(gemini_client, "_openai_stream", down)
+    monkeypatch.setattr(gemini_client, "_gemini_stream", gemini)
+    assert _collect(gemini_client.astream_answer("ctx", "which courses", [])) == ["from gemini"]
@@ -0,0 +1,99 @@
+import random
+import re
+
+import pytest
+
+from constant.intent_classifier import PHRASE, PREFIX, SUBSTRING, WORD, CompiledIntents, phrase_text
+
+FAMILIES = {
+    # "ad" and "admission" are both prefixes of "admissions": the regex only
+    # reports the longest, the shorter ones must still count.
+    "sub_short": (SUBSTRING, ["ad", "miss"]),
+    "sub_long": (SUBSTRING, ["admission", "admissions"]),
+    "start_short": (PREFIX, ["what"]),
+    "start_long": (PREFIX, ["what is", "what is the fee"]),
+    # A prefix key inside a longer substring key at position 0.
+    "start_inside": (PREFIX, ["adm"]),
+    "word": (WORD, ["fee", "fees"]),
+    "phrase_ban": (PHRASE, ["ban"]),
+    "phrase_ban_on": (PHRASE, ["ban on"]),
+    # Overlaps "ban on" at the shared token "on".
+    "phrase_on_campus": (PHRASE, ["on campus"]),
+    "phrase_campus": (PHRASE, ["campus life"]),
+}
+
+TEXTS = [
+    "admissions open",
+    "admission",
+    "what is the fee",
+    "what is the fees",
+    "whatis",
+    "so what is it",
+    "admit card",
+    "ban on campus",
+    "banned on campus",
+    "bank on campus life",
+    "ban",
+    "urban on campus",
+    "ban-on campus",
+    "feed the fees",
+    "coffee fee",
+    "mission admission",
+    "",
+]
+
+
+def _old(mode, keywords, q):
+    # The predicates the families replaced.
+    if mode == SUBSTRING:
+        return any(k in q for k in keywords)
+    if mode == PREFIX:
+        return any(q.startswith(k) for k in keywords)
+    if mode == WORD:
+        return bool(set(keywords) & set(re.findall(r"[a-z]+", q)))
+    return any(phrase_text(k) in phrase_text(q) for k in keywords)
+
+
+def _expected(q):
+    return frozenset(label for label, (mode, keywords) in FAMILIES.items() if _old(mode, keywords, q))
+
+
+@pytest.fixture(scope="module")
+def intents():
+    return CompiledIntents(FAMILIES)
+
+
+@pytest.mark.parametrize("text", TEXTS)
+def test_matches_the_old_predicates(intents, text):
+    assert intents.match(text) == _expected(text)
+
+
+def test_prefix_key_inside_a_longer_start_match(intents):
+    labels = intents.match("admissions open")
+    assert {"sub_short", "sub_long", "start_inside"} <= labels
+    assert "start_inside" not in intents.match("an admission")
+
+
+def test_longest_prefix_keeps_shorter_prefixes(intents):
+    assert {"start_short", "start_long"} <= intents.match("what is the fee")
+    assert intents.match("so what is it") & {"start_short", "start_long"} == frozenset()
+
+
+def test_overlapping_phrases_are_all_found(intents):
+    labels = intents.match("ban on campus life")
+    assert {"phrase_ban", "phrase_ban_on", "phrase_on_campus", "phrase_campus"} <= labels
+
+
+def test_phrases_and_words_need_token_boundaries(intents):
+    assert not intents.match("urban bank") & {"phrase_ban", "phrase_ban_on"}
+    assert "word" not in intents.match("coffee feed")
+    assert "word" in intents.match("fee.")
+
+
+def test_random_texts_match_the_old_predicates(intents):
+    pieces = ["ad", "admission", "s", "what", " is", " the", " fee", "s", "ban", " on",
+              " campus", " life", "miss", " ", "-", "ur", "x"]
+    rng = random.Random(16)
+    for _ in range(2000):
+        text = "".join(rng.choice(pieces) for _ in range(rng.randint(1, 8)))
+        assert intents.match(text) == _expected(text), text
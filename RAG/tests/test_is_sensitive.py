@@ -0,0 +1,103 @@
+import json
+import os
+import time
+
+import pytest
+
+from constant.intent_classifier import classify
+from constant.is_sensitive import (
+    SAFETY_POSITIVE_KEYWORDS,
+    SENSITIVE_KEYWORDS,
+    is_safety_confirmation_query,
+    is_sensitive_query,
+    with_plurals,
+)
+
+CORPUS_FILE = os.path.join(os.path.dirname(__file__), "sensitive_corpus.json")
+
+with open(CORPUS_FILE, "r", encoding="utf-8") as f:
+    CORPUS = json.load(f)
+
+# Known misses of the whole-token matcher ("closed" in "is the library
+# closed on sunday", "cases" in "cases of innovation").
+MAX_FALSE_POSITIVE_RATE = 0.05
+MAX_US_PER_QUERY = 1000
+
+
+def test_corpus_score():
+    false_pos, missed, wrong_safety = [], [], []
+    for row in CORPUS:
+        flagged = is_sensitive_query(row["text"])
+        if flagged and not row["sensitive"]:
+            false_pos.append(row["text"])
+        elif not flagged and row["sensitive"]:
+            missed.append(row["text"])
+        elif flagged and is_safety_confirmation_query(row["text"]) != row.get("safety", False):
+            wrong_safety.append(row["text"])
+
+    benign = sum(1 for row in CORPUS if not row["sensitive"])
+    assert missed == []
+    assert wrong_safety == []
+    assert len(false_pos) / benign <= MAX_FALSE_POSITIVE_RATE, false_pos
+
+
+@pytest.mark.parametrize("text", [
+    "complaints against niet",
+    "FIRs against niet",
+    "ragging cases in niet",
+    "suicide cases",
+    "frauds by niet management",
+])
+def test_plural_keywords(text):
+    assert is_sensitive_query(text)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("basketball court on campus", False),
+    ("basketball courts on campus", False),
+    ("is the college close to the metro station", False),
+    ("in case i miss the counselling date", False),
+    ("police verification for hostel", False),
+    # An exception only clears its own keyword.
+    ("tennis court case against niet", True),
+    ("police verification case filed against niet", True),
+    ("in case niet is closed what happens", True),
+    ("virtual reality lab scam", True),
+])
+def test_exceptions_are_scoped_to_their_keyword(text, expected):
+    assert is_sensitive_query(text) is expected
+
+
+@pytest.mark.parametrize("keyword", ["police", "is it safe", "fuck off", "bad reviews"])
+def test_only_listed_nouns_get_a_plural(keyword):
+    assert with_plurals([keyword]) == [keyword]
+
+
+def _substring_match(text, keywords):
+    # The previous matcher, kept as the speed baseline.
+    text = text.lower()
+    return any(k in text for k in keywords)
+
+
+def _us_per_query(sensitive, safety, texts, rounds=20):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        classify.cache_clear()
+        for text in texts:
+            sensitive(text)
+            safety(text)
+    return (time.perf_counter() - start) / (rounds * len(texts)) * 1e6
+
+
+def test_benchmark_against_substring_matcher():
+    texts = [row["text"] for row in CORPUS]
+    baseline = _us_per_query(
+        lambda t: _substring_match(t, SENSITIVE_KEYWORDS),
+        lambda t: _substring_match(t, SAFETY_POSITIVE_KEYWORDS),
+        texts,
+    )
+    current = _us_per_query(is_sensitive_query, is_safety_confirmation_query, texts)
+    print(f"substring: {baseline:.1f} us/query, phrase: {current:.1f} us/query")
+    # Loose bound: the check runs on every question, so it has to stay
+    # under a millisecond even on a slow CI machine.
+    assert current < MAX_US_PER_QUERY
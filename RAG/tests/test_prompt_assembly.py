@@ -0,0 +1,64 @@
+import pytest
+
+from llm_model_gemini.chat import build_rag_context
+from llm_model_gemini.llm import prompt_metrics
+from llm_model_gemini.llm.gemini_client import SYSTEM_PROMPT, assemble_prompt
+from llm_model_gemini.llm.prompt_assembly import BLOCK_ORDER, PromptAssembly
+from llm_model_gemini.token_counter import count_tokens
+
+CONTEXT = "ADMISSION INFORMATION:\n- Fees: as per the admission department"
+HISTORY = [{"role": "user", "content": "what is the fee"}]
+
+
+def test_token_report_covers_every_block():
+    prompt = assemble_prompt(CONTEXT, "what is the fee", HISTORY, "B.Tech CSE has 360 seats")
+    report = prompt.token_report()
+
+    assert set(report) == set(BLOCK_ORDER) | {"total"}
+    assert report["total"] == sum(report[name] for name in BLOCK_ORDER)
+    assert report["instructions"] == count_tokens(SYSTEM_PROMPT)
+    for name in BLOCK_ORDER:
+        assert report[name] > 0
+
+
+def test_system_prefix_is_not_repeated_in_user_message():
+    prompt = assemble_prompt(CONTEXT, "what is the fee", HISTORY)
+    assert prompt.system == SYSTEM_PROMPT
+    assert SYSTEM_PROMPT not in prompt.user
+
+
+def test_rag_chunks_repeating_the_context_are_sent_once():
+    prompt = assemble_prompt(CONTEXT, "what is the fee", HISTORY, rag_context=CONTEXT)
+
+    assert prompt.user.count(CONTEXT) == 1
+    assert "ADDITIONAL INFORMATION:" not in prompt.user
+    assert prompt.token_report()["rag_chunks"] == 0
+
+
+def test_empty_rag_chunks_are_left_out():
+    prompt = assemble_prompt(CONTEXT, "what is the fee", HISTORY, rag_context="")
+    assert "ADDITIONAL INFORMATION:" not in prompt.user
+
+
+def test_block_cannot_be_added_twice():
+    prompt = PromptAssembly().add("context", "a")
+    with pytest.raises(ValueError):
+        prompt.add("context", "b")
+
+
+def test_unknown_block_is_rejected():
+    with pytest.raises(ValueError):
+        PromptAssembly().add("extra", "a")
+
+
+def test_repeated_chunks_are_sent_once():
+    chunks = [{"answer": "360 seats"}, {"text": "360 seats"}, "4 years", ["4 years", "JEE"]]
+    assert build_rag_context(chunks) == "360 seats\n4 years\nJEE"
+
+
+def test_breakdown_stats_average_per_block():
+    before = prompt_metrics.prompt_breakdown_stats()["prompts"]
+    prompt_metrics.record_prompt_breakdown({"context": 10, "total": 10})
+    stats = prompt_metrics.prompt_breakdown_stats()
+    assert stats["prompts"] == before + 1
+    assert "context" in stats["avg_tokens"]
@@ -0,0 +1,78 @@
+import asyncio
+
+from llm_model_gemini.llm import provider_orchestrator
+from llm_model_gemini.llm.circuit_breaker import breaker
+from llm_model_gemini.llm.provider_orchestrator import Provider, orchestrate
+
+
+def _provider(name, answer=None, error=None, delay=0.0):
+    async def call(max_tokens):
+        await asyncio.sleep(delay)
+        if error is not None:
+            raise error
+        return answer
+    return Provider(name, call, timeout=5)
+
+
+def _tied(names_and_results):
+    """
+    Providers that all answer in the same event loop pass: each waits
+    until every one of them has been started.
+    """
+    started = []
+    all_started = asyncio.Event()
+
+    def make(name, answer, error):
+        async def call(max_tokens):
+            started.append(name)
+            if len(started) == len(names_and_results):
+                all_started.set()
+            await all_started.wait()
+            if error is not None:
+                raise error
+            return answer
+        return Provider(name, call, timeout=5)
+
+    return [make(*args) for args in names_and_results]
+
+
+def _stats(name):
+    return provider_orchestrator.provider_stats()["providers"].get(name, {})
+
+
+def test_sequential_falls_back_after_a_failure():
+    name, answer = asyncio.run(orchestrate(
+        [_provider("seq_a", error=RuntimeError("down")), _provider("seq_b", "ok")],
+        policy="sequential"))
+    assert (name, answer) == ("seq_b", "ok")
+    assert _stats("seq_a")["errors"] == 1
+    assert _stats("seq_b")["wins"] == 1
+
+
+def test_tasks_finishing_together_keep_their_real_outcome():
+    # race starts all three; they finish in the same wait.
+    name, answer = asyncio.run(orchestrate(
+        _tied([("tie_a", "first", None), ("tie_b", "second", None),
+               ("tie_c", None, RuntimeError("down"))]),
+        policy="race"))
+
+    assert name in ("tie_a", "tie_b")
+    outcomes = {n: _stats(n) for n in ("tie_a", "tie_b", "tie_c")}
+    assert sum(s["wins"] for s in outcomes.values()) == 1
+    assert sum(s["discarded"] for s in outcomes.values()) == 1
+    assert outcomes["tie_c"]["errors"] == 1
+    assert all(s["cancelled"] == 0 for s in outcomes.values())
+    assert breaker("tie_c").health()["calls"] == 1
+
+
+def test_slow_loser_is_cancelled():
+    name, _ = asyncio.run(orchestrate(
+        [_provider("slow_a", "late", delay=1.0), _provider("slow_b", "fast")],
+        policy="race"))
+    assert name == "slow_b"
+    assert _stats("slow_a")["cancelled"] == 1
+
+
+def test_unanswered_returns_none():
+    assert asyncio.run(orchestrate(
+        [_provider("none_a", error=RuntimeError("down"))], policy="hedged")) == (None, None)
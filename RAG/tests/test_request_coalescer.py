@@ -0,0 +1,189 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from llm_model_gemini import chat
+from llm_model_gemini.llm import gemini_client, provider_orchestrator, request_coalescer
+from llm_model_gemini.llm.gemini_client import HIGH_TRAFFIC_MESSAGE
+from llm_model_gemini.llm.request_coalescer import (
+    ProviderBusy, ProviderGate, SingleFlight, coalesce_key, provider_gate, retry_after,
+)
+from llm_model_gemini.memory.chat_memory import get
+
+
+class _RateLimited(Exception):
+    status_code = 429
+
+    def __init__(self, headers=None):
+        super().__init__("429")
+        self.response = type("Response", (), {"headers": headers or {}})()
+
+
+def test_coalesce_key_normalizes_question_and_history():
+    history = [{"role": "user", "content": "What is NIET?"}]
+    assert coalesce_key("What is NIET?", "ctx", history) == \
+        coalesce_key("what is niet", "ctx", [{"role": "user", "content": "what is niet"}])
+    assert coalesce_key("tell me more", "ctx", history) != coalesce_key("tell me more", "ctx", [])
+
+
+def test_retry_after():
+    assert retry_after(_RateLimited({"retry-after": "3"})) == 3.0
+    assert retry_after(_RateLimited()) == request_coalescer.RATE_LIMIT_COOLDOWN
+    assert retry_after(RuntimeError("down")) is None
+
+
+def test_identical_async_calls_share_one_call():
+    flight = SingleFlight()
+    calls = []
+
+    async def make():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "answer"
+
+    async def main():
+        return await asyncio.gather(*[flight.ado("same", make) for _ in range(10)])
+
+    assert asyncio.run(main()) == ["answer"] * 10
+    assert len(calls) == 1
+    assert flight.stats() == {"in_flight": 0, "calls": 10, "coalesced": 9}
+
+
+def test_identical_threaded_calls_share_one_call():
+    flight = SingleFlight()
+    calls = []
+    started = threading.Event()
+
+    def fn():
+        calls.append(1)
+        started.set()
+        time.sleep(0.1)
+        return "answer"
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flight.do("same", fn)))
+    leader.start()
+    started.wait()
+    followers = [threading.Thread(target=lambda: results.append(flight.do("same", fn))) for _ in range(5)]
+    for t in followers:
+        t.start()
+    for t in [leader] + followers:
+        t.join()
+
+    assert results == ["answer"] * 6
+    assert len(calls) == 1
+
+
+def test_gate_caps_calls_in_flight():
+    gate = ProviderGate("cap", max_in_flight=2, max_queue=10)
+    live, peak = [0], [0]
+
+    async def call():
+        async with gate.aslot():
+            live[0] += 1
+            peak[0] = max(peak[0], live[0])
+            await asyncio.sleep(0.02)
+            live[0] -= 1
+
+    async def main():
+        await asyncio.gather(*[call() for _ in range(8)])
+
+    asyncio.run(main())
+    assert peak[0] == 2
+    stats = gate.stats()
+    assert stats["admitted"] == 8 and stats["in_flight"] == 0
+
+
+def test_full_queue_is_busy():
+    gate = ProviderGate("full", max_in_flight=1, max_queue=0)
+    gate.acquire()
+    with pytest.raises(ProviderBusy):
+        gate.acquire()
+    gate.release()
+    assert gate.stats()["rejected_full"] == 1
+
+
+def test_queue_wait_times_out(monkeypatch):
+    monkeypatch.setattr(request_coalescer, "LLM_QUEUE_TIMEOUT", 0.05)
+    gate = ProviderGate("timeout", max_in_flight=1, max_queue=1)
+
+    async def main():
+        await gate.aacquire()
+        try:
+            with pytest.raises(ProviderBusy):
+                await gate.aacquire()
+        finally:
+            gate.release()
+
+    asyncio.run(main())
+    assert gate.stats()["rejected_timeout"] == 1
+    assert gate.stats()["in_flight"] == 0
+
+
+def test_rate_limited_gate_refuses_until_the_cooldown_ends():
+    gate = ProviderGate("limited", max_in_flight=1, max_queue=1)
+    gate.rate_limited(0.1)
+    with pytest.raises(ProviderBusy):
+        gate.acquire()
+    time.sleep(0.15)
+    with gate.slot():
+        pass
+    assert gate.stats()["rejected_rate_limited"] == 1
+
+
+def _fake_providers(monkeypatch, openai_error=None):
+    calls = {"openai": 0, "gemini": 0}
+
+    def fake(name, error=None):
+        async def answer(prompt, max_tokens=None):
+            calls[name] += 1
+            await asyncio.sleep(0.05)
+            if error is not None:
+                raise error
+            return f"{name} answer"
+        return answer
+
+    monkeypatch.setattr(provider_orchestrator, "PROVIDER_POLICY", "sequential")
+    # Undo any rate-limit pause the test causes.
+    monkeypatch.setattr(provider_gate("openai"), "limited_until", 0.0)
+    monkeypatch.setattr(gemini_client, "_openai_answer", fake("openai", openai_error))
+    monkeypatch.setattr(gemini_client, "_gemini_answer", fake("gemini"))
+    return calls
+
+
+def test_identical_questions_make_one_provider_call(monkeypatch):
+    calls = _fake_providers(monkeypatch)
+
+    async def main():
+        return await asyncio.gather(*[
+            gemini_client.agenerate_answer("ctx", q, [{"role": "user", "content": q}])
+            for q in ["What is NIET?", "what is niet"] * 5
+        ])
+
+    assert asyncio.run(main()) == ["openai answer"] * 10
+    assert calls == {"openai": 1, "gemini": 0}
+
+
+def test_rate_limited_provider_hands_over(monkeypatch):
+    calls = _fake_providers(monkeypatch, openai_error=_RateLimited({"retry-after": "0.2"}))
+    answer = asyncio.run(gemini_client.agenerate_answer("ctx", "rate limit question", []))
+    assert answer == "gemini answer"
+    # OpenAI is paused: the next question goes straight to Gemini.
+    answer = asyncio.run(gemini_client.agenerate_answer("ctx", "another question", []))
+    assert answer == "gemini answer"
+    assert calls == {"openai": 1, "gemini": 2}
+
+
+def test_busy_answer_is_not_kept_in_session_memory(monkeypatch):
+    async def busy(*args):
+        return HIGH_TRAFFIC_MESSAGE
+
+    monkeypatch.setattr(chat, "agenerate_answer", busy)
+    monkeypatch.setattr(chat, "retrieve_chunks", lambda q, top_k=3: [])
+    monkeypatch.setattr(chat.ANSWER_CACHE, "backend", None)
+
+    reply = asyncio.run(chat.achat("busy memory question", "busy-session"))
+    assert reply == HIGH_TRAFFIC_MESSAGE
+    assert get("busy-session") == [{"role": "user", "content": "busy memory question"}]